@@ -0,0 +1,109 @@
+"""Parse-time benchmark of the provider's JSON codecs on a synthetic payload.
+
+Builds a GrowthBook-shaped feature payload of about 5 MB (targeted and
+experiment rules, JSON object flags, saved groups) and times `loads` and
+`dumps` for every available codec. The garbage collector is paused while
+timing, so the numbers show parsing cost rather than collection pauses.
+
+    python benchmarks/bench_json_codec.py [--size-mb 5] [--repeat 5]
+"""
+import argparse
+import gc
+import random
+import statistics
+import time
+from typing import Tuple
+
+from growthbook_openfeature_provider import json_codec
+
+
+def synthetic_payload(target_bytes: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    features = {}
+    saved_groups = {}
+    payload = {"features": features, "savedGroups": saved_groups}
+    i = 0
+    while True:
+        key = f"feature-{i:06d}"
+        kind = i % 4
+        if kind == 0:
+            features[key] = {"defaultValue": False, "rules": [{
+                "id": f"fr_{i}",
+                "condition": {"country": {"$in": ["US", "CA", "GB", "DE"]}, "version": {"$vgte": "2.3.0"}},
+                "force": True,
+            }]}
+        elif kind == 1:
+            features[key] = {"defaultValue": "control", "rules": [{
+                "key": f"experiment-{i}",
+                "variations": ["control", "treatment"],
+                "weights": [0.5, 0.5],
+                "coverage": 1,
+                "hashAttribute": "id",
+                "hashVersion": 2,
+                "meta": [{"key": "0", "name": "Control"}, {"key": "1", "name": "Treatment"}],
+            }]}
+        elif kind == 2:
+            # JSON object flag
+            features[key] = {"defaultValue": {
+                "title": f"Banner {i}",
+                "colors": [rng.randrange(256) for _ in range(8)],
+                "ratio": rng.random(),
+                "enabled": True,
+                "links": [{"href": f"https://example.com/{i}/{j}", "weight": j} for j in range(4)],
+            }, "rules": []}
+        else:
+            group = f"group-{i}"
+            saved_groups[group] = [f"user-{rng.randrange(10**9)}" for _ in range(50)]
+            features[key] = {"defaultValue": 0, "rules": [{
+                "condition": {"id": {"$inGroup": group}}, "force": i,
+            }]}
+        i += 1
+        if i % 500 == 0 and len(json_codec.JSONCodec().dumps(payload)) >= target_bytes:
+            return payload
+
+
+def best_of(fn, repeat: int) -> Tuple[float, float]:
+    """Best and median time of `fn`, with the garbage collector paused like timeit does"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings), statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = synthetic_payload(int(args.size_mb * 1024 * 1024))
+    body = json_codec.JSONCodec().dumps(payload)
+    print(f"payload: {len(body) / 1024 / 1024:.2f} MB, {len(payload['features'])} features, "
+          f"{len(payload['savedGroups'])} saved groups")
+
+    codecs = [json_codec.JSONCodec()]
+    if json_codec.orjson is not None:
+        codecs.append(json_codec.OrjsonCodec())
+    else:
+        print("orjson is not installed; only the standard library codec is measured")
+
+    baseline = None
+    for codec in codecs:
+        assert codec.loads(body) == payload
+        loads_best, loads_median = best_of(lambda: codec.loads(body), args.repeat)
+        dumps_best, dumps_median = best_of(lambda: codec.dumps(payload, sort_keys=True), args.repeat)
+        baseline = baseline or loads_best
+        print(f"{codec.name:>7}: loads {loads_best * 1000:7.1f} ms (median {loads_median * 1000:.1f}), "
+              f"dumps {dumps_best * 1000:7.1f} ms (median {dumps_median * 1000:.1f}), "
+              f"parse speedup x{baseline / loads_best:.1f}")
+
+
+if __name__ == "__main__":
+    main()
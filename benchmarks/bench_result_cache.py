@@ -0,0 +1,76 @@
+"""Per-evaluation cost of the result cache.
+
+Resolves a simple targeted boolean flag from a local payload, directly on the
+provider and through an OpenFeature client, with the result cache disabled
+(the default) and enabled, for a flat context and for one with nested
+attribute values (which need the slower, deep cache key). With the cache
+enabled every call after the first is a hit, so the enabled rows show the
+cost of a hit against evaluating the flag. Reports the best of several runs
+in microseconds per evaluation.
+
+    python benchmarks/bench_result_cache.py [--number 50000] [--repeat 5]
+"""
+import argparse
+import logging
+import timeit
+
+from openfeature import api
+from openfeature.evaluation_context import EvaluationContext
+
+from growthbook_openfeature_provider import GrowthBookProvider, GrowthBookProviderOptions
+from growthbook_openfeature_provider.provider import run_async_legacy
+
+PAYLOAD = {
+    "features": {
+        "flag": {"defaultValue": False, "rules": [{"condition": {"country": "US"}, "force": True}]},
+    },
+    "savedGroups": {},
+}
+
+
+def make_provider(result_cache_size: int) -> GrowthBookProvider:
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        # Nothing listens here; the bootstrap payload is served
+        api_host="http://127.0.0.1:9",
+        client_key="bench",
+        bootstrap_payload=PAYLOAD,
+        result_cache_size=result_cache_size,
+    ))
+    provider.initialize_sync()
+    return provider
+
+
+def best_of(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    flat = EvaluationContext("user-1", {
+        "country": "US", "plan": "pro", "age": 31, "beta": True, "score": 0.5,
+    })
+    nested = EvaluationContext("user-1", {
+        "country": "US", "plan": "pro", "tags": ["a", "b"], "account": {"id": "acct-1", "seats": 25},
+    })
+    print(f"{'context':>8} {'result_cache_size':>18} {'provider (us)':>14} {'client (us)':>12}")
+    for name, context in (("flat", flat), ("nested", nested)):
+        for size in (0, 1024):
+            provider = make_provider(size)
+            api.set_provider(provider, "bench")
+            client = api.get_client("bench")
+            assert client.get_boolean_value("flag", False, context) is True
+
+            direct = best_of(lambda: provider.resolve_boolean_details("flag", False, context), args.number, args.repeat)
+            through_client = best_of(lambda: client.get_boolean_value("flag", False, context), args.number, args.repeat)
+            print(f"{name:>8} {size:>18} {direct:>14.2f} {through_client:>12.2f}")
+            api.clear_providers()
+            run_async_legacy(provider.close())
+
+
+if __name__ == "__main__":
+    main()
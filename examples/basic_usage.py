@@ -81,7 +81,7 @@ async def async_example():
     ))
     
     # Initialize asynchronously
-    await provider.initialize()
+    await provider.initialize_async()
     
     # Register with OpenFeature
     api.set_provider(provider)
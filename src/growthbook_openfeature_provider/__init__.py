@@ -1,4 +1,5 @@
 from .provider import GrowthBookProvider, GrowthBookProviderOptions
+from .multi_tenant import MultiTenantProvider, MultiTenantProviderOptions
 
 __version__ = "0.0.6"
-__all__ = ["GrowthBookProvider", "GrowthBookProviderOptions"]
\ No newline at end of file
+__all__ = ["GrowthBookProvider", "GrowthBookProviderOptions", "MultiTenantProvider", "MultiTenantProviderOptions"]
\ No newline at end of file
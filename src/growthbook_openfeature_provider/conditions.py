@@ -0,0 +1,633 @@
+"""Compile GrowthBook targeting conditions into Python closures.
+
+GrowthBook's rule engine (`growthbook.core.evalCondition`) walks the condition
+JSON on every evaluation: it re-dispatches on every `$operator` string, splits
+attribute paths and re-checks operand types each time. `compile_features`
+does that work once, when the provider receives a feature payload, and
+replaces each rule condition with a `CompiledCondition`. That is still the
+original dict, so serialization, pickling and every other reader see no
+difference, but it also carries a closure that evaluates it directly.
+
+`install` wraps `growthbook.core.evalCondition` so compiled conditions are
+dispatched to their closure; plain dicts still go to the original function.
+GrowthBook's rule engine offers no per-client hook, so the wrapper is
+process-wide. Providers therefore only compile conditions when asked to
+(`compile_conditions=True`); each pairs `install` with `uninstall`, and the
+original function is restored when the last of them closes.
+
+Closures depend only on the condition, so identical conditions share one:
+within a payload, across refreshes, and across providers serving the same
+payload (for example tenants of a `MultiTenantProvider`).
+Results are identical to the interpreter: operators whose semantics depend on
+runtime state (saved groups, `$all`, ...) or operands with unexpected shapes
+are delegated to GrowthBook's own implementation.
+
+That delegation and the wrapper rely on private functions of
+`growthbook.core`, checked by `missing_core_functions`; providers skip
+compilation with a warning when the installed growthbook lacks any of them.
+"""
+import hashlib
+import logging
+import math
+import operator as op
+import re
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from growthbook import core as gb_core
+
+from . import json_codec
+from .saved_groups import CompactGroupValues
+
+logger = logging.getLogger(__name__)
+
+# growthbook.core functions compiled conditions call or wrap
+_CORE_FUNCTIONS = (
+    "evalCondition", "_eval_condition", "evalOperatorCondition", "_eval_saved_group",
+    "getPath", "getType", "isOperatorObject", "compare", "_is_numeric",
+    "paddedVersionString", "_paddedVersionString", "isIn", "_contains_boolean_or_number",
+)
+
+
+def missing_core_functions() -> List[str]:
+    """Names of `_CORE_FUNCTIONS` the installed growthbook does not have"""
+    return [name for name in _CORE_FUNCTIONS if not callable(getattr(gb_core, name, None))]
+
+
+# Same exceptions growthbook.core.evalCondition turns into a failed condition
+_EVAL_ERRORS = (TypeError, ValueError, AttributeError, IndexError, RecursionError)
+
+# node(attributes, saved_groups, visited) -> bool; may raise like _eval_condition
+ConditionNode = Callable[[Any, Optional[Dict[str, Any]], Optional[Set[str]]], bool]
+# node(attribute_value, saved_groups, visited) -> bool; may raise like evalConditionValue
+ValueNode = Callable[[Any, Optional[Dict[str, Any]], Optional[Set[str]]], bool]
+
+
+class CompiledCondition(dict):
+    """A condition dict that also carries its compiled matcher"""
+
+    __slots__ = ("matches",)
+
+    def __init__(self, condition: Dict[str, Any], matches: Callable[..., bool]):
+        super().__init__(condition)
+        self.matches = matches
+
+    def __reduce__(self):
+        # Closures don't pickle; worker processes get the plain condition
+        return (dict, (dict(self),))
+
+
+def _always_false(*args: Any) -> bool:
+    return False
+
+
+def _has_empty_key(value: Any) -> bool:
+    # isOperatorObject raises IndexError on "" keys, possibly only at runtime
+    return isinstance(value, dict) and "" in value
+
+
+def _delegate_condition(key: str, value: Any) -> ConditionNode:
+    condition = {key: value}
+
+    def node(attributes, saved_groups, visited):
+        return gb_core._eval_condition(attributes, condition, saved_groups, visited)
+    return node
+
+
+def _delegate_operator(operator: str, condition_value: Any) -> ValueNode:
+    def node(value, saved_groups, visited):
+        return gb_core.evalOperatorCondition(operator, value, condition_value, saved_groups, visited)
+    return node
+
+
+def _path_getter(path: str) -> Callable[[Any], Any]:
+    """Pre-split version of growthbook.core.getPath"""
+    if "." not in path:
+        def get(attributes):
+            if isinstance(attributes, dict):
+                return attributes.get(path)
+            return None
+        return get
+
+    segments = path.split(".")
+
+    def get_nested(attributes):
+        current = attributes
+        for segment in segments:
+            if isinstance(current, dict) and segment in current:
+                current = current[segment]
+            else:
+                return None
+        return current
+    return get_nested
+
+
+def _all_of(nodes: List[Any]) -> Any:
+    if len(nodes) == 1:
+        return nodes[0]
+
+    def node(target, saved_groups, visited):
+        for n in nodes:
+            if not n(target, saved_groups, visited):
+                return False
+        return True
+    return node
+
+
+def _compile_condition(condition: Dict[str, Any]) -> ConditionNode:
+    """Compile a condition dict; keys are checked in order like _eval_condition"""
+    parts: List[ConditionNode] = []
+    for key, value in condition.items():
+        if key in ("$or", "$nor", "$and"):
+            if not isinstance(value, list) or not all(
+                isinstance(c, dict) and not _has_empty_key(c) for c in value
+            ):
+                parts.append(_delegate_condition(key, value))
+            else:
+                parts.append(_compile_logical(key, [_compile_condition(c) for c in value]))
+        elif key == "$not":
+            if not isinstance(value, dict):
+                parts.append(_delegate_condition(key, value))
+            else:
+                parts.append(_compile_not(_compile_condition(value)))
+        elif key == "$savedGroup":
+            parts.append(_compile_saved_group(value))
+        elif key == "$savedGroups":
+            parts.append(_always_false)
+        elif _has_empty_key(value):
+            parts.append(_delegate_condition(key, value))
+        else:
+            parts.append(_compile_attribute(key, value))
+
+    if not parts:
+        return lambda attributes, saved_groups, visited: True
+    return _all_of(parts)
+
+
+def _compile_logical(key: str, nodes: List[ConditionNode]) -> ConditionNode:
+    if key == "$and":
+        return _all_of(nodes) if nodes else (lambda attributes, saved_groups, visited: True)
+
+    def any_of(attributes, saved_groups, visited):
+        for n in nodes:
+            if n(attributes, saved_groups, visited):
+                return True
+        return False
+
+    if key == "$or":
+        if not nodes:
+            return lambda attributes, saved_groups, visited: True
+        return any_of
+
+    # $nor over an empty list is the negation of an empty $or
+    if not nodes:
+        return _always_false
+    return lambda attributes, saved_groups, visited: not any_of(attributes, saved_groups, visited)
+
+
+def _compile_not(inner: ConditionNode) -> ConditionNode:
+    return lambda attributes, saved_groups, visited: not inner(attributes, saved_groups, visited)
+
+
+def _compile_saved_group(reference: Any) -> ConditionNode:
+    # Saved groups are part of the payload but passed in per call; resolve them then
+    def node(attributes, saved_groups, visited):
+        return gb_core._eval_saved_group(attributes, reference, saved_groups, visited)
+
+    if not isinstance(reference, dict) or not isinstance(reference.get("id"), str):
+        return node
+    if "attributeKey" in reference and not isinstance(reference["attributeKey"], str):
+        return node
+    group_id = reference["id"]
+    get_path = gb_core.getPath
+
+    def compact_node(attributes, saved_groups, visited):
+        # Fast path for compacted list groups; everything else as _eval_saved_group
+        entry = saved_groups.get(group_id) if saved_groups is not None else None
+        if (
+            isinstance(entry, dict)
+            and entry.get("type") == "list"
+            and type(entry.get("values")) is CompactGroupValues
+            and (visited is None or group_id not in visited)
+        ):
+            key = reference.get("attributeKey", entry.get("attributeKey"))
+            if isinstance(key, str):
+                return entry["values"].isin(get_path(attributes, key))
+        return node(attributes, saved_groups, visited)
+    return compact_node
+
+
+def _compile_attribute(path: str, condition_value: Any) -> ConditionNode:
+    get = _path_getter(path)
+    check = _compile_value(condition_value)
+
+    def node(attributes, saved_groups, visited):
+        return check(get(attributes), saved_groups, visited)
+    return node
+
+
+def _compile_value(condition_value: Any) -> ValueNode:
+    """Compile the right-hand side of an attribute condition (evalConditionValue)"""
+    if isinstance(condition_value, dict) and gb_core.isOperatorObject(condition_value):
+        return _all_of([
+            _compile_operator(operator, operand) for operator, operand in condition_value.items()
+        ]) if condition_value else (lambda value, saved_groups, visited: True)
+
+    def equals(value, saved_groups, visited):
+        return bool(condition_value == value)
+    return equals
+
+
+def _compile_operator(operator: str, operand: Any) -> ValueNode:
+    get_type = gb_core.getType
+
+    if operator in ("$eq", "$ne"):
+        operand_type = get_type(operand)
+        if operand_type in ("array", "object"):
+            # JS === never matches containers
+            return _always_false if operator == "$eq" else (lambda value, saved_groups, visited: True)
+        if operator == "$eq":
+            return lambda value, saved_groups, visited: get_type(value) == operand_type and bool(value == operand)
+        return lambda value, saved_groups, visited: not (get_type(value) == operand_type and bool(value == operand))
+
+    if operator in ("$lt", "$lte", "$gt", "$gte"):
+        return _compile_ordered(_ORDER_TESTS[operator], operand)
+
+    if operator in _VERSION_TESTS:
+        return _compile_version(_VERSION_TESTS[operator], operand)
+
+    if operator in ("$in", "$nin", "$ini", "$nini"):
+        if not isinstance(operand, list):
+            return _always_false
+        if operator in ("$in", "$nin"):
+            is_in = _compile_in(operand)
+        else:
+            is_in = _compile_in_insensitive(operand)
+        if operator in ("$in", "$ini"):
+            return lambda value, saved_groups, visited: is_in(value)
+        return lambda value, saved_groups, visited: not is_in(value)
+
+    if operator in ("$regex", "$regexi", "$notRegex", "$notRegexi"):
+        return _compile_regex(operator, operand)
+
+    if operator in ("$inGroup", "$notInGroup") and isinstance(operand, str):
+        return _compile_in_group(operator, operand)
+
+    if operator == "$exists":
+        if operand:
+            return lambda value, saved_groups, visited: value is not None
+        return lambda value, saved_groups, visited: value is None
+
+    if operator == "$type":
+        return lambda value, saved_groups, visited: bool(get_type(value) == operand)
+
+    if operator == "$not":
+        if _has_empty_key(operand):
+            return _delegate_operator(operator, operand)
+        inner = _compile_value(operand)
+        return lambda value, saved_groups, visited: not inner(value, saved_groups, visited)
+
+    if operator == "$size":
+        if _has_empty_key(operand):
+            return _delegate_operator(operator, operand)
+        inner = _compile_value(operand)
+
+        def size(value, saved_groups, visited):
+            if not isinstance(value, list):
+                return False
+            return inner(len(value), saved_groups, visited)
+        return size
+
+    if operator == "$elemMatch":
+        if not isinstance(operand, dict) or _has_empty_key(operand):
+            return _delegate_operator(operator, operand)
+        if gb_core.isOperatorObject(operand):
+            item_matches = _compile_value(operand)
+        else:
+            item_matches = _compile_condition(operand)
+
+        def elem_match(value, saved_groups, visited):
+            if not isinstance(value, list):
+                return False
+            for item in value:
+                if item_matches(item, saved_groups, visited):
+                    return True
+            return False
+        return elem_match
+
+    return _delegate_operator(operator, operand)
+
+
+_ORDER_TESTS = {
+    "$lt": lambda c: c < 0,
+    "$lte": lambda c: c <= 0,
+    "$gt": lambda c: c > 0,
+    "$gte": lambda c: c >= 0,
+}
+
+_VERSION_TESTS = {
+    "$veq": op.eq,
+    "$vne": op.ne,
+    "$vlt": op.lt,
+    "$vlte": op.le,
+    "$vgt": op.gt,
+    "$vgte": op.ge,
+}
+
+_NOT_A_NUMBER = object()
+
+
+def _compile_ordered(test: Callable[[int], bool], operand: Any) -> ValueNode:
+    """$lt/$lte/$gt/$gte; coerces a non-numeric operand to a number once.
+
+    growthbook.core.compare converts the non-numeric side to float when the
+    other side is a number. For the operand that conversion is done here,
+    instead of parsing e.g. "18" again on every evaluation.
+    """
+    compare = gb_core.compare
+    is_numeric = gb_core._is_numeric
+
+    def ordered(value, saved_groups, visited):
+        try:
+            return test(compare(value, operand))
+        except Exception:
+            return False
+
+    if is_numeric(operand):
+        return ordered
+    try:
+        coerced: Any = 0 if operand is None else float(operand)
+    except Exception:
+        coerced = _NOT_A_NUMBER
+
+    def ordered_number(value, saved_groups, visited):
+        if not is_numeric(value):
+            return ordered(value, saved_groups, visited)
+        if coerced is _NOT_A_NUMBER or (isinstance(value, float) and math.isnan(value)):
+            return False
+        return test(1 if value > coerced else -1 if value < coerced else 0)
+    return ordered_number
+
+
+# Looked up leniently so the module imports on any growthbook version
+_padded_version_string = getattr(gb_core, "_paddedVersionString", None)
+_padded_version_uncached = getattr(_padded_version_string, "__wrapped__", _padded_version_string)
+
+
+@lru_cache(maxsize=1024)
+def _padded_version(value: str) -> str:
+    # Attribute values repeat (app versions); GrowthBook's own cache is shared
+    # with every operand, so keep a separate one for attribute values
+    return _padded_version_uncached(value)
+
+
+def _version_key(value: Any) -> str:
+    """growthbook.core.paddedVersionString with a dedicated cache"""
+    if gb_core._is_numeric(value):
+        value = str(value)
+    if not value or not isinstance(value, str):
+        value = "0"
+    return _padded_version(value)
+
+
+def _compile_version(test: Callable[[str, str], bool], operand: Any) -> ValueNode:
+    """$veq/$vne/$vlt/$vlte/$vgt/$vgte with the operand version parsed once"""
+    operand_key = gb_core.paddedVersionString(operand)
+    return lambda value, saved_groups, visited: test(_version_key(value), operand_key)
+
+
+def _compile_in(values: List[Any]) -> Callable[[Any], bool]:
+    """`growthbook.core.isIn(values, x)` backed by a frozenset built once"""
+    is_in = gb_core.isIn
+    contains_boolean_or_number = gb_core._contains_boolean_or_number
+    try:
+        index = frozenset(values)
+    except TypeError:
+        # Objects or arrays in the list; keep the linear scan
+        return lambda value: is_in(values, value)
+
+    def indexed_in(value):
+        if isinstance(value, list):
+            try:
+                matches = index.intersection(value)
+            except TypeError:
+                return is_in(values, value)
+            # Python collapses booleans with 0/1; any other match is unambiguous
+            if not matches or matches.difference((0, 1)):
+                return bool(matches)
+            return any(contains_boolean_or_number(values, v) for v in value if v == 0 or v == 1)
+        if value == 0 or value == 1:
+            return contains_boolean_or_number(values, value)
+        try:
+            return value in index
+        except TypeError:
+            return value in values
+    return indexed_in
+
+
+def _fold_key(value: Any) -> Any:
+    # Case-folded value, keeping booleans apart from 0/1 like isIn(insensitive=True)
+    return (value.lower() if isinstance(value, str) else value, isinstance(value, bool))
+
+
+def _compile_in_insensitive(values: List[Any]) -> Callable[[Any], bool]:
+    """`growthbook.core.isIn(values, x, insensitive=True)` backed by a frozenset"""
+    is_in = gb_core.isIn
+    try:
+        index = frozenset(_fold_key(v) for v in values)
+    except TypeError:
+        return lambda value: is_in(values, value, insensitive=True)
+
+    def indexed_in(value):
+        try:
+            if isinstance(value, list):
+                return any(_fold_key(v) in index for v in value)
+            return _fold_key(value) in index
+        except TypeError:
+            return is_in(values, value, insensitive=True)
+    return indexed_in
+
+
+def _compile_in_group(operator: str, group_id: str) -> ValueNode:
+    """$inGroup/$notInGroup with a fast path for compacted saved groups"""
+    delegate = _delegate_operator(operator, group_id)
+    negate = operator == "$notInGroup"
+
+    def in_group(value, saved_groups, visited):
+        values = saved_groups.get(group_id) if saved_groups is not None else None
+        if isinstance(values, dict) and values.get("type") == "list":
+            values = values.get("values")
+        if type(values) is not CompactGroupValues:
+            return delegate(value, saved_groups, visited)
+        matches = values.isin(value)
+        return not matches if negate else matches
+    return in_group
+
+
+def _compile_regex(operator: str, pattern: Any) -> ValueNode:
+    """Compile the pattern once; invalid patterns never match, as in evalOperatorCondition"""
+    negate = operator in ("$notRegex", "$notRegexi")
+    try:
+        regex = re.compile(pattern, re.IGNORECASE if operator.endswith("i") else 0)
+    except Exception:
+        return (lambda value, saved_groups, visited: True) if negate else _always_false
+    search = regex.search
+
+    if negate:
+        def not_matches(value, saved_groups, visited):
+            try:
+                return not search(value)
+            except Exception:
+                # A missing (None) attribute doesn't match the regex
+                return True
+        return not_matches
+
+    def matches(value, saved_groups, visited):
+        try:
+            return bool(search(value))
+        except Exception:
+            return False
+    return matches
+
+
+def compile_condition(condition: Dict[str, Any]) -> Callable[..., bool]:
+    """Compile a condition into `matches(attributes, saved_groups=None, visited=None)`.
+
+    Equivalent to `growthbook.core.evalCondition(attributes, condition, saved_groups)`.
+    """
+    node = _compile_condition(condition)
+
+    def matches(attributes, saved_groups=None, visited=None):
+        try:
+            return node(attributes, saved_groups, visited)
+        except _EVAL_ERRORS:
+            return False
+    return matches
+
+
+# Condition digest -> compiled matcher, kept while any payload uses it
+_shared_matchers: "weakref.WeakValueDictionary[bytes, Callable[..., bool]]" = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def shared_matcher(condition: Dict[str, Any]) -> Callable[..., bool]:
+    """Like `compile_condition`, but reuse the matcher of an identical condition"""
+    try:
+        digest = hashlib.blake2b(json_codec.dumps(condition, sort_keys=True), digest_size=16).digest()
+    except (TypeError, ValueError):
+        return compile_condition(condition)
+    with _shared_lock:
+        matches = _shared_matchers.get(digest)
+    if matches is None:
+        matches = compile_condition(condition)
+        with _shared_lock:
+            matches = _shared_matchers.setdefault(digest, matches)
+    return matches
+
+
+def shared_matcher_count() -> int:
+    """Number of distinct compiled matchers currently alive"""
+    with _shared_lock:
+        return len(_shared_matchers)
+
+
+def _compile_in_place(condition: Any) -> Any:
+    """Return a CompiledCondition for `condition`, or the condition unchanged"""
+    if not isinstance(condition, dict) or not condition or type(condition) is CompiledCondition:
+        return condition
+    try:
+        return CompiledCondition(condition, shared_matcher(condition))
+    except RecursionError:
+        logger.debug("Condition too deeply nested to compile; it will be interpreted")
+        return condition
+
+
+def compile_features(features: Dict[str, Any]) -> int:
+    """Compile rule and prerequisite conditions of a feature map in place.
+
+    Returns the number of conditions compiled. Already compiled conditions
+    are left alone, so calling this again on the same features is cheap.
+    """
+    compiled = 0
+    for feature in features.values():
+        for rule in getattr(feature, "rules", None) or ():
+            condition = getattr(rule, "condition", None)
+            new_condition = _compile_in_place(condition)
+            if new_condition is not condition:
+                rule.condition = new_condition
+                compiled += 1
+            for parent in getattr(rule, "parentConditions", None) or ():
+                if isinstance(parent, dict):
+                    parent_condition = parent.get("condition")
+                    new_condition = _compile_in_place(parent_condition)
+                    if new_condition is not parent_condition:
+                        parent["condition"] = new_condition
+                        compiled += 1
+    return compiled
+
+
+def saved_group_references(condition: Any) -> Set[str]:
+    """Ids of the saved groups a condition refers to ($inGroup, $notInGroup, $savedGroup)"""
+    references: Set[str] = set()
+    stack = [condition]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ("$inGroup", "$notInGroup") and isinstance(value, str):
+                    references.add(value)
+                elif key == "$savedGroup" and isinstance(value, dict) and isinstance(value.get("id"), str):
+                    references.add(value["id"])
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+    return references
+
+
+_install_lock = threading.Lock()
+_installs = 0
+_wrapper: Optional[Callable[..., bool]] = None
+
+
+def install() -> None:
+    """Route `growthbook.core.evalCondition` calls on compiled conditions to their closure.
+
+    Every call must be paired with `uninstall`.
+    """
+    global _installs, _wrapper
+    with _install_lock:
+        _installs += 1
+        if _installs > 1 or getattr(gb_core.evalCondition, "_dispatches_compiled", False):
+            return
+        interpret = gb_core.evalCondition
+
+        def evalCondition(attributes, condition, savedGroups=None, visited=None):
+            if type(condition) is CompiledCondition:
+                return condition.matches(attributes, savedGroups, visited)
+            return interpret(attributes, condition, savedGroups, visited)
+
+        evalCondition._dispatches_compiled = True  # type: ignore[attr-defined]
+        evalCondition.__wrapped__ = interpret  # type: ignore[attr-defined]
+        gb_core.evalCondition = _wrapper = evalCondition
+
+
+def uninstall() -> None:
+    """Release one `install`; the last one restores GrowthBook's evalCondition.
+
+    Compiled conditions are still condition dicts, so features compiled
+    earlier keep evaluating correctly through the interpreter.
+    """
+    global _installs, _wrapper
+    with _install_lock:
+        if _installs == 0:
+            return
+        _installs -= 1
+        if _installs or _wrapper is None:
+            return
+        # Leave it alone if someone else has wrapped it since
+        if gb_core.evalCondition is _wrapper:
+            gb_core.evalCondition = _wrapper.__wrapped__  # type: ignore[attr-defined]
+        _wrapper = None
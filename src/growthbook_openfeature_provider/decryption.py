@@ -0,0 +1,156 @@
+"""Decrypt-once caching for encrypted feature payloads.
+
+With a `decryption_key`, every refresh of an encrypted payload runs AES
+decryption and JSON parsing on each encrypted section, even when the
+ciphertext did not change. `DecryptionCache` replaces the GrowthBook
+repository's `decrypt_response` with a version that keys each section's parsed
+plaintext on a digest of its ciphertext (and the key). An unchanged section
+then costs one hash instead of a decrypt and a parse.
+
+The repository is shared by every GrowthBook client of the same api_host and
+client_key in the process. Installs are reference-counted, and the last
+`uninstall` restores the repository's own `decrypt_response` and drops the
+cache.
+
+Cached sections are handed out as the same objects again. Downstream code
+treats payload sections as read-only, apart from replacing values with
+equivalent compiled or compacted forms, which is safe to reuse.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from growthbook.growthbook import decrypt
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+_install_lock = threading.Lock()
+
+# (encrypted key, plaintext key, whether a failure discards the payload)
+_SECTIONS = (
+    ("encryptedFeatures", "features", True),
+    ("encryptedContextualBandits", "contextualBandits", False),
+    ("encryptedSavedGroups", "savedGroups", False),
+)
+
+
+def _digest(ciphertext: str, decryption_key: str) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(decryption_key.encode("utf-8"))
+    h.update(b"\0")
+    h.update(ciphertext.encode("utf-8"))
+    return h.digest()
+
+
+class DecryptionCache:
+    """Per-section cache of decrypted and parsed payload sections"""
+
+    def __init__(self, repository: Any):
+        self._repository = repository
+        # plaintext key -> (ciphertext digest, parsed section)
+        self._sections: Dict[str, Tuple[bytes, Any]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._failures = 0
+        self._decrypt_seconds = 0.0
+        self._last_decrypt_seconds: Optional[float] = None
+        self._installs = 0
+
+    @classmethod
+    def install(cls, repository: Any) -> "DecryptionCache":
+        """Attach a cache to `repository`, or return the one already attached.
+
+        Every call must be paired with `uninstall`.
+        """
+        with _install_lock:
+            cache = repository.__dict__.get("_decryption_cache")
+            if cache is None:
+                cache = cls(repository)
+                repository._decryption_cache = cache
+                repository.decrypt_response = cache.decrypt_response
+            cache._installs += 1
+            return cache
+
+    def uninstall(self) -> None:
+        """Release one `install`; the last one restores the repository's own decryption"""
+        with _install_lock:
+            if self._installs == 0:
+                return
+            self._installs -= 1
+            if self._installs:
+                return
+            repository = self._repository
+            if repository.__dict__.get("_decryption_cache") is self:
+                del repository._decryption_cache
+            # Leave it alone if someone else has replaced it since
+            if repository.__dict__.get("decrypt_response") == self.decrypt_response:
+                del repository.decrypt_response
+        with self._lock:
+            self._sections.clear()
+
+    def decrypt_response(self, data: Dict[str, Any], decryption_key: str) -> Optional[Dict[str, Any]]:
+        """Same contract as GrowthBook's `FeatureRepository.decrypt_response`.
+
+        Decrypts the encrypted sections of `data` in place. Returns None when
+        the features fail to decrypt; other undecryptable sections are
+        dropped. Raises ValueError when a section is encrypted but no key is
+        given.
+        """
+        if "encryptedFeatures" not in data and "features" not in data:
+            logger.warning("GrowthBook API response missing features")
+        for encrypted_key, plain_key, required in _SECTIONS:
+            if encrypted_key not in data:
+                continue
+            if not decryption_key:
+                raise ValueError("Must specify decryption_key")
+            section = self._section(plain_key, data.pop(encrypted_key), decryption_key)
+            if section is not None:
+                data[plain_key] = section
+            else:
+                logger.warning(f"Failed to decrypt {plain_key} from GrowthBook API response")
+                if required:
+                    return None
+        return data
+
+    def _section(self, plain_key: str, ciphertext: Any, decryption_key: str) -> Any:
+        if not isinstance(ciphertext, str):
+            return None
+        digest = _digest(ciphertext, decryption_key)
+        with self._lock:
+            cached = self._sections.get(plain_key)
+            if cached is not None and cached[0] == digest:
+                self._hits += 1
+                return cached[1]
+
+        started = time.perf_counter()
+        try:
+            section = json_codec.loads(decrypt(ciphertext, decryption_key))
+        except Exception:
+            section = None
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._misses += 1
+            self._decrypt_seconds += elapsed
+            self._last_decrypt_seconds = elapsed
+            if section is None:
+                self._failures += 1
+            else:
+                self._sections[plain_key] = (digest, section)
+        return section
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and time spent decrypting and parsing"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "failures": self._failures,
+                "decrypt_seconds": self._decrypt_seconds,
+                "last_decrypt_seconds": self._last_decrypt_seconds,
+            }
@@ -0,0 +1,208 @@
+"""Conditional feature fetches over pooled keep-alive connections.
+
+GrowthBook's async feature repository opens a new `aiohttp.ClientSession` (so
+a new TCP and TLS handshake) for every fetch. On a 304 it hands the cached
+payload back as if it were new, and that payload is then decrypted, diffed and
+applied again. `ConditionalFetcher`:
+
+* reuses one keep-alive `ClientSession` per api_host and event loop, shared by
+  every repository that fetches from that host on the loop
+* sends `If-None-Match` with the last ETag. `fetch_payload` tells its caller
+  when the answer was a 304, so the provider's own refreshes skip parsing,
+  decryption, diffing and recompilation.
+* optionally rejects payloads larger than `max_payload_bytes` before reading
+  them in full, so one oversized payload cannot exhaust memory
+
+GrowthBook shares one repository per (api_host, client_key) between every
+client in the process. `install` replaces that repository's
+`_fetch_and_decode_async` with `fetch`, which keeps GrowthBook's contract (a
+304 returns the payload last received), and the last `uninstall` restores the
+original method.
+"""
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+_CONNECT_TIMEOUT = 10.0
+_READ_TIMEOUT = 30.0
+_KEEPALIVE_TIMEOUT = 120.0
+
+# event loop -> api_host -> session
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, aiohttp.ClientSession]]" = (
+    weakref.WeakKeyDictionary()
+)
+_sessions_lock = threading.Lock()
+_install_lock = threading.Lock()
+
+
+def get_session(api_host: str) -> aiohttp.ClientSession:
+    """Return the pooled keep-alive session for `api_host` on the running loop"""
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        by_host = _sessions.setdefault(loop, {})
+        session = by_host.get(api_host)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(keepalive_timeout=_KEEPALIVE_TIMEOUT),
+                timeout=aiohttp.ClientTimeout(sock_connect=_CONNECT_TIMEOUT, sock_read=_READ_TIMEOUT),
+            )
+            by_host[api_host] = session
+        return session
+
+
+async def close_sessions() -> None:
+    """Close the pooled sessions of the running loop"""
+    with _sessions_lock:
+        by_host = _sessions.pop(asyncio.get_running_loop(), {})
+    for session in by_host.values():
+        await session.close()
+
+
+class FetchError(Exception):
+    """A feature fetch failed or returned an undecodable payload"""
+
+
+class ConditionalFetcher:
+    """ETag-aware replacement for a GrowthBook repository's payload fetch"""
+
+    def __init__(self, repository: Any):
+        self._repository = repository
+        # url -> (ETag, payload received with it)
+        self._etags: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._installs = 0
+        self._requests = 0
+        self._not_modified = 0
+        self._failures = 0
+        self._bytes_received = 0
+        self._payload_bytes: Optional[int] = None
+        self.max_payload_bytes: Optional[int] = None
+
+    @classmethod
+    def install(cls, repository: Any) -> "ConditionalFetcher":
+        """Attach a fetcher to `repository`, or return the one already attached.
+
+        GrowthBook shares one repository per (api_host, client_key), so the
+        fetcher and its ETags are shared the same way. Every call must be
+        paired with `uninstall`.
+        """
+        with _install_lock:
+            fetcher = repository.__dict__.get("_conditional_fetcher")
+            if fetcher is None:
+                fetcher = cls(repository)
+                repository._conditional_fetcher = fetcher
+                repository._fetch_and_decode_async = fetcher.fetch
+            fetcher._installs += 1
+            return fetcher
+
+    def uninstall(self) -> None:
+        """Release one `install`; the last one restores the repository's own fetch"""
+        with _install_lock:
+            if self._installs == 0:
+                return
+            self._installs -= 1
+            if self._installs:
+                return
+            repository = self._repository
+            if repository.__dict__.get("_conditional_fetcher") is self:
+                del repository._conditional_fetcher
+            # Leave it alone if someone else has replaced it since
+            if repository.__dict__.get("_fetch_and_decode_async") == self.fetch:
+                del repository._fetch_and_decode_async
+
+    async def fetch(self, api_host: str, client_key: str) -> Optional[Dict[str, Any]]:
+        """Same contract as GrowthBook's `_fetch_and_decode_async`.
+
+        Returns the payload (on a 304, the one last received) or None on failure.
+        """
+        try:
+            payload, _ = await self.fetch_payload(api_host, client_key)
+        except FetchError as e:
+            logger.warning(str(e))
+            return None
+        return payload
+
+    async def fetch_payload(self, api_host: str, client_key: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Fetch the payload.
+
+        Returns:
+            (payload, modified). On a 304 `modified` is False and the payload
+            is the one last received for the URL.
+
+        Raises:
+            FetchError: If the request fails or the response cannot be decoded
+        """
+        url = self._repository._get_features_url(api_host, client_key)
+        headers = self._repository._get_headers(client_key=client_key)
+        with self._lock:
+            known = self._etags.get(url)
+            self._requests += 1
+        if known is not None:
+            headers["If-None-Match"] = known[0]
+
+        try:
+            async with get_session(api_host).get(url, headers=headers) as response:
+                if response.status == 304 and known is not None:
+                    with self._lock:
+                        self._not_modified += 1
+                    logger.debug("Features not modified since the last fetch")
+                    return known[1], False
+                if response.status >= 400:
+                    raise FetchError(f"Failed to fetch features, received status code {response.status}")
+                body = await self._read_body(response)
+                decoded = json_codec.loads(body)
+                with self._lock:
+                    self._bytes_received += len(body)
+                    self._payload_bytes = len(body)
+                    new_etag = response.headers.get("ETag")
+                    if new_etag:
+                        self._etags[url] = (new_etag, decoded)
+                    else:
+                        self._etags.pop(url, None)
+                return decoded, True
+        except FetchError:
+            self._record_failure()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._record_failure()
+            raise FetchError(f"HTTP request failed: {e}") from e
+        except ValueError as e:
+            self._record_failure()
+            raise FetchError(f"Failed to decode feature JSON from GrowthBook API: {e}") from e
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        limit = self.max_payload_bytes
+        if limit is None:
+            return await response.read()
+        too_large = FetchError(f"Feature payload exceeds max_payload_bytes ({limit})")
+        if response.content_length is not None and response.content_length > limit:
+            raise too_large
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(65536):
+            body += chunk
+            if len(body) > limit:
+                raise too_large
+        return bytes(body)
+
+    def _record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request, 304 and failure counters"""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "not_modified": self._not_modified,
+                "failures": self._failures,
+                "bytes_received": self._bytes_received,
+                "payload_bytes": self._payload_bytes,
+            }
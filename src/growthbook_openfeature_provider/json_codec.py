@@ -0,0 +1,113 @@
+"""JSON codec used wherever the provider parses or writes feature payloads.
+
+Payload fetches, stream events, decrypted sections, bootstrap/fallback files
+and the on-disk snapshot all go through `loads` and `dumps`. When orjson is
+installed (`pip install growthbook-openfeature-provider[orjson]`) it is used
+by default, since it parses and writes multi-megabyte payloads faster than
+the standard library (see benchmarks/bench_json_codec.py). Otherwise the
+standard `json` module is used.
+
+The orjson codec falls back to `json` for input orjson rejects but `json`
+accepts, such as NaN/Infinity literals, and for objects with non-string keys
+when serializing. Switching codecs therefore does not change which payloads
+load. One difference remains: depending on the orjson version, integers
+beyond 64 bits are parsed as floats or trigger the fallback.
+
+The codec is process-wide; select one with `set_codec("json")`,
+`set_codec("orjson")` or `set_codec("auto")`, or pass any object with
+`name`, `loads` and `dumps` in the shape of `JSONCodec`.
+"""
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore
+
+
+class JSONCodec:
+    """Standard library codec; base class for custom codecs"""
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def dumps(self, obj: Any, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """Serialize compactly to UTF-8 bytes"""
+        return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), default=default).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """orjson codec with a standard library fallback"""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError(
+                "The orjson codec requires orjson. "
+                "Install it with `pip install growthbook-openfeature-provider[orjson]`"
+            )
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+    def dumps(self, obj: Any, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        def convert(value: Any) -> Any:
+            # orjson reads list and dict subclasses from their internal storage,
+            # which is empty for CompactGroupValues; hand it plain copies instead
+            if isinstance(value, dict):
+                return dict(value)
+            if isinstance(value, (list, tuple)):
+                return list(value)
+            for base in (str, int, float):
+                if isinstance(value, base):
+                    return base(value)
+            if default is not None:
+                return default(value)
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+        option = orjson.OPT_PASSTHROUGH_SUBCLASS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=convert, option=option)
+        except TypeError:
+            return super().dumps(obj, sort_keys=sort_keys, default=default)
+
+
+_codec: JSONCodec = OrjsonCodec() if orjson is not None else JSONCodec()
+
+
+def set_codec(codec: Union[str, JSONCodec]) -> JSONCodec:
+    """Select the process-wide codec: "auto", "orjson", "json" or a codec object"""
+    global _codec
+    if codec == "auto":
+        codec = OrjsonCodec() if orjson is not None else JSONCodec()
+    elif codec == "orjson":
+        codec = OrjsonCodec()
+    elif codec == "json":
+        codec = JSONCodec()
+    elif isinstance(codec, str):
+        raise ValueError(f"Unknown JSON codec: {codec!r}")
+    _codec = codec
+    return codec
+
+
+def get_codec() -> JSONCodec:
+    return _codec
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    return _codec.loads(data)
+
+
+def dumps(obj: Any, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    return _codec.dumps(obj, sort_keys=sort_keys, default=default)
@@ -0,0 +1,439 @@
+"""Serve many GrowthBook SDK client keys from one provider.
+
+A platform with one GrowthBook environment per customer would otherwise run
+one `GrowthBookProvider` per client key, each with its own event loop thread,
+bridge executor, connection pool and refresh loop. `MultiTenantProvider`
+keeps a `GrowthBookProvider` per tenant, but runs them all on shared
+infrastructure:
+
+* one event loop thread, on which every tenant's client and refresh task run
+* one pooled keep-alive session per API host (see fetcher.py), since pooling
+  is per loop
+* one bridge executor for sync calls made from async code
+* one refresh timer (a `RefreshGroup`, see refresh.py) for every tenant's
+  jittered refresh schedule
+* one limit on concurrent fetches across tenants (`max_concurrent_refreshes`),
+  so hundreds of tenants never hit the API all at once
+
+Compiled targeting conditions (`compile_conditions=True`) are shared by content (see
+`conditions.shared_matcher`), so tenants serving identical payloads hold one
+copy of the compiled code.
+
+Evaluations are routed by an evaluation context attribute (`tenant_attribute`).
+For OpenFeature domains, register each tenant on its own:
+`api.set_provider(multi.tenant("acme"), domain="acme")`. The registry then
+waits for the tenant's initialization and, when the domain is cleared or
+OpenFeature shuts down, closes the tenant.
+
+Each tenant's memory is bounded by its options. `max_payload_bytes` rejects
+oversized payloads on the wire, before they are read. `max_payload_memory_bytes`
+is the tenant's memory budget: a payload whose parsed, compacted form would
+exceed it is not applied. Either way the tenant keeps serving its current
+features. `result_cache_size` bounds its result cache. Compiled conditions are
+shared between tenants and not counted against any one of them.
+"""
+import asyncio
+import dataclasses
+import functools
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from openfeature.evaluation_context import EvaluationContext
+from openfeature.event import ProviderEvent, ProviderEventDetails
+from openfeature.flag_evaluation import ErrorCode, FlagResolutionDetails, Reason
+from openfeature.hook import Hook
+from openfeature.provider import AbstractProvider, Metadata
+
+from .fetcher import close_sessions
+from .provider import (
+    GrowthBookProvider,
+    GrowthBookProviderOptions,
+    _BoundedExecutor,
+    _EventLoopThread,
+    run_async_legacy,
+)
+from .refresh import RefreshGroup
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MultiTenantProviderOptions:
+    """Configuration options for MultiTenantProvider.
+
+    Args:
+        tenant_attribute: Evaluation context attribute holding the tenant name
+            (default: "tenant")
+        default_tenant: Tenant for evaluations without that attribute; None
+            returns the default value with an INVALID_CONTEXT error (default: None)
+        max_concurrent_refreshes: Feature fetches allowed in flight at once
+            across all tenants (default: 8)
+        max_payload_bytes: Payload size limit for tenants that do not set their
+            own `max_payload_bytes`, None disables (default: None)
+        max_payload_memory_bytes: Memory budget of the parsed payload for
+            tenants that do not set their own `max_payload_memory_bytes`, None
+            disables (default: None)
+        bridge_max_workers: Threads used to run sync calls made from async code (default: 4)
+        bridge_max_queue: Sync calls allowed to wait for a bridge thread or the
+            loop thread (default: 64)
+        bridge_overflow_policy: "block" to wait for a free slot, or "default" to
+            return the default value when the bridge queue is full (default: "block")
+    """
+    tenant_attribute: str = "tenant"
+    default_tenant: Optional[str] = None
+    max_concurrent_refreshes: int = 8
+    max_payload_bytes: Optional[int] = None
+    max_payload_memory_bytes: Optional[int] = None
+    bridge_max_workers: int = 4
+    bridge_max_queue: int = 64
+    bridge_overflow_policy: str = "block"
+
+
+class MultiTenantProvider(AbstractProvider):
+    """OpenFeature provider serving one GrowthBook client key per tenant.
+
+    Example usage:
+    ```python
+    provider = MultiTenantProvider(
+        MultiTenantProviderOptions(tenant_attribute="tenant"),
+        tenants={
+            "acme": GrowthBookProviderOptions(api_host=API_HOST, client_key="sdk-acme"),
+            "globex": GrowthBookProviderOptions(api_host=API_HOST, client_key="sdk-globex"),
+        },
+    )
+    api.set_provider_and_wait(provider)
+
+    context = EvaluationContext(targeting_key="user-1", attributes={"tenant": "acme"})
+    api.get_client().get_boolean_value("new-checkout", False, context)
+    ```
+    """
+
+    def __init__(
+        self,
+        options: Optional[MultiTenantProviderOptions] = None,
+        tenants: Optional[Dict[str, GrowthBookProviderOptions]] = None,
+    ):
+        if options is not None and options.max_concurrent_refreshes < 1:
+            raise ValueError("max_concurrent_refreshes must be at least 1")
+        self.options = options or MultiTenantProviderOptions()
+        self.initialized = False
+        self._loop_thread = _EventLoopThread(name="growthbook-multi-tenant-loop")
+        self._bridge_executor = _BoundedExecutor(
+            max_workers=self.options.bridge_max_workers,
+            max_queue=self.options.bridge_max_queue,
+            overflow_policy=self.options.bridge_overflow_policy
+        )
+        # Created on the shared loop, see _initialize_tenant
+        self._refresh_limiter: Optional[asyncio.Semaphore] = None
+        self._refresh_group = RefreshGroup()
+        self._tenants: Dict[str, GrowthBookProvider] = {}
+        # Initialization of each started tenant, see _start_tenant
+        self._started: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        for name, tenant_options in (tenants or {}).items():
+            self.add_tenant(name, tenant_options)
+
+    def add_tenant(self, name: str, options: GrowthBookProviderOptions) -> GrowthBookProvider:
+        """Register a tenant and return its provider.
+
+        Tenants added after initialize start loading in the background right
+        away; they report readiness through their own provider events.
+        """
+        if options.max_payload_bytes is None and self.options.max_payload_bytes is not None:
+            options = dataclasses.replace(options, max_payload_bytes=self.options.max_payload_bytes)
+        if options.max_payload_memory_bytes is None and self.options.max_payload_memory_bytes is not None:
+            options = dataclasses.replace(options, max_payload_memory_bytes=self.options.max_payload_memory_bytes)
+        tenant = GrowthBookProvider(options)
+        tenant._loop_thread = self._loop_thread
+        tenant._bridge_executor = self._bridge_executor
+        tenant._refresh_group = self._refresh_group
+        tenant._shared_runtime = True
+        tenant._owner_initialize = functools.partial(self._start_tenant, name)
+        # Not attach(): OpenFeature's registry attaches a tenant registered
+        # for a domain, which would replace the forwarding
+        tenant._event_listeners.append(self._forward_tenant_event(name))
+        with self._lock:
+            if name in self._tenants:
+                raise ValueError(f"Tenant {name!r} is already registered")
+            self._tenants[name] = tenant
+            initialized = self.initialized
+        if initialized:
+            self._start_tenant(name)
+        return tenant
+
+    async def remove_tenant(self, name: str) -> None:
+        """Close a tenant and stop routing evaluations to it"""
+        with self._lock:
+            tenant = self._tenants.pop(name)
+            started = self._started.pop(name, None)
+        if started is not None:
+            started.cancel()
+        tenant._event_listeners.clear()
+        await tenant.close()
+
+    def tenant(self, name: str) -> GrowthBookProvider:
+        """Return a tenant's provider, e.g. to register it for an OpenFeature domain"""
+        return self._tenants[name]
+
+    def tenants(self) -> List[str]:
+        """Return the names of the registered tenants"""
+        with self._lock:
+            return list(self._tenants)
+
+    def initialize(self, evaluation_context: Optional[EvaluationContext] = None) -> None:
+        """Initialize every registered tenant on the shared loop thread.
+
+        Called by OpenFeature's registry (`api.set_provider`), this blocks
+        until the tenants finished loading, also from a running event loop,
+        and leaves PROVIDER_READY to the registry. From async code,
+        `await initialize_async()` initializes without blocking the loop.
+        """
+        for started in self._start_tenants():
+            started.result()
+
+    async def initialize_async(self) -> None:
+        """Initialize every registered tenant and emit PROVIDER_READY"""
+        await asyncio.gather(*(asyncio.wrap_future(started) for started in self._start_tenants()))
+        self._emit_ready()
+
+    def initialize_sync(self):
+        """Synchronous initialization for non-async contexts"""
+        for started in self._start_tenants():
+            started.result()
+        self._emit_ready()
+
+    def _start_tenants(self) -> List[Future]:
+        """Start every tenant not started yet; returns the initialization of each"""
+        with self._lock:
+            # Tenants added from now on are started by add_tenant
+            self.initialized = True
+            names = list(self._tenants)
+        return [self._start_tenant(name) for name in names]
+
+    def _start_tenant(self, name: str) -> Future:
+        """Start initializing a tenant on the shared loop, once; returns its initialization"""
+        self._loop_thread.start()
+        with self._lock:
+            started = self._started.get(name)
+            if started is None:
+                tenant = self._tenants[name]
+                started = asyncio.run_coroutine_threadsafe(
+                    self._initialize_tenant(name, tenant), self._loop_thread.loop
+                )
+                self._started[name] = started
+            return started
+
+    def _emit_ready(self) -> None:
+        with self._lock:
+            tenants = list(self._tenants.values())
+        ready = sum(1 for tenant in tenants if tenant.initialized)
+        self.emit_provider_ready(ProviderEventDetails(
+            message=f"{ready} of {len(tenants)} tenants loaded features"
+        ))
+
+    async def _initialize_tenant(self, name: str, tenant: GrowthBookProvider) -> None:
+        if self._refresh_limiter is None:
+            self._refresh_limiter = asyncio.Semaphore(self.options.max_concurrent_refreshes)
+        tenant._refresh_limiter = self._refresh_limiter
+        try:
+            async with self._refresh_limiter:
+                await tenant._initialize()
+        except Exception as e:
+            logger.error(f"Failed to initialize tenant {name!r}: {e}")
+
+    def _forward_tenant_event(self, name: str):
+        """Re-emit a tenant's configuration changes, tagged with the tenant name.
+
+        Readiness and staleness stay per tenant: one tenant failing to refresh
+        does not make the others stale.
+        """
+        def on_emit(provider: Any, event: ProviderEvent, details: ProviderEventDetails) -> None:
+            if event != ProviderEvent.PROVIDER_CONFIGURATION_CHANGED:
+                return
+            self.emit_provider_configuration_changed(ProviderEventDetails(
+                flags_changed=details.flags_changed,
+                message=details.message,
+                metadata={**(details.metadata or {}), "tenant": name}
+            ))
+        return on_emit
+
+    def _route(self, evaluation_context: Optional[EvaluationContext]) -> Optional[GrowthBookProvider]:
+        name = None
+        if evaluation_context is not None:
+            name = evaluation_context.attributes.get(self.options.tenant_attribute)
+        if name is None:
+            name = self.options.default_tenant
+        if not isinstance(name, str):
+            return None
+        return self._tenants.get(name)
+
+    def _unknown_tenant(self, default_value: Any, evaluation_context: Optional[EvaluationContext]) -> FlagResolutionDetails:
+        name = evaluation_context.attributes.get(self.options.tenant_attribute) if evaluation_context else None
+        return FlagResolutionDetails(
+            value=default_value,
+            reason=Reason.ERROR,
+            error_code=ErrorCode.INVALID_CONTEXT,
+            error_message=f"Unknown tenant {name!r}" if name is not None
+            else f"Evaluation context has no {self.options.tenant_attribute!r} attribute"
+        )
+
+    def _resolve(self, method: str, flag_key: str, default_value: Any, evaluation_context: Optional[EvaluationContext]):
+        tenant = self._route(evaluation_context)
+        if tenant is None:
+            return self._unknown_tenant(default_value, evaluation_context)
+        return getattr(tenant, method)(flag_key, default_value, evaluation_context)
+
+    async def _resolve_async(self, method: str, flag_key: str, default_value: Any, evaluation_context: Optional[EvaluationContext]):
+        tenant = self._route(evaluation_context)
+        if tenant is None:
+            return self._unknown_tenant(default_value, evaluation_context)
+        return await getattr(tenant, method)(flag_key, default_value, evaluation_context)
+
+    def resolve_boolean_details(
+        self,
+        flag_key: str,
+        default_value: bool,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[bool]:
+        """Synchronous boolean flag evaluation"""
+        return self._resolve("resolve_boolean_details", flag_key, default_value, evaluation_context)
+
+    async def resolve_boolean_details_async(
+        self,
+        flag_key: str,
+        default_value: bool,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[bool]:
+        """Asynchronous boolean flag evaluation"""
+        return await self._resolve_async("resolve_boolean_details_async", flag_key, default_value, evaluation_context)
+
+    def resolve_string_details(
+        self,
+        flag_key: str,
+        default_value: str,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[str]:
+        """Synchronous string flag evaluation"""
+        return self._resolve("resolve_string_details", flag_key, default_value, evaluation_context)
+
+    async def resolve_string_details_async(
+        self,
+        flag_key: str,
+        default_value: str,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[str]:
+        """Asynchronous string flag evaluation"""
+        return await self._resolve_async("resolve_string_details_async", flag_key, default_value, evaluation_context)
+
+    def resolve_integer_details(
+        self,
+        flag_key: str,
+        default_value: int,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[int]:
+        """Synchronous integer flag evaluation"""
+        return self._resolve("resolve_integer_details", flag_key, default_value, evaluation_context)
+
+    async def resolve_integer_details_async(
+        self,
+        flag_key: str,
+        default_value: int,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[int]:
+        """Asynchronous integer flag evaluation"""
+        return await self._resolve_async("resolve_integer_details_async", flag_key, default_value, evaluation_context)
+
+    def resolve_float_details(
+        self,
+        flag_key: str,
+        default_value: float,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[float]:
+        """Synchronous float flag evaluation"""
+        return self._resolve("resolve_float_details", flag_key, default_value, evaluation_context)
+
+    async def resolve_float_details_async(
+        self,
+        flag_key: str,
+        default_value: float,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[float]:
+        """Asynchronous float flag evaluation"""
+        return await self._resolve_async("resolve_float_details_async", flag_key, default_value, evaluation_context)
+
+    def resolve_object_details(
+        self,
+        flag_key: str,
+        default_value: Any,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[Any]:
+        """Synchronous object flag evaluation"""
+        return self._resolve("resolve_object_details", flag_key, default_value, evaluation_context)
+
+    async def resolve_object_details_async(
+        self,
+        flag_key: str,
+        default_value: Any,
+        evaluation_context: Optional[EvaluationContext] = None,
+    ) -> FlagResolutionDetails[Any]:
+        """Asynchronous object flag evaluation"""
+        return await self._resolve_async("resolve_object_details_async", flag_key, default_value, evaluation_context)
+
+    def resolve_all(self, evaluation_context: Optional[EvaluationContext] = None) -> Dict[str, Dict[str, Any]]:
+        """Evaluate all flags of the context's tenant; empty for an unknown tenant"""
+        tenant = self._route(evaluation_context)
+        return tenant.resolve_all(evaluation_context) if tenant is not None else {}
+
+    def get_tenant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-tenant readiness, fetch (including payload size), memory and refresh statistics"""
+        with self._lock:
+            tenants = dict(self._tenants)
+        return {
+            name: {
+                "initialized": tenant.initialized,
+                "fetch": tenant.get_fetch_stats(),
+                "memory": tenant.get_memory_stats(),
+                "refresh": tenant.get_refresh_stats(),
+            }
+            for name, tenant in tenants.items()
+        }
+
+    def get_bridge_stats(self) -> Dict[str, Any]:
+        """Return counters for the shared sync-from-async bridge executor"""
+        return self._bridge_executor.stats()
+
+    def get_metadata(self) -> Metadata:
+        """Return provider metadata"""
+        return Metadata(name="GrowthBook Multi-Tenant Provider")
+
+    def get_provider_hooks(self) -> List[Hook]:
+        """Return provider hooks"""
+        return []
+
+    def shutdown(self) -> None:
+        """Close the provider when OpenFeature shuts it down"""
+        run_async_legacy(self.close(), executor=self._bridge_executor)
+
+    async def close(self):
+        """Close every tenant, then the shared refresh timer, sessions, loop thread and executor"""
+        with self._lock:
+            tenants = list(self._tenants.values())
+            started = list(self._started.values())
+            self._tenants.clear()
+            self._started.clear()
+            self.initialized = False
+        for future in started:
+            future.cancel()
+        for tenant in tenants:
+            tenant._event_listeners.clear()
+        await asyncio.gather(*(tenant.close() for tenant in tenants))
+        loop = self._loop_thread.loop
+        if self._loop_thread.is_running() and loop is not None:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._refresh_group.close(), loop))
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(close_sessions(), loop))
+        self._loop_thread.stop()
+        self._bridge_executor.shutdown()
+        self._refresh_limiter = None
@@ -0,0 +1,101 @@
+"""Process-pool bulk evaluation.
+
+Each worker receives the feature payload once, through the pool initializer,
+and keeps it in a module-level evaluation context. Tasks only carry the flag
+key and a chunk of user attributes, and return compact result tuples.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import multiprocessing
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openfeature.flag_evaluation import FlagResolutionDetails
+from growthbook.common_types import GlobalContext, Options, StackContext, UserContext
+from growthbook.common_types import EvaluationContext as GBEvaluationContext
+from growthbook.core import eval_feature as core_eval_feature
+
+# Evaluation context owned by the current worker process
+_worker_context: Optional[GBEvaluationContext] = None
+
+
+def _init_worker(features: Dict[str, Any], saved_groups: Dict[str, Any], options: Dict[str, Any]) -> None:
+    global _worker_context
+    _worker_context = GBEvaluationContext(
+        user=UserContext(),
+        global_ctx=GlobalContext(
+            options=Options(**options), features=features, saved_groups=saved_groups
+        ),
+        stack=StackContext(evaluated_features=set()),
+    )
+
+
+def _evaluate_chunk(flag_key: str, attributes_chunk: List[Dict[str, Any]], default_value: Any) -> List[Tuple]:
+    from .provider import GrowthBookProvider
+
+    value_converter = (lambda x: x) if default_value is None else type(default_value)
+    context = _worker_context
+    results = []
+    for attributes in attributes_chunk:
+        try:
+            context.user = UserContext(attributes=attributes)
+            context.stack = StackContext(evaluated_features=set())
+            feature_result = core_eval_feature(flag_key, context)
+            details = GrowthBookProvider._build_resolution_details(
+                feature_result, default_value, value_converter
+            )
+        except Exception as e:
+            details = GrowthBookProvider._error_details(default_value, e)
+        results.append(
+            (details.value, details.variant, details.reason, details.error_code, details.error_message)
+        )
+    return results
+
+
+def evaluate_in_processes(
+    global_context: GlobalContext,
+    flag_key: str,
+    attributes: Iterable[Dict[str, Any]],
+    default_value: Any = None,
+    processes: Optional[int] = None,
+    chunk_size: int = 1000,
+    mp_context: Any = None,
+) -> Iterator[FlagResolutionDetails]:
+    """Evaluate `flag_key` for each attributes dict on a process pool, in order"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    processes = processes or os.cpu_count() or 1
+    if isinstance(mp_context, str):
+        mp_context = multiprocessing.get_context(mp_context)
+
+    options = {
+        "enabled": global_context.options.enabled,
+        "qa_mode": global_context.options.qa_mode,
+    }
+    initargs = (global_context.features, global_context.saved_groups, options)
+
+    attributes = iter(attributes)
+    # Keep every worker busy while bounding the number of buffered chunks
+    max_pending = processes * 2
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=mp_context,
+        initializer=_init_worker, initargs=initargs
+    ) as pool:
+        pending: deque = deque()
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(islice(attributes, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_evaluate_chunk, flag_key, chunk, default_value))
+            if not pending:
+                break
+            for value, variant, reason, error_code, error_message in pending.popleft().result():
+                yield FlagResolutionDetails(
+                    value=value,
+                    variant=variant,
+                    reason=reason,
+                    error_code=error_code,
+                    error_message=error_message
+                )
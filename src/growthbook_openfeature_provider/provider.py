@@ -1,13 +1,27 @@
-from typing import List, Optional, Union, Dict, Any, Callable
+from typing import List, Optional, Union, Dict, Any, Callable, Iterable, Iterator, Tuple
 from dataclasses import dataclass, field
 import asyncio
+import gc
+import hashlib
+import inspect
 import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
 import traceback
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 
 # OpenFeature imports - based on openfeature-sdk>=0.8.1
 from openfeature.provider import AbstractProvider, Metadata
 from openfeature.evaluation_context import EvaluationContext
 from openfeature.hook import Hook
+from openfeature.event import ProviderEvent, ProviderEventDetails
+from openfeature.exception import ProviderNotReadyError
 from openfeature.flag_evaluation import (
     FlagResolutionDetails,
     Reason,
@@ -16,9 +30,20 @@ from openfeature.flag_evaluation import (
 
 # GrowthBook imports from the multi-context branch
 from growthbook.growthbook_client import GrowthBookClient
-from growthbook.common_types import Options, UserContext, Experiment
+from growthbook.common_types import Options, UserContext, Experiment, StackContext
+from growthbook.common_types import EvaluationContext as GBEvaluationContext
+from growthbook.core import eval_feature as core_eval_feature
 from growthbook import AbstractStickyBucketService
 
+from . import conditions, json_codec
+from .decryption import DecryptionCache
+from .fetcher import ConditionalFetcher, FetchError, close_sessions
+from .refresh import RefreshGroup, RefreshScheduler
+from .saved_groups import CompactGroupValues, compact_saved_groups
+from .saved_groups import missing_core_functions as compaction_missing_functions
+from .snapshot_store import FeatureSnapshotStore
+from .streaming import FeatureStream
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -34,6 +59,62 @@ class GrowthBookProviderOptions:
         qa_mode: Enable QA mode for testing (default: False)
         on_experiment_viewed: Optional callback when experiments are viewed
         sticky_bucket_service: Optional service for consistent experiment assignments
+        bridge_max_workers: Threads used to run sync calls made from async code (default: 4)
+        bridge_max_queue: Sync calls allowed to wait for a bridge thread or the
+            loop thread (default: 64)
+        bridge_overflow_policy: "block" to wait for a free slot, or "default" to
+            return the default value when the bridge queue is full (default: "block")
+        result_cache_size: Resolved (flag, context, type) results to keep, 0 disables (default: 0).
+            Cleared whenever the feature payload changes; evaluations that fire
+            experiment tracking and object (dict/list) values are never cached.
+        bootstrap_payload: Optional feature payload (a dict, or a path to a JSON
+            file) to serve immediately on initialize; the network fetch then
+            happens in the background
+        snapshot_path: Optional path of an on-disk feature snapshot shared by
+            worker processes; only one process fetches from GrowthBook and the
+            others read the snapshot
+        snapshot_poll_interval: Seconds between snapshot checks in processes
+            that read it (default: 5)
+        blocking_init: Whether initialize waits for the first fetch; when False it
+            returns immediately and readiness is reported through PROVIDER_READY /
+            PROVIDER_ERROR events (default: True)
+        init_timeout: Optional deadline in seconds for the first fetch, after which
+            `fallback_payload` is served (or PROVIDER_ERROR emitted); the fetch
+            keeps running in the background
+        fallback_payload: Optional feature payload (a dict, or a path to a JSON
+            file) served when the first fetch fails or misses `init_timeout`
+        compile_conditions: Compile targeting conditions into closures once per
+            feature payload instead of interpreting them on every evaluation.
+            Wraps `growthbook.core.evalCondition` process-wide while the
+            provider is open; plain conditions of other clients still go to
+            the original function (default: False)
+        compact_saved_groups: Saved groups with at least this many values are
+            stored in compact sorted arrays, 0 disables (default: 0)
+        saved_group_bloom_bits: Bits per value of a Bloom filter placed in front
+            of compacted saved groups, 0 disables (default: 0)
+        streaming: Subscribe to GrowthBook's server-sent event stream and apply
+            updates as they arrive, instead of polling every `cache_ttl`
+            seconds (default: False)
+        stream_reconnect_delay: First reconnect delay in seconds after the
+            stream drops; doubled on each failed attempt (default: 1)
+        stream_max_reconnect_delay: Upper bound of the reconnect delay in
+            seconds (default: 60)
+        stream_idle_timeout: Reconnect when the stream is silent for this many
+            seconds, None waits forever (default: None)
+        refresh_jitter: Randomize each refresh delay by up to this fraction of
+            it, so processes started together do not refresh in lockstep; 0
+            refreshes exactly every `cache_ttl` seconds (default: 0.1)
+        refresh_backoff: Delay in seconds before retrying a failed refresh;
+            doubled on each consecutive failure (default: 1)
+        refresh_max_backoff: Upper bound of the retry delay in seconds (default: 300)
+        max_payload_bytes: Reject fetched or streamed feature payloads larger
+            than this many bytes and keep serving the current one, None
+            disables (default: None)
+        max_payload_memory_bytes: Reject feature payloads whose parsed form
+            would take more than this many bytes of memory and keep serving the
+            current one, None disables (default: None). Compacted saved groups
+            count at their compact size; compiled conditions, which are shared
+            by content, are not counted. Measuring walks every update once.
     """
     api_host: str
     client_key: str
@@ -43,8 +124,239 @@ class GrowthBookProviderOptions:
     qa_mode: bool = False
     on_experiment_viewed: Optional[Callable[[Experiment], None]] = None
     sticky_bucket_service: Optional[AbstractStickyBucketService] = None
+    bridge_max_workers: int = 4
+    bridge_max_queue: int = 64
+    bridge_overflow_policy: str = "block"
+    result_cache_size: int = 0
+    bootstrap_payload: Optional[Union[Dict[str, Any], str]] = None
+    snapshot_path: Optional[str] = None
+    snapshot_poll_interval: float = 5.0
+    blocking_init: bool = True
+    init_timeout: Optional[float] = None
+    fallback_payload: Optional[Union[Dict[str, Any], str]] = None
+    compile_conditions: bool = False
+    compact_saved_groups: int = 0
+    saved_group_bloom_bits: int = 0
+    streaming: bool = False
+    stream_reconnect_delay: float = 1.0
+    stream_max_reconnect_delay: float = 60.0
+    stream_idle_timeout: Optional[float] = None
+    refresh_jitter: float = 0.1
+    refresh_backoff: float = 1.0
+    refresh_max_backoff: float = 300.0
+    max_payload_bytes: Optional[int] = None
+    max_payload_memory_bytes: Optional[int] = None
+
+
+_FLAT_ATTRIBUTE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Payload sections a (decrypted) update may carry
+_PAYLOAD_SECTIONS = ("features", "savedGroups", "contextualBandits")
+
+
+def _copy_details(details: FlagResolutionDetails) -> FlagResolutionDetails:
+    """Copy of resolution details with its own metadata dict (the value is shared)"""
+    return FlagResolutionDetails(
+        value=details.value,
+        error_code=details.error_code,
+        error_message=details.error_message,
+        reason=details.reason,
+        variant=details.variant,
+        flag_metadata=dict(details.flag_metadata),
+    )
+
+
+def _retained_bytes(value: Any) -> int:
+    """Return the approximate memory held by a parsed JSON value.
+
+    Objects reachable more than once are counted once. A CompactGroupValues
+    counts at its compact size (see its __sizeof__) and is not iterated.
+    """
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)) and not isinstance(item, CompactGroupValues):
+            stack.extend(item)
+    return total
+
+
+def _context_fingerprint(evaluation_context: Optional[EvaluationContext]) -> Any:
+    """Return a hashable fingerprint of an OpenFeature evaluation context.
+
+    Flat contexts (scalar attribute values) are keyed by their keys, values
+    and value types, which keeps 1, 1.0 and True apart. Contexts with nested
+    values are keyed by the repr of their attributes, which does the same for
+    nested builtin values. Contexts that only differ in attribute order get
+    different keys, which only costs a cache miss.
+    """
+    if not evaluation_context:
+        return None
+    attributes = evaluation_context.attributes or {}
+    values = tuple(attributes.values())
+    types = tuple(map(type, values))
+    if _FLAT_ATTRIBUTE_TYPES.issuperset(types):
+        return (evaluation_context.targeting_key, tuple(attributes), values, types)
+    return (evaluation_context.targeting_key, repr(dict(attributes)))
+
+
+class _LRUCache:
+    """A thread-safe, size-bounded LRU mapping with hit/miss counters"""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_size > 0
+
+    def get(self, key: Any) -> Any:
+        """Return the cached value or None, updating recency and counters"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._data),
+                "max_size": self._max_size,
+            }
+
+
+class _BridgeQueueFull(RuntimeError):
+    """Raised when the bridge executor is full and the overflow policy is "default"."""
+
+
+class _BoundedExecutor:
+    """A size-limited thread pool with a queue-depth limit.
+
+    Used to run coroutines for sync calls made from inside a running event
+    loop, so bursts of such calls never create more than `max_workers` threads.
+    """
+
+    OVERFLOW_POLICIES = ("block", "default")
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64, overflow_policy: str = "block"):
+        if max_workers < 1:
+            raise ValueError("bridge_max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("bridge_max_queue must not be negative")
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"bridge_overflow_policy must be one of {self.OVERFLOW_POLICIES}")
+        self._max_workers = max_workers
+        self._overflow_policy = overflow_policy
+        self._slots_total = max_workers + max_queue
+        self._slots = threading.BoundedSemaphore(self._slots_total)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def reset_after_fork(self) -> None:
+        """Drop pool threads and locks inherited from the parent process"""
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self._slots_total)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="growthbook-provider-bridge"
+                )
+            return self._executor
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Hold one of the bridge's slots while the block runs.
+
+        Waits for a free slot, or raises `_BridgeQueueFull` under the
+        "default" overflow policy when all slots are taken.
+        """
+        if self._overflow_policy == "block":
+            self._slots.acquire()
+        elif not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise _BridgeQueueFull("Evaluation bridge queue is full")
+        try:
+            with self._lock:
+                self._submitted += 1
+            yield
+        finally:
+            self._slots.release()
+
+    def record_wait(self, waited: float) -> None:
+        """Record how long an admitted call waited before it started running"""
+        with self._lock:
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def run(self, fn: Callable[[], Any]) -> Any:
+        """Run `fn` on a pool thread and block until it returns"""
+        with self.admit():
+            enqueued_at = time.perf_counter()
+
+            def task():
+                self.record_wait(time.perf_counter() - enqueued_at)
+                return fn()
+
+            return self._get_executor().submit(task).result()
 
-def run_async_legacy(coro):
+    def stats(self) -> Dict[str, Any]:
+        """Return submission, rejection and queue wait time counters"""
+        with self._lock:
+            return {
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "total_queue_wait_seconds": self._total_wait,
+                "max_queue_wait_seconds": self._max_wait,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def run_async_legacy(coro, executor: Optional[_BoundedExecutor] = None):
     """
     Run a coroutine in the current event loop or create a new one if needed.
     Legacy run_async function for backward compatibility.
@@ -58,24 +370,36 @@ def run_async_legacy(coro):
     # Quick check for running loop first (most common case in async contexts)
     try:
         asyncio.get_running_loop()
+        in_async_context = True
+    except RuntimeError:
+        # Not in async context, proceed with sync handling
+        in_async_context = False
+
+    if in_async_context:
         # We're in an async context - run in separate thread
         logger.debug("run_async_legacy called from async context - using ThreadPoolExecutor")
         
         def run_in_thread():
             return asyncio.run(coro)
         
+        if executor is not None:
+            # Provider-owned pool: thread count stays bounded under bursts
+            try:
+                return executor.run(run_in_thread)
+            except _BridgeQueueFull:
+                coro.close()
+                raise
+
         # Execute in thread pool
-        from concurrent.futures import ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(run_in_thread)
             return future.result()  # blocks until the result is ready - Fix to support backwards compatibility
-    except RuntimeError:
-        # Not in async context, proceed with sync handling
-        pass
 
     # Sync context handling
     try:
         loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            raise RuntimeError("Event loop is closed")
         created_new_loop = False
     except RuntimeError:
         try:
@@ -96,6 +420,76 @@ def run_async_legacy(coro):
             except Exception:
                 pass  # Ignore cleanup errors
 
+class _EventLoopThread:
+    """A long-lived event loop running in a daemon thread.
+
+    Sync callers submit coroutines with `run`, which hands them to the loop via
+    `asyncio.run_coroutine_threadsafe` instead of creating a new loop (or a new
+    thread) per call.
+    """
+
+    def __init__(self, name: str = "growthbook-provider-loop"):
+        self._name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def start(self) -> None:
+        """Start the loop thread if it is not already running"""
+        with self._lock:
+            if self.is_running():
+                return
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    try:
+                        loop.run_until_complete(loop.shutdown_asyncgens())
+                    finally:
+                        loop.close()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run_loop, name=self._name, daemon=True)
+            self._thread.start()
+            started.wait()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the loop thread and block until it completes"""
+        if not self.is_running() or self._loop is None:
+            coro.close()
+            raise RuntimeError("Event loop thread is not running")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the loop and wait for the thread to exit"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+        if thread.is_alive():
+            loop.call_soon_threadsafe(loop.stop)
+            if threading.current_thread() is not thread:
+                thread.join(timeout)
+
+
 class GrowthBookProvider(AbstractProvider):
     """GrowthBook provider implementation for OpenFeature.
     
@@ -147,15 +541,838 @@ class GrowthBookProvider(AbstractProvider):
         
         self.client = None
         self.initialized = False
+        # Sync evaluations are dispatched to this loop instead of creating
+        # a new loop/thread per call. Started in initialize, stopped in close.
+        self._loop_thread = _EventLoopThread()
+        # Set when the loop thread, bridge executor and pooled sessions belong
+        # to a MultiTenantProvider; close() then leaves them running
+        self._shared_runtime = False
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bootstrap_payload = provider_options.bootstrap_payload
+        self._background_init = None
+        # Deadline-bounded initialization, see _initialize_with_deadline
+        self._blocking_init = provider_options.blocking_init
+        self._init_timeout = provider_options.init_timeout
+        self._fallback_payload = provider_options.fallback_payload
+        self._init_deadline = None
+        self._ready_emitted = False
+        self._registry_initializing = False
+        # Set by MultiTenantProvider: starts the tenant's initialization on the
+        # shared loop (once) and returns its future
+        self._owner_initialize: Optional[Callable[[], Future]] = None
+        # Last applied feature definitions:
+        # key -> (raw definition, Feature, prerequisite keys, saved group ids)
+        self._feature_definitions: Dict[str, Any] = {}
+        self._saved_group_digests: Dict[str, bytes] = {}
+        # Raw sections of the applied payload, as received, for the snapshot
+        self._payload_sections: Dict[str, Any] = {}
+        # Shared on-disk snapshot, see _initialize_with_snapshot_store
+        self._snapshot_store = (
+            FeatureSnapshotStore(provider_options.snapshot_path)
+            if provider_options.snapshot_path else None
+        )
+        self._snapshot_poll_interval = provider_options.snapshot_poll_interval
+        self._snapshot_version: Optional[str] = None
+        self._snapshot_watch = None
+        self._prefork = False
+        # Payload last compiled and compacted, see _prepare_payload
+        self._compile_conditions = provider_options.compile_conditions
+        if self._compile_conditions and conditions.missing_core_functions():
+            logger.warning(
+                "compile_conditions disabled: the installed growthbook lacks "
+                + ", ".join(conditions.missing_core_functions())
+            )
+            self._compile_conditions = False
+        self._compact_saved_groups = provider_options.compact_saved_groups
+        if self._compact_saved_groups > 0 and compaction_missing_functions():
+            logger.warning(
+                "compact_saved_groups disabled: the installed growthbook lacks "
+                + ", ".join(compaction_missing_functions())
+            )
+            self._compact_saved_groups = 0
+        self._saved_group_bloom_bits = provider_options.saved_group_bloom_bits
+        self._prepared_payload: Any = None
+        self._prepare_lock = threading.Lock()
+        # Scheduled refreshes or server-sent event updates, see _start_background_refresh
+        self._refresh_jitter = provider_options.refresh_jitter
+        self._refresh_backoff = provider_options.refresh_backoff
+        self._refresh_max_backoff = provider_options.refresh_max_backoff
+        self._scheduler: Optional[RefreshScheduler] = None
+        self._refresh_watch = None
+        # Optional semaphore bounding concurrent refreshes across providers,
+        # and a refresh group running this provider's refreshes with theirs
+        self._refresh_limiter: Optional[asyncio.Semaphore] = None
+        self._refresh_group: Optional[RefreshGroup] = None
+        # Notified of every emitted event, independently of attach()
+        self._event_listeners: List[Callable[[Any, ProviderEvent, ProviderEventDetails], None]] = []
+        self._max_payload_bytes = provider_options.max_payload_bytes
+        # Memory budget of the parsed payload, see _within_memory_budget
+        self._max_payload_memory_bytes = provider_options.max_payload_memory_bytes
+        self._payload_memory_bytes: Optional[int] = None
+        self._rejected_payloads = 0
+        self._streaming = provider_options.streaming
+        self._stream_reconnect_delay = provider_options.stream_reconnect_delay
+        self._stream_max_reconnect_delay = provider_options.stream_max_reconnect_delay
+        self._stream_idle_timeout = provider_options.stream_idle_timeout
+        self._stream: Optional[FeatureStream] = None
+        self._stream_watch = None
+        self._serving_stale = False
+        # Conditional fetches over pooled connections, see _create_client
+        self._fetcher: Optional[ConditionalFetcher] = None
+        # Payload object of the fetcher last applied by _refresh_features
+        self._last_fetched: Optional[Dict[str, Any]] = None
+        self._decryption_cache: Optional[DecryptionCache] = None
+        # Whether this provider holds a conditions.install(), see _initialize
+        self._conditions_installed = False
+        # Optional resolved-result cache, tied to one feature payload snapshot
+        self._result_cache = _LRUCache(provider_options.result_cache_size)
+        # (feature snapshot, generation), replaced as one object; the
+        # generation is part of every result cache key
+        self._result_cache_version: Tuple[Any, int] = (None, 0)
+        self._result_cache_lock = threading.Lock()
+        # Bounded pool for sync calls that cannot use the loop thread
+        self._bridge_executor = _BoundedExecutor(
+            max_workers=provider_options.bridge_max_workers,
+            max_queue=provider_options.bridge_max_queue,
+            overflow_policy=provider_options.bridge_overflow_policy
+        )
+
+    def initialize(self, evaluation_context: Optional[EvaluationContext] = None) -> None:
+        """Initialize the GrowthBook client, as OpenFeature's provider registry does.
+
+        Blocks until the first fetch finished, or returns right away with
+        `blocking_init=False`. This holds when called from a running event
+        loop too: the client runs on the provider's loop thread. The registry
+        emits PROVIDER_READY when it returns; ProviderNotReadyError is raised
+        when no features could be served, which the registry reports as
+        PROVIDER_ERROR.
+
+        To initialize from async code without blocking the running loop,
+        `await provider.initialize_async()` instead.
+        """
+        self._initialize_for_registry()
+
+    async def initialize_async(self) -> None:
+        """Initialize the GrowthBook client on the running event loop"""
+        await self._initialize()
+
+    def _initialize_for_registry(self) -> None:
+        if self._owner_initialize is not None:
+            # A tenant registered for its own domain; initialized by its owner
+            self._owner_initialize().result()
+        elif self.client is None:
+            # The registry emits READY or ERROR for this call; ours would be duplicates
+            self._registry_initializing = True
+            try:
+                self.initialize_sync()
+            finally:
+                self._registry_initializing = False
+        # else: initialized before registration, as in the README examples
+        background_failed = self._background_init is not None and self._background_init.done()
+        if not self.initialized and (self._blocking_init or background_failed):
+            raise ProviderNotReadyError("GrowthBook initialization failed")
+        if self.initialized:
+            self._ready_emitted = True
+
+    async def _initialize(self) -> None:
+        if self._compile_conditions and not self._conditions_installed:
+            conditions.install()
+            self._conditions_installed = True
+        self._loop_thread.start()
+        self._client_loop = asyncio.get_running_loop()
+        self.client = self._create_client()
 
-    async def initialize(self):
-        """Initialize the GrowthBook client"""
-        self.client = GrowthBookClient(options=self.gb_options)
-        self.initialized = await self.client.initialize()
+        if self._snapshot_store is not None and await self._initialize_with_snapshot_store():
+            return
+
+        if self._bootstrap_payload is not None:
+            await self._apply_bootstrap_payload(self._bootstrap_payload)
+            return
+
+        if not self._blocking_init or self._init_timeout is not None:
+            await self._initialize_with_deadline()
+            return
+
+        self.initialized = await self._initialize_client(self.client)
+        if self.initialized:
+            self._emit_ready("Features loaded from GrowthBook", source="network")
+            await self._start_background_refresh()
+        else:
+            await self._serve_fallback("GrowthBook initialization failed")
+        if self._snapshot_store is not None and self._snapshot_store.has_refresh_lock():
+            self._start_snapshot_writer()
+
+    async def _initialize_with_deadline(self) -> None:
+        """Fetch features on the loop thread, waiting at most `init_timeout`.
+
+        In non-blocking mode this returns right away and the deadline is
+        watched on the loop thread; otherwise it returns once the fetch
+        finished or the deadline passed. Either way the fetch keeps running
+        after the deadline and replaces the fallback payload when it succeeds.
+        """
+        loop = self._loop_thread.loop
+        self._client_loop = loop
+        self._background_init = asyncio.run_coroutine_threadsafe(self._initialize_from_network(), loop)
+        if self._init_timeout is None:
+            return
+        self._init_deadline = asyncio.run_coroutine_threadsafe(
+            self._await_init_deadline(self._background_init), loop
+        )
+        if self._blocking_init:
+            await asyncio.wrap_future(self._init_deadline)
+
+    async def _await_init_deadline(self, init_future) -> None:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(init_future)), self._init_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"GrowthBook initialization did not finish within {self._init_timeout}s")
+            await self._serve_fallback("GrowthBook initialization deadline exceeded")
+        except Exception:
+            # Failures are reported by _initialize_from_network
+            pass
+
+    async def _serve_fallback(self, reason: str) -> None:
+        """Serve `fallback_payload` after a failed or late first fetch, or emit PROVIDER_ERROR"""
+        if self.initialized:
+            return
+        if self._fallback_payload is not None:
+            try:
+                await self._set_local_payload(self._load_payload(self._fallback_payload))
+            except Exception as e:
+                logger.error(f"Failed to load fallback payload: {e}")
+        if self.initialized:
+            self._emit_ready(f"{reason}; serving fallback payload", source="fallback")
+        elif not self._registry_initializing:
+            self.emit_provider_error(ProviderEventDetails(
+                message=reason, error_code=ErrorCode.PROVIDER_NOT_READY
+            ))
+
+    def _emit_ready(self, message: str, source: str) -> None:
+        """Emit PROVIDER_READY the first time features are served.
+
+        Later payloads are reported by _apply_feature_update as
+        PROVIDER_CONFIGURATION_CHANGED with the keys that changed.
+        """
+        if self._ready_emitted:
+            return
+        self._ready_emitted = True
+        if self._registry_initializing:
+            return
+        self.emit_provider_ready(ProviderEventDetails(message=message, metadata={"source": source}))
+
+    def _create_client(self) -> GrowthBookClient:
+        """Create the GrowthBook client with payload updates routed through _apply_feature_update"""
+        client = GrowthBookClient(options=self.gb_options)
+        apply_update = client._feature_update_callback
+
+        async def feature_update_callback(features_data: Dict[str, Any]) -> None:
+            await self._apply_feature_update(client, apply_update, features_data)
+
+        # Instance attribute, so initialize/set_payload and the repository
+        # callback registration all pick it up
+        client._feature_update_callback = feature_update_callback
+        self._feature_definitions = {}
+        self._saved_group_digests = {}
+        self._payload_sections = {}
+        self._last_fetched = None
+        self._payload_memory_bytes = None
+        self._release_repository()
+        repository = getattr(client, '_features_repository', None)
+        if repository is not None:
+            self._fetcher = ConditionalFetcher.install(repository)
+            self._fetcher.max_payload_bytes = self._max_payload_bytes
+            self._decryption_cache = DecryptionCache.install(repository)
+        return client
+
+    def _release_repository(self) -> None:
+        """Undo what _create_client installed on the shared GrowthBook repository"""
+        if self._fetcher is not None:
+            self._fetcher.uninstall()
+            self._fetcher = None
+        if self._decryption_cache is not None:
+            self._decryption_cache.uninstall()
+            self._decryption_cache = None
+
+    async def _initialize_client(self, client: GrowthBookClient) -> bool:
+        """Run the client's first fetch and start its refresh"""
+        return await client.initialize()
+
+    async def _close_client(self, client: GrowthBookClient) -> None:
+        await client.close()
+        if not self._shared_runtime:
+            await close_sessions()
+
+    async def _apply_feature_update(
+        self,
+        client: GrowthBookClient,
+        apply_update: Callable[[Dict[str, Any]], Any],
+        features_data: Dict[str, Any]
+    ) -> None:
+        """Apply a payload update, reusing the Feature objects of unchanged features.
+
+        Each feature definition is compared with the one applied last time.
+        Unchanged features are handed to the client as their existing (already
+        compiled) Feature objects, which GrowthBook passes through as-is, so
+        only changed features are rebuilt and recompiled. The keys of flags
+        whose evaluation may have changed are reported in a
+        PROVIDER_CONFIGURATION_CHANGED event, see _affected_flags.
+
+        With `max_payload_memory_bytes`, a payload over budget is not applied;
+        see _within_memory_budget.
+        """
+        features = features_data.get("features") if features_data else None
+        if not features_data or (features is not None and not isinstance(features, dict)):
+            await apply_update(features_data)
+            return
+
+        update = features_data
+        if self._max_payload_memory_bytes is not None:
+            saved_groups = features_data.get("savedGroups")
+            if isinstance(saved_groups, dict):
+                # Measured as they will be kept; the client gets the compacted
+                # groups, so _prepare_payload has nothing left to compact
+                saved_groups = self._compact(saved_groups)
+                update = {**features_data, "savedGroups": saved_groups}
+            if not self._within_memory_budget(client, update):
+                return
+
+        previous = self._feature_definitions
+        changed_features = set()
+        if features is not None:
+            merged: Dict[str, Any] = {}
+            changed_features = set(previous.keys() - features.keys())
+            for key, definition in features.items():
+                known = previous.get(key)
+                if known is not None and known[0] == definition:
+                    merged[key] = known[1]
+                else:
+                    merged[key] = definition
+                    changed_features.add(key)
+            update = {**update, "features": merged}
+        changed_groups = self._diff_saved_groups(features_data.get("savedGroups"))
+
+        await apply_update(update)
+
+        global_context = client._global_context
+        if global_context is None:
+            return
+        # Sections absent from an update carry over, as in the client
+        self._payload_sections = {
+            **self._payload_sections,
+            **{key: features_data[key] for key in _PAYLOAD_SECTIONS if key in features_data},
+        }
+        if features is not None:
+            definitions = {}
+            for key, definition in features.items():
+                feature = global_context.features.get(key)
+                if feature is None:
+                    continue
+                known = previous.get(key)
+                if known is not None and known[1] is feature:
+                    definitions[key] = known
+                else:
+                    definitions[key] = (definition, feature) + self._feature_dependencies(feature)
+            self._feature_definitions = definitions
+        self._prepare_payload(global_context)
+
+        changed = self._affected_flags(changed_features, changed_groups, global_context.saved_groups)
+        if changed and self._ready_emitted and client is self.client:
+            self.emit_provider_configuration_changed(ProviderEventDetails(
+                flags_changed=sorted(changed),
+                message="Feature payload updated"
+            ))
+
+    def _within_memory_budget(self, client: GrowthBookClient, update: Dict[str, Any]) -> bool:
+        """Whether the payload `update` leaves in memory fits `max_payload_memory_bytes`.
+
+        Sections absent from the update count as currently served. A payload
+        over budget is logged and counted, and the current one stays in use.
+        Without a current payload there is nothing to keep serving, so the
+        update fails with FetchError instead, failing initialization.
+        """
+        current = client._global_context
+        sections = {key: update[key] for key in _PAYLOAD_SECTIONS if key in update}
+        if "features" not in sections:
+            sections["features"] = self._payload_sections.get("features", {})
+        if "savedGroups" not in sections and current is not None:
+            sections["savedGroups"] = current.saved_groups
+        if "contextualBandits" not in sections and current is not None:
+            sections["contextualBandits"] = current.contextual_bandits
+        size = _retained_bytes(sections)
+        if size <= self._max_payload_memory_bytes:
+            self._payload_memory_bytes = size
+            return True
+        self._rejected_payloads += 1
+        message = (
+            f"Feature payload needs about {size} bytes of memory, over "
+            f"max_payload_memory_bytes ({self._max_payload_memory_bytes})"
+        )
+        if current is None:
+            raise FetchError(message)
+        logger.warning(f"{message}; serving the current features")
+        return False
+
+    @staticmethod
+    def _feature_dependencies(feature: Any) -> tuple:
+        """Return (prerequisite feature keys, saved group ids) a feature's rules refer to"""
+        parents = set()
+        groups = set()
+        for rule in feature.rules:
+            groups |= conditions.saved_group_references(rule.condition)
+            for parent in rule.parentConditions or ():
+                if isinstance(parent, dict):
+                    if isinstance(parent.get("id"), str):
+                        parents.add(parent["id"])
+                    groups |= conditions.saved_group_references(parent.get("condition"))
+        return frozenset(parents), frozenset(groups)
+
+    def _diff_saved_groups(self, saved_groups: Optional[Dict[str, Any]]) -> set:
+        """Return the ids of saved groups that differ from the last payload"""
+        if saved_groups is None:
+            # Not part of this update; GrowthBook keeps the previous groups
+            return set()
+        digests = {}
+        for group_id, entry in saved_groups.items():
+            body = json_codec.dumps(entry, sort_keys=True, default=repr)
+            digests[group_id] = hashlib.blake2b(body, digest_size=16).digest()
+        previous = self._saved_group_digests
+        self._saved_group_digests = digests
+        return {
+            group_id for group_id in digests.keys() | previous.keys()
+            if digests.get(group_id) != previous.get(group_id)
+        }
+
+    def _affected_flags(self, changed_features: set, changed_groups: set, saved_groups: Dict[str, Any]) -> set:
+        """Expand changed features and saved groups to every flag whose result may change.
+
+        A flag is affected when its definition changed, when one of its
+        conditions refers to a changed saved group (directly or through a
+        condition group), or when one of its prerequisites is affected.
+        """
+        changed_groups = set(changed_groups)
+        if changed_groups:
+            # Condition groups that refer to a changed group change with it
+            references = {
+                group_id: conditions.saved_group_references(entry.get("condition"))
+                for group_id, entry in (saved_groups or {}).items()
+                if isinstance(entry, dict) and entry.get("type") == "condition"
+            }
+            grew = True
+            while grew:
+                grew = False
+                for group_id, refs in references.items():
+                    if group_id not in changed_groups and refs & changed_groups:
+                        changed_groups.add(group_id)
+                        grew = True
+
+        affected = set(changed_features)
+        dependents: Dict[str, set] = {}
+        for key, (_, _, parents, groups) in self._feature_definitions.items():
+            if changed_groups and groups & changed_groups:
+                affected.add(key)
+            for parent in parents:
+                dependents.setdefault(parent, set()).add(key)
+
+        pending = list(affected)
+        while pending:
+            for child in dependents.get(pending.pop(), ()):
+                if child not in affected:
+                    affected.add(child)
+                    pending.append(child)
+        return affected
+
+    async def _initialize_with_snapshot_store(self) -> bool:
+        """Initialize through the shared on-disk snapshot.
+
+        The process holding the refresh lock fetches from GrowthBook and keeps
+        the snapshot up to date. Other processes load the snapshot and watch it
+        for new versions instead of fetching. Returns False when this process
+        should initialize from the network itself.
+        """
+        store = self._snapshot_store
+        if store.try_acquire_refresh_lock():
+            return False
+
+        if not await self._load_snapshot():
+            logger.info("No feature snapshot available yet; fetching features directly")
+            return False
+
+        self._snapshot_watch = asyncio.run_coroutine_threadsafe(
+            self._watch_snapshot(), self._loop_thread.loop
+        )
+        self._emit_ready("Features loaded from shared snapshot", source="snapshot")
+        return True
+
+    async def _load_snapshot(self) -> bool:
+        """Apply the on-disk snapshot if its version changed; True if one is loaded"""
+        result = self._snapshot_store.read(self._snapshot_version)
+        if result is None:
+            return self._snapshot_version is not None
+        version, payload = result
+        if payload is not None:
+            await self.client.set_payload(payload)
+            self._snapshot_version = version
+            self.initialized = self.client._global_context is not None
+        return self.initialized
+
+    async def _watch_snapshot(self) -> None:
+        """Pick up new snapshot versions; take over refreshing if the writer goes away"""
+        while self.client is not None:
+            await asyncio.sleep(self._snapshot_poll_interval)
+            if self.client is None:
+                return
+            try:
+                if self._snapshot_store.try_acquire_refresh_lock():
+                    logger.info("Taking over feature refresh for the shared snapshot")
+                    self._client_loop = asyncio.get_running_loop()
+                    if await self._initialize_client(self.client):
+                        self.initialized = True
+                        await self._start_background_refresh()
+                    self._start_snapshot_writer()
+                    return
+                await self._load_snapshot()
+            except Exception as e:
+                logger.error(f"Failed to refresh from feature snapshot: {e}")
+
+    def _start_snapshot_writer(self) -> None:
+        """Write the current features to the snapshot now and after every refresh"""
+        self._write_snapshot()
+        repository = getattr(self.client, '_features_repository', None)
+        if repository is not None:
+            repository.add_callback(self._on_features_refreshed)
+
+    async def _on_features_refreshed(self, features_data: Dict[str, Any]) -> None:
+        self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        # The payload as received, not rebuilt from the parsed features, so
+        # no section or field is lost on the way to other processes
+        payload = dict(self._payload_sections)
+        if not payload:
+            return
+        try:
+            self._snapshot_version = self._snapshot_store.write(payload)
+        except Exception as e:
+            logger.error(f"Failed to write feature snapshot: {e}")
+
+    def initialize_prefork(self, freeze_gc: bool = True) -> bool:
+        """Load features in a pre-fork server master (e.g. gunicorn with preload).
+
+        Features are loaded synchronously, from `bootstrap_payload`, the shared
+        snapshot or the GrowthBook API, without starting any thread or
+        background task, so the process is safe to fork. The parsed feature
+        snapshot is then moved out of the garbage collector's reach with
+        `gc.freeze()` so forked workers keep sharing its memory pages. Each
+        process forked from this one restarts the loop thread and background
+        refresh itself; processes those workers fork in turn do not.
+
+        The snapshot keeps GrowthBook's own dict/list structures, since the
+        rule engine relies on them; it is treated as read-only and replaced
+        wholesale on refresh, never mutated.
+
+        Args:
+            freeze_gc: Call `gc.freeze()` after loading (default: True)
+
+        Returns:
+            Whether features were loaded
+        """
+        self.client = self._create_client()
+
+        data = None
+        if self._bootstrap_payload is not None:
+            data = self._load_payload(self._bootstrap_payload)
+        elif self._snapshot_store is not None:
+            result = self._snapshot_store.read()
+            if result is not None:
+                self._snapshot_version, data = result
+        repository = getattr(self.client, '_features_repository', None)
+        if data is None and repository is not None:
+            data = repository.load_features(
+                self.gb_options.api_host,
+                self.gb_options.client_key,
+                self.gb_options.decryption_key or "",
+                self.gb_options.cache_ttl
+            )
+        if not data:
+            logger.error("Failed to load features before fork")
+            return False
+
+        # A throwaway loop; nothing created here stays bound to it
+        run_async_legacy(self.client.set_payload(data))
+        self.initialized = self.client._global_context is not None
+        # Prepare before freezing so workers share the compiled conditions too
+        self._prepare_payload(self.client._global_context)
+
+        if not self._prefork:
+            self._prefork = True
+            provider_ref = weakref.ref(self)
+
+            def after_fork_in_child():
+                provider = provider_ref()
+                if provider is not None and provider._prefork:
+                    provider._after_fork_in_child()
+
+            os.register_at_fork(after_in_child=after_fork_in_child)
+
+        if freeze_gc:
+            gc.collect()
+            gc.freeze()
+        return self.initialized
+
+    def _after_fork_in_child(self) -> None:
+        """Restart threads and background refresh in a forked worker"""
+        # Only the pre-fork master's children are workers; processes a worker
+        # forks itself (e.g. for a process pool) must not start anything
+        self._prefork = False
+        # Threads don't survive fork; replace the parent's copies
+        self._loop_thread = _EventLoopThread()
+        self._bridge_executor.reset_after_fork()
+        if self.client is None:
+            return
+        self._loop_thread.start()
+        self._client_loop = self._loop_thread.loop
+        if self._snapshot_store is not None:
+            self._snapshot_watch = asyncio.run_coroutine_threadsafe(
+                self._watch_snapshot(), self._client_loop
+            )
+        else:
+            self._background_init = asyncio.run_coroutine_threadsafe(
+                self._initialize_from_network(), self._client_loop
+            )
+
+    @staticmethod
+    def _load_payload(payload: Union[Dict[str, Any], str]) -> Dict[str, Any]:
+        """Return a feature payload given as a dict or as a path to a JSON file"""
+        if isinstance(payload, dict):
+            return payload
+        with open(payload, "rb") as f:
+            return json_codec.loads(f.read())
+
+    async def _set_local_payload(self, data: Dict[str, Any]) -> None:
+        if hasattr(self.client, 'set_payload'):
+            await self.client.set_payload(data)
+        else:
+            await self.client.set_features(data.get("features", {}))
+        self.initialized = self.client._global_context is not None
+
+    async def _apply_bootstrap_payload(self, payload: Union[Dict[str, Any], str]) -> None:
+        """Serve a local payload immediately and fetch from the network in the background"""
+        try:
+            await self._set_local_payload(self._load_payload(payload))
+        except Exception as e:
+            logger.error(f"Failed to load bootstrap payload: {e}")
+        if self.initialized:
+            self._emit_ready("Serving bootstrap payload", source="bootstrap")
+
+        # Run the network initialization (and the refresh task it starts) on
+        # the loop thread, which outlives the caller's loop
+        loop = self._loop_thread.loop
+        self._client_loop = loop
+        self._background_init = asyncio.run_coroutine_threadsafe(self._initialize_from_network(), loop)
+
+    async def _initialize_from_network(self) -> None:
+        client = self.client
+        if client is None:
+            return
+        if await self._initialize_client(client):
+            self.initialized = True
+            if self._snapshot_store is not None and self._snapshot_store.has_refresh_lock():
+                self._start_snapshot_writer()
+            self._emit_ready("Features loaded from GrowthBook", source="network")
+            await self._start_background_refresh()
+        elif self.initialized:
+            logger.warning("Background GrowthBook initialization failed; serving local payload")
+        else:
+            await self._serve_fallback("GrowthBook initialization failed")
+
+    async def _start_background_refresh(self) -> None:
+        """Replace GrowthBook's fixed-interval polling with the provider's own refresh.
+
+        Runs on the loop the client was initialized on, with either the
+        server-sent event stream (`streaming=True`) or a jittered refresh
+        every `cache_ttl` seconds. Both refresh in the background: evaluations
+        keep being served from the last applied payload and never wait on a
+        fetch. While refreshes fail (or the stream is down) PROVIDER_STALE is
+        emitted, and PROVIDER_READY once features are current again.
+        """
+        if self._stream_watch is not None or self._refresh_watch is not None or self._scheduler is not None:
+            return
+        repository = getattr(self.client, '_features_repository', None)
+        if repository is None:
+            return
+        await repository.stop_refresh()
+
+        loop = asyncio.get_running_loop()
+        if not self._streaming:
+            self._scheduler = RefreshScheduler(
+                self._refresh_features,
+                interval=self.gb_options.cache_ttl,
+                jitter=self._refresh_jitter,
+                backoff=self._refresh_backoff,
+                max_backoff=self._refresh_max_backoff,
+                on_success=self._on_refresh_success,
+                on_failure=self._on_refresh_failure,
+            )
+            if self._refresh_group is not None:
+                self._refresh_group.add(self._scheduler)
+                return
+            self._refresh_watch = asyncio.run_coroutine_threadsafe(self._scheduler.run(), loop)
+            return
+
+        api_host = (self.gb_options.api_host or "https://cdn.growthbook.io").rstrip("/")
+        self._stream = FeatureStream(
+            f"{api_host}/sub/{self.gb_options.client_key}",
+            on_event=self._on_stream_event,
+            on_connect=self._on_stream_connect,
+            on_disconnect=self._on_stream_disconnect,
+            reconnect_delay=self._stream_reconnect_delay,
+            max_reconnect_delay=self._stream_max_reconnect_delay,
+            idle_timeout=self._stream_idle_timeout,
+            max_event_bytes=self._max_payload_bytes,
+        )
+        self._stream_watch = asyncio.run_coroutine_threadsafe(self._stream.run(), loop)
+
+    async def _on_stream_event(self, event_type: str, data: str) -> None:
+        repository = getattr(self.client, '_features_repository', None)
+        if repository is None:
+            return
+        if event_type == "features-updated":
+            await self._refresh_features()
+        elif event_type == "features":
+            payload = json_codec.loads(data) if data else None
+            if not isinstance(payload, dict):
+                logger.warning("Ignoring feature stream event without a payload")
+                return
+            if any(key in payload for key in ("encryptedFeatures", "encryptedSavedGroups", "encryptedContextualBandits")):
+                payload = repository.decrypt_response(payload, self.gb_options.decryption_key or "")
+                if payload is None:
+                    logger.warning("Failed to decrypt feature stream payload; keeping current features")
+                    return
+            await repository._handle_feature_update(payload)
+
+    async def _refresh_features(self) -> None:
+        """Fetch the payload and apply it if it changed.
+
+        Raises:
+            FetchError: If the fetch fails or the payload cannot be decrypted
+        """
+        repository = getattr(self.client, '_features_repository', None)
+        if repository is None or self._fetcher is None:
+            return
+        api_host = self.gb_options.api_host or "https://cdn.growthbook.io"
+        client_key = self.gb_options.client_key
+        if self._refresh_limiter is not None:
+            async with self._refresh_limiter:
+                fetched, modified = await self._fetcher.fetch_payload(api_host, client_key)
+        else:
+            fetched, modified = await self._fetcher.fetch_payload(api_host, client_key)
+        if fetched is None or (not modified and fetched is self._last_fetched):
+            # Not modified: the served payload is still current
+            return
+        # A 304 for a payload another client of the repository fetched is
+        # applied once here
+        self._last_fetched = fetched
+        payload = repository.decrypt_response(fetched, self.gb_options.decryption_key or "")
+        if payload is None:
+            raise FetchError("Failed to decrypt features")
+        # Keep the repository's TTL cache current for clients initialized later
+        repository.cache.set(repository._compute_cache_key(api_host, client_key), payload, self.gb_options.cache_ttl)
+        await repository._handle_feature_update(payload)
+
+    def _on_refresh_success(self) -> None:
+        self._mark_fresh("Feature refresh succeeded", source="network")
+
+    def _on_refresh_failure(self, error: Exception) -> None:
+        self._mark_stale(f"Feature refresh failed ({error}); serving last known features")
+
+    def _mark_stale(self, message: str) -> None:
+        """Emit PROVIDER_STALE once while the served payload may be outdated"""
+        if self._ready_emitted and not self._serving_stale:
+            self._serving_stale = True
+            self.emit_provider_stale(ProviderEventDetails(message=message))
+
+    def _mark_fresh(self, message: str, source: str) -> None:
+        """Emit PROVIDER_READY when a stale payload is current again"""
+        if self._serving_stale:
+            self._serving_stale = False
+            self.emit_provider_ready(ProviderEventDetails(message=message, metadata={"source": source}))
+
+    async def _on_stream_connect(self, reconnected: bool) -> None:
+        if reconnected:
+            await self._refresh_features()
+        self._mark_fresh("Feature stream reconnected", source="stream")
+
+    async def _on_stream_disconnect(self, reason: str) -> None:
+        self._mark_stale(f"Feature stream disconnected ({reason}); serving last known features")
 
     def initialize_sync(self):
-        """Synchronous initialization for non-async contexts"""
-        return run_async_legacy(self.initialize())
+        """Synchronous initialization for non-async contexts.
+
+        The client is initialized on the provider's loop thread so that its
+        background refresh keeps running after this call returns.
+        """
+        self._loop_thread.start()
+        return self._run_sync(self._initialize(), bounded=False)
+
+    def _run_sync(self, coro, bounded: bool = True):
+        """Run a coroutine from sync code on the provider's loop thread.
+
+        Falls back to `run_async_legacy` when the loop thread is not running
+        or when called from the loop thread itself (which would deadlock).
+        Calls made from inside a running loop go through the bounded bridge
+        executor. Calls handed to the loop thread are admitted through the
+        same bound (queue limit and overflow policy) unless `bounded` is
+        False, as for initialization.
+        """
+        if self._loop_thread.is_running() and not self._loop_thread.in_loop_thread():
+            if not bounded:
+                return self._loop_thread.run(coro)
+            bridge = self._bridge_executor
+            enqueued_at = time.perf_counter()
+
+            async def admitted():
+                bridge.record_wait(time.perf_counter() - enqueued_at)
+                return await coro
+
+            try:
+                with bridge.admit():
+                    return self._loop_thread.run(admitted())
+            except _BridgeQueueFull:
+                coro.close()
+                raise
+        return run_async_legacy(coro, executor=self._bridge_executor)
+
+    def get_result_cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss statistics for the flag result cache"""
+        return self._result_cache.stats()
+
+    def get_bridge_stats(self) -> Dict[str, Any]:
+        """Return counters for the sync-from-async bridge executor"""
+        return self._bridge_executor.stats()
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Return the measured memory of the served payload and the payloads rejected for their size"""
+        return {
+            "payload_memory_bytes": self._payload_memory_bytes,
+            "max_payload_memory_bytes": self._max_payload_memory_bytes,
+            "rejected_payloads": self._rejected_payloads,
+        }
+
+    def get_fetch_stats(self) -> Dict[str, Any]:
+        """Return request, 304 (not modified) and failure counters of payload fetches"""
+        return self._fetcher.stats() if self._fetcher is not None else {}
+
+    def get_decryption_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and decryption time of encrypted payload sections"""
+        return self._decryption_cache.stats() if self._decryption_cache is not None else {}
+
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """Return connection state and counters of the feature stream (empty when not streaming)"""
+        return self._stream.stats() if self._stream is not None else {}
+
+    def get_refresh_stats(self) -> Dict[str, Any]:
+        """Return refresh counters, payload age and refresh latency (empty when not refreshing)"""
+        return self._scheduler.stats() if self._scheduler is not None else {}
 
     def get_metadata(self) -> Metadata:
         """Return provider metadata"""
@@ -187,12 +1404,352 @@ class GrowthBookProvider(AbstractProvider):
 
         return UserContext(attributes=attributes)
 
-    def _eval_feature_sync(self, flag_key: str, user_context: UserContext):
-        """Synchronous version of eval_feature that uses the cached features"""
+    def _safe_fingerprint(self, evaluation_context: Optional[EvaluationContext]) -> Any:
+        try:
+            return _context_fingerprint(evaluation_context)
+        except Exception:
+            # Unusual attribute types; evaluate without caching
+            return None
+
+    def _can_eval_sync(self) -> bool:
+        """Whether flags can be evaluated without going through asyncio.
+
+        Sticky bucketing needs async I/O and async tracking callbacks need a
+        running loop, so those configurations keep using the loop thread.
+        """
+        if not self.client or not self.initialized:
+            return False
+        if getattr(self.client, '_global_context', None) is None:
+            return False
+        if self.gb_options.sticky_bucket_service is not None:
+            return False
+        on_experiment_viewed = getattr(self.gb_options, 'on_experiment_viewed', None)
+        if on_experiment_viewed is not None and inspect.iscoroutinefunction(on_experiment_viewed):
+            return False
+        return True
+
+    def _eval_feature_sync(
+        self,
+        flag_key: str,
+        user_context: UserContext,
+        exposures: Optional[List[str]] = None,
+        global_context: Any = None
+    ):
+        """Synchronous version of eval_feature that uses the cached features.
+
+        Reads the client's current immutable feature snapshot and runs the
+        GrowthBook rule engine directly, without creating a coroutine. When
+        `exposures` is given, the key of every experiment exposure produced by
+        the evaluation is appended to it.
+        """
         if not self.client:
             return None
 
-        return self.client.eval_feature(flag_key, user_context)
+        if global_context is None:
+            global_context = self.client._global_context
+        if global_context is None:
+            raise RuntimeError("GrowthBook client not properly initialized")
+
+        context = self._build_eval_context(user_context, global_context, exposures)
+        return core_eval_feature(flag_key, context)
+
+    def _build_eval_context(
+        self,
+        user_context: UserContext,
+        global_context: Any,
+        exposures: Optional[List[str]] = None
+    ) -> GBEvaluationContext:
+        """Build a GrowthBook evaluation context wired to the client's callbacks"""
+        self._prepare_payload(global_context)
+        context_callbacks = getattr(self.client, '_context_callbacks', None)
+        callbacks = context_callbacks(None) if context_callbacks else {}
+        if exposures is not None:
+            tracking_cb = callbacks.get('tracking_cb')
+
+            def record_exposure(experiment, result, user):
+                exposures.append(experiment.key)
+                if tracking_cb:
+                    tracking_cb(experiment, result, user)
+
+            callbacks['tracking_cb'] = record_exposure
+
+        return GBEvaluationContext(
+            user=user_context,
+            global_ctx=global_context,
+            stack=StackContext(evaluated_features=set()),
+            **callbacks
+        )
+
+    def _resolve_all_with_context(self, context: GBEvaluationContext) -> Dict[str, Dict[str, Any]]:
+        """Evaluate every loaded feature against one prepared evaluation context"""
+        results: Dict[str, Dict[str, Any]] = {}
+        for flag_key in context.global_ctx.features:
+            # Each top-level evaluation starts with a fresh prerequisite stack
+            context.stack = StackContext(evaluated_features=set())
+            try:
+                feature_result = core_eval_feature(flag_key, context)
+                details = self._build_resolution_details(feature_result, None, lambda x: x)
+            except Exception as e:
+                details = self._error_details(None, e)
+            results[flag_key] = {
+                "value": details.value,
+                "variant": details.variant,
+                "reason": details.reason,
+            }
+        return results
+
+    def resolve_all(self, evaluation_context: Optional[EvaluationContext] = None) -> Dict[str, Dict[str, Any]]:
+        """Evaluate all loaded flags for one evaluation context.
+
+        The context is converted once and the loaded feature set is walked in a
+        single pass.
+
+        Returns:
+            Mapping of flag key to a dict with "value", "variant" and "reason".
+            Empty when the provider is not ready.
+        """
+        if not self._can_eval_sync():
+            if not self.client or not self.initialized:
+                return {}
+            return self._run_sync(self.resolve_all_async(evaluation_context))
+
+        user_context = self._create_user_context(evaluation_context)
+        context = self._build_eval_context(user_context, self.client._global_context)
+        return self._resolve_all_with_context(context)
+
+    def resolve_many(
+        self,
+        flag_key: str,
+        evaluation_contexts: Iterable[Optional[EvaluationContext]],
+        default_value: Any = None
+    ) -> Iterator[FlagResolutionDetails]:
+        """Evaluate one flag for many evaluation contexts, e.g. for offline scoring.
+
+        Everything that does not depend on the context (feature snapshot,
+        client callbacks, value conversion) is prepared once. Results are
+        yielded in input order, one at a time, so memory use stays constant
+        regardless of how many contexts are consumed.
+
+        Args:
+            flag_key: Flag to evaluate
+            evaluation_contexts: Any iterable of OpenFeature evaluation contexts
+            default_value: Returned when the flag is unknown or fails; its type
+                is also used to convert the flag value (None keeps values as-is)
+        """
+        value_converter: Callable[[Any], Any] = (
+            (lambda x: x) if default_value is None else type(default_value)
+        )
+
+        if not self._can_eval_sync():
+            # Async-only configurations (e.g. sticky bucketing) evaluate one by one
+            for evaluation_context in evaluation_contexts:
+                yield self._process_flag_evaluation(
+                    flag_key, default_value, evaluation_context, value_converter
+                )
+            return
+
+        global_context = self.client._global_context
+        if flag_key not in global_context.features:
+            unknown = self._build_resolution_details(None, default_value, value_converter)
+            for _ in evaluation_contexts:
+                yield unknown
+            return
+
+        # One reusable GrowthBook context; only the user and stack change per row
+        context = self._build_eval_context(UserContext(), global_context)
+        for evaluation_context in evaluation_contexts:
+            try:
+                user_context = self._create_user_context(evaluation_context)
+                if self._targeting_key_missing(user_context, evaluation_context):
+                    yield FlagResolutionDetails(
+                        value=default_value,
+                        error_code=ErrorCode.TARGETING_KEY_MISSING,
+                        reason=Reason.ERROR
+                    )
+                    continue
+                context.user = user_context
+                context.stack = StackContext(evaluated_features=set())
+                context.reported_features = None
+                feature_result = core_eval_feature(flag_key, context)
+                yield self._build_resolution_details(feature_result, default_value, value_converter)
+            except Exception as e:
+                yield self._error_details(default_value, e)
+
+    def resolve_many_parallel(
+        self,
+        flag_key: str,
+        evaluation_contexts: Iterable[Optional[EvaluationContext]],
+        default_value: Any = None,
+        processes: Optional[int] = None,
+        chunk_size: int = 1000,
+        mp_context: Any = None
+    ) -> Iterator[FlagResolutionDetails]:
+        """Evaluate one flag for many contexts on a pool of worker processes.
+
+        The feature payload is sent to each worker once, when the pool starts.
+        Contexts are partitioned into chunks of `chunk_size`, and results are
+        yielded in input order with a bounded number of chunks in flight.
+        Experiment tracking callbacks are not fired from worker processes.
+
+        Args:
+            flag_key: Flag to evaluate
+            evaluation_contexts: Any iterable of OpenFeature evaluation contexts
+            default_value: Same meaning as in `resolve_many`
+            processes: Worker processes (default: CPU count)
+            chunk_size: Contexts sent to a worker per task
+            mp_context: Optional multiprocessing context (e.g. "spawn"). In a
+                pre-fork master (see `initialize_prefork`) it defaults to
+                "forkserver" (or "spawn"), so pool workers are not started
+                as forked serving workers
+        """
+        from .parallel import evaluate_in_processes
+
+        if not self.client or not self.initialized or getattr(self.client, '_global_context', None) is None:
+            for _ in evaluation_contexts:
+                yield FlagResolutionDetails(
+                    value=default_value,
+                    error_code=ErrorCode.PROVIDER_NOT_READY,
+                    reason=Reason.ERROR
+                )
+            return
+
+        if mp_context is None and self._prefork:
+            methods = multiprocessing.get_all_start_methods()
+            mp_context = "forkserver" if "forkserver" in methods else "spawn"
+        attributes = (self._create_user_context(c).attributes for c in evaluation_contexts)
+        yield from evaluate_in_processes(
+            self.client._global_context,
+            flag_key,
+            attributes,
+            default_value,
+            processes=processes,
+            chunk_size=chunk_size,
+            mp_context=mp_context
+        )
+
+    def bucket_experiment(self, flag_key: str, hash_values: Any, rule_id: Optional[str] = None):
+        """Simulate experiment allocation for many hash-attribute values at once.
+
+        Uses the experiment rule of a loaded feature (the first one, or the one
+        with `rule_id`) and NumPy-vectorized hashing that is bit-identical to
+        GrowthBook's scalar bucketing. Targeting conditions, filters and sticky
+        buckets are not applied. Requires NumPy.
+
+        Args:
+            flag_key: Feature whose experiment rule is simulated
+            hash_values: Sequence or NumPy array of hash-attribute values (e.g. user ids)
+            rule_id: Optional id of the experiment rule to use
+
+        Returns:
+            NumPy int64 array of variation indexes, -1 when not in the experiment
+        """
+        from .bucketing import assign_variations
+
+        global_context = getattr(self.client, '_global_context', None) if self.client else None
+        if global_context is None:
+            raise RuntimeError("GrowthBook provider is not initialized")
+        feature = global_context.features.get(flag_key)
+        if feature is None:
+            raise KeyError(f"Unknown feature: {flag_key}")
+
+        for rule in feature.rules:
+            if rule.variations is None or (rule_id is not None and rule.id != rule_id):
+                continue
+            return assign_variations(
+                hash_values,
+                seed=rule.seed or rule.key or flag_key,
+                num_variations=len(rule.variations),
+                coverage=rule.coverage,
+                weights=rule.weights,
+                hash_version=rule.hashVersion or 1,
+                ranges=rule.ranges,
+                namespace=rule.namespace,
+            )
+        raise ValueError(f"Feature {flag_key} has no matching experiment rule")
+
+    async def resolve_all_async(
+        self,
+        evaluation_context: Optional[EvaluationContext] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Asynchronous version of resolve_all"""
+        if not self.client or not self.initialized:
+            return {}
+
+        user_context = self._create_user_context(evaluation_context)
+        # Sticky bucket assignments (if any) are fetched once for all flags
+        context = await self.client.create_evaluation_context(user_context)
+        return self._resolve_all_with_context(context)
+
+    @staticmethod
+    def _build_resolution_details(
+        feature_result: Any,
+        default_value: Any,
+        value_converter: Callable[[Any], Any]
+    ) -> FlagResolutionDetails:
+        """Convert a GrowthBook feature result into OpenFeature resolution details"""
+        # Handle feature not found
+        if feature_result is None:
+            return FlagResolutionDetails(
+                value=default_value,
+                reason=Reason.DEFAULT,
+                error_code=None  # Ensure no error code is set for default values
+            )
+        
+        # Add type safety for value conversion to prevent runtime errors
+        try:
+            value = value_converter(feature_result.value) if feature_result.value is not None else default_value
+        except (ValueError, TypeError) as e:
+            logger.error(f"Type conversion error: {e}")
+            return FlagResolutionDetails(
+                value=default_value,
+                error_code=ErrorCode.TYPE_MISMATCH,
+                error_message=f"Failed to convert value: {str(e)}",
+                reason=Reason.ERROR
+            )
+        
+        # Determine the reason based on the result
+        reason = Reason.DEFAULT
+        variant = None
+        
+        # Check if from targeting rule
+        if hasattr(feature_result, 'ruleId') and feature_result.ruleId:
+            logger.debug(f"Targeting rule matched-: {feature_result.ruleId}")
+            reason = Reason.TARGETING_MATCH
+            variant = feature_result.ruleId
+        # Check if this is from an experiment
+        elif hasattr(feature_result, 'experimentResult') and feature_result.experimentResult:
+            logger.debug(f"Experiment variation assigned: {feature_result.experimentResult}")
+            reason = Reason.SPLIT
+            variant = str(feature_result.experimentResult.variationId)
+        
+        return FlagResolutionDetails(
+            value=value,
+            variant=variant,
+            reason=reason
+        )
+
+    @staticmethod
+    def _error_details(default_value: Any, e: Exception) -> FlagResolutionDetails:
+        logger.error(f"Error during flag evaluation: {e}")
+        logger.error(f"Full traceback:\n{traceback.format_exc()}")
+        return FlagResolutionDetails(
+            value=default_value,
+            error_code=ErrorCode.GENERAL,
+            error_message=str(e),
+            reason=Reason.ERROR
+        )
+
+    def _targeting_key_missing(
+        self,
+        user_context: UserContext,
+        evaluation_context: Optional[EvaluationContext]
+    ) -> bool:
+        # For targeting to work, we need an id
+        return bool(
+            not user_context.attributes.get('id')
+            and evaluation_context
+            and evaluation_context.targeting_key
+        )
 
     async def _process_flag_evaluation_async(
         self,
@@ -215,8 +1772,7 @@ class GrowthBookProvider(AbstractProvider):
             # Convert OpenFeature context to GrowthBook context
             user_context = self._create_user_context(evaluation_context)
             
-            # For targeting to work, we need an id
-            if not user_context.attributes.get('id') and evaluation_context and evaluation_context.targeting_key:
+            if self._targeting_key_missing(user_context, evaluation_context):
                 return FlagResolutionDetails(
                     value=default_value,
                     error_code=ErrorCode.TARGETING_KEY_MISSING,
@@ -225,73 +1781,158 @@ class GrowthBookProvider(AbstractProvider):
             
             # Evaluate the feature using eval_feature - properly await the async call
             logger.debug(f"Evaluating feature {flag_key} with context {user_context}")
+            self._prepare_payload(getattr(self.client, '_global_context', None))
             feature_result = await self.client.eval_feature(flag_key, user_context)
-                
-            # Handle feature not found
-            if feature_result is None:
-                return FlagResolutionDetails(
-                    value=default_value,
-                    reason=Reason.DEFAULT,
-                    error_code=None  # Ensure no error code is set for default values
-                )
-            
-            # Add type safety for value conversion to prevent runtime errors
+            return self._build_resolution_details(feature_result, default_value, value_converter)
+        except Exception as e:
+            return self._error_details(default_value, e)
+
+    def _process_flag_evaluation(
+        self,
+        flag_key: str,
+        default_value: Any,
+        evaluation_context: Optional[EvaluationContext] = None,
+        value_converter: Callable[[Any], Any] = lambda x: x
+    ) -> FlagResolutionDetails:
+        """Synchronous version of flag evaluation for OpenFeature interface.
+
+        Evaluates directly against the in-memory feature snapshot when
+        possible and only falls back to the loop thread when needed.
+        """
+        if not self._can_eval_sync():
             try:
-                value = value_converter(feature_result.value) if feature_result.value is not None else default_value
-            except (ValueError, TypeError) as e:
-                logger.error(f"Type conversion error: {e}")
+                return self._run_sync(self._process_flag_evaluation_async(
+                    flag_key=flag_key,
+                    default_value=default_value,
+                    evaluation_context=evaluation_context,
+                    value_converter=value_converter
+                ))
+            except _BridgeQueueFull as e:
+                logger.warning(f"Returning default value for {flag_key}: {e}")
                 return FlagResolutionDetails(
                     value=default_value,
-                    error_code=ErrorCode.TYPE_MISMATCH,
-                    error_message=f"Failed to convert value: {str(e)}",
+                    error_code=ErrorCode.GENERAL,
+                    error_message=str(e),
                     reason=Reason.ERROR
                 )
-            
-            # Determine the reason based on the result
-            reason = Reason.DEFAULT
-            variant = None
-            
-            # Check if from targeting rule
-            if hasattr(feature_result, 'ruleId') and feature_result.ruleId:
-                logger.debug(f"Targeting rule matched-: {feature_result.ruleId}")
-                reason = Reason.TARGETING_MATCH
-                variant = feature_result.ruleId
-            # Check if this is from an experiment
-            elif hasattr(feature_result, 'experimentResult') and feature_result.experimentResult:
-                logger.debug(f"Experiment variation assigned: {feature_result.experimentResult}")
-                reason = Reason.SPLIT
-                variant = str(feature_result.experimentResult.variationId)
-            
-            return FlagResolutionDetails(
-                value=value,
-                variant=variant,
-                reason=reason
+
+        try:
+            if not self._result_cache.enabled:
+                user_context = self._create_user_context(evaluation_context)
+                if self._targeting_key_missing(user_context, evaluation_context):
+                    return FlagResolutionDetails(
+                        value=default_value,
+                        error_code=ErrorCode.TARGETING_KEY_MISSING,
+                        reason=Reason.ERROR
+                    )
+                feature_result = self._eval_feature_sync(flag_key, user_context)
+                return self._build_resolution_details(feature_result, default_value, value_converter)
+
+            return self._process_flag_evaluation_cached(
+                flag_key, default_value, evaluation_context, value_converter
             )
         except Exception as e:
-            logger.error(f"Error during flag evaluation: {e}")
-            import traceback
-            logger.error(f"Full traceback:\n{traceback.format_exc()}")
-            return FlagResolutionDetails(
-                value=default_value,
-                error_code=ErrorCode.GENERAL,
-                error_message=str(e),
-                reason=Reason.ERROR
-            )
+            return self._error_details(default_value, e)
 
-    def _process_flag_evaluation(
+    def _process_flag_evaluation_cached(
         self,
         flag_key: str,
         default_value: Any,
-        evaluation_context: Optional[EvaluationContext] = None,
-        value_converter: Callable[[Any], Any] = lambda x: x
+        evaluation_context: Optional[EvaluationContext],
+        value_converter: Callable[[Any], Any]
     ) -> FlagResolutionDetails:
-        """Synchronous version of flag evaluation for OpenFeature interface."""
-        return run_async_legacy(self._process_flag_evaluation_async(
-            flag_key=flag_key,
-            default_value=default_value,
-            evaluation_context=evaluation_context,
-            value_converter=value_converter
-        ))
+        """Sync evaluation through the per-(flag, context, type) result cache"""
+        global_context = self.client._global_context
+        generation = self._sync_result_cache_version(global_context)
+
+        fingerprint = self._safe_fingerprint(evaluation_context)
+        # A result computed from an older snapshot while the payload is being
+        # replaced is stored under its own generation, so it is never served
+        cache_key = (flag_key, fingerprint, value_converter, generation) if fingerprint is not None else None
+        if cache_key is not None:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                # Callers may modify what they get; the cached copy stays intact
+                return _copy_details(cached)
+
+        user_context = self._create_user_context(evaluation_context)
+        if self._targeting_key_missing(user_context, evaluation_context):
+            return FlagResolutionDetails(
+                value=default_value,
+                error_code=ErrorCode.TARGETING_KEY_MISSING,
+                reason=Reason.ERROR
+            )
+
+        exposures: List[str] = []
+        feature_result = self._eval_feature_sync(flag_key, user_context, exposures, global_context)
+        details = self._build_resolution_details(feature_result, default_value, value_converter)
+
+        # Only cache results that don't depend on the caller's default value
+        # and didn't fire experiment tracking, so exposures are never skipped.
+        # Object values are mutable and would be shared by every hit.
+        if (
+            cache_key is not None
+            and not exposures
+            and feature_result is not None
+            and feature_result.value is not None
+            and details.error_code is None
+            and not isinstance(details.value, (dict, list))
+        ):
+            self._result_cache.put(cache_key, _copy_details(details))
+        return details
+
+    def _prepare_payload(self, global_context: Any) -> None:
+        """Compile conditions and compact saved groups of a newly received payload.
+
+        Runs once per payload; the client replaces its global context on every
+        refresh, so a new context means new, unprepared features.
+        """
+        if global_context is None or global_context is self._prepared_payload:
+            return
+        with self._prepare_lock:
+            if global_context is self._prepared_payload:
+                return
+            global_context.saved_groups = self._compact(global_context.saved_groups)
+            if self._compile_conditions:
+                try:
+                    count = conditions.compile_features(global_context.features)
+                    logger.debug(f"Compiled {count} targeting conditions")
+                except Exception as e:
+                    # Conditions that were not compiled are still interpreted
+                    logger.error(f"Failed to compile targeting conditions: {e}")
+            self._prepared_payload = global_context
+
+    def _compact(self, saved_groups: Any) -> Any:
+        """Return `saved_groups` with large groups compacted, as configured"""
+        if self._compact_saved_groups <= 0:
+            return saved_groups
+        try:
+            saved_groups, count = compact_saved_groups(
+                saved_groups,
+                self._compact_saved_groups,
+                self._saved_group_bloom_bits
+            )
+            logger.debug(f"Compacted {count} saved groups")
+        except Exception as e:
+            logger.error(f"Failed to compact saved groups: {e}")
+        return saved_groups
+
+    def _sync_result_cache_version(self, global_context: Any) -> int:
+        """Return the result cache generation of `global_context`.
+
+        Drops cached results and starts a new generation when the client's
+        feature snapshot has been replaced.
+        """
+        snapshot, generation = self._result_cache_version
+        if global_context is snapshot:
+            return generation
+        with self._result_cache_lock:
+            snapshot, generation = self._result_cache_version
+            if global_context is not snapshot:
+                generation += 1
+                self._result_cache.clear()
+                self._result_cache_version = (global_context, generation)
+            return generation
 
     def resolve_boolean_details(
         self,
@@ -383,9 +2024,63 @@ class GrowthBookProvider(AbstractProvider):
         """Asynchronous object flag evaluation"""
         return await self._process_flag_evaluation_async(flag_key, default_value, evaluation_context, type(default_value))
 
+    def emit(self, event: ProviderEvent, details: ProviderEventDetails) -> None:
+        super().emit(event, details)
+        for listener in list(self._event_listeners):
+            listener(self, event, details)
+
+    def shutdown(self) -> None:
+        """Close the provider when OpenFeature shuts it down"""
+        run_async_legacy(self.close(), executor=self._bridge_executor)
+
     async def close(self):
         """Close the provider and cleanup resources"""
+        if self._init_deadline is not None:
+            self._init_deadline.cancel()
+            self._init_deadline = None
+        if self._background_init is not None:
+            self._background_init.cancel()
+            self._background_init = None
+        if self._snapshot_watch is not None:
+            self._snapshot_watch.cancel()
+            self._snapshot_watch = None
+        if self._stream_watch is not None:
+            self._stream_watch.cancel()
+            self._stream_watch = None
+            self._stream = None
+        if self._refresh_watch is not None:
+            self._refresh_watch.cancel()
+            self._refresh_watch = None
+        if self._scheduler is not None:
+            if self._refresh_group is not None:
+                self._refresh_group.remove(self._scheduler)
+            self._scheduler = None
+        if self._snapshot_store is not None:
+            repository = getattr(self.client, '_features_repository', None)
+            if repository is not None:
+                repository.remove_callback(self._on_features_refreshed)
+            self._snapshot_store.release_refresh_lock()
         if self.client:
-            await self.client.close()
+            loop = self._loop_thread.loop
+            if (
+                self._loop_thread.is_running()
+                and loop is not None
+                and not self._loop_thread.in_loop_thread()
+                and asyncio.get_running_loop() is not loop
+                and self._client_loop is loop
+            ):
+                # The client's refresh task lives on the loop thread; close it there
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._close_client(self.client), loop))
+            else:
+                await self._close_client(self.client)
             self.client = None
-            self.initialized = False 
\ No newline at end of file
+            self.initialized = False
+        self._release_repository()
+        if self._conditions_installed:
+            conditions.uninstall()
+            self._conditions_installed = False
+        # Forks of a closed provider's process have nothing to restart
+        self._prefork = False
+        if not self._shared_runtime:
+            self._loop_thread.stop()
+            self._bridge_executor.shutdown() 
\ No newline at end of file
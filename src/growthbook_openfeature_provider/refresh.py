@@ -0,0 +1,215 @@
+"""Jittered stale-while-revalidate refresh scheduling.
+
+GrowthBook's own refresh loop polls on a fixed interval, so every worker
+started together (a deploy, an autoscaling step) refreshes at the same moment,
+over and over. `RefreshScheduler` runs one refresh coroutine in the
+background instead:
+
+* every `interval` seconds, each delay randomized by up to `jitter` (a
+  fraction of the delay) so workers drift apart instead of staying in step
+* after a failure, retries back off exponentially from `backoff` up to
+  `max_backoff` seconds (also jittered); a success returns to the interval
+
+Refreshes never block evaluations: the last applied payload keeps being
+served (stale) until a refresh replaces it. The scheduler tracks how old the
+served payload is and how long refreshes take.
+
+`RefreshGroup` drives many schedulers from one background task, so a process
+serving many client keys runs one timer instead of one per key.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshScheduler:
+    """Background refresh loop with jitter, backoff and freshness metrics.
+
+    Args:
+        refresh: Awaited for every refresh; raising marks it failed
+        interval: Seconds between successful refreshes
+        jitter: Randomize each delay by up to this fraction of it, 0 disables
+        backoff: Delay in seconds before the first retry after a failure
+        max_backoff: Upper bound of the retry delay in seconds
+        on_success: Called after a successful refresh
+        on_failure: Called with the exception after a failed refresh
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[], Awaitable[Any]],
+        interval: float,
+        jitter: float = 0.1,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        on_success: Optional[Callable[[], None]] = None,
+        on_failure: Optional[Callable[[Exception], None]] = None,
+    ):
+        if interval <= 0:
+            raise ValueError("refresh interval must be positive")
+        if not 0 <= jitter < 1:
+            raise ValueError("refresh_jitter must be in [0, 1)")
+        if backoff <= 0 or max_backoff < backoff:
+            raise ValueError("refresh backoff must be positive and max_backoff >= backoff")
+        self._refresh = refresh
+        self._interval = interval
+        self._jitter = jitter
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._on_success = on_success
+        self._on_failure = on_failure
+
+        self._refreshes = 0
+        self._failures = 0
+        self._consecutive_failures = 0
+        self._last_latency: Optional[float] = None
+        self._total_latency = 0.0
+        self._fresh_at = time.monotonic()
+        self._next_at: Optional[float] = None
+
+    def mark_fresh(self) -> None:
+        """Record that the served payload was just confirmed current"""
+        self._fresh_at = time.monotonic()
+
+    def _jittered(self, delay: float) -> float:
+        if not self._jitter:
+            return delay
+        return delay * (1 + self._jitter * (2 * random.random() - 1))
+
+    def next_delay(self) -> float:
+        """Seconds to wait before the next refresh, given the failures so far"""
+        if self._consecutive_failures == 0:
+            return self._jittered(self._interval)
+        backoff = self._backoff * 2 ** (self._consecutive_failures - 1)
+        return self._jittered(min(backoff, self._max_backoff))
+
+    def schedule_next(self) -> float:
+        """Pick the delay before the next refresh; returns the monotonic time it is due"""
+        self._next_at = time.monotonic() + self.next_delay()
+        return self._next_at
+
+    async def run(self) -> None:
+        """Refresh until cancelled"""
+        while True:
+            await asyncio.sleep(self.schedule_next() - time.monotonic())
+            await self.refresh_now()
+
+    async def refresh_now(self) -> bool:
+        """Run one refresh and record its outcome; True on success"""
+        started = time.monotonic()
+        try:
+            await self._refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            finished = time.monotonic()
+            self._failures += 1
+            self._consecutive_failures += 1
+            self._record_latency(finished - started)
+            logger.warning(f"Feature refresh failed ({self._consecutive_failures} in a row): {e}")
+            if self._on_failure is not None:
+                self._on_failure(e)
+            return False
+
+        finished = time.monotonic()
+        self._refreshes += 1
+        self._consecutive_failures = 0
+        self._fresh_at = finished
+        self._record_latency(finished - started)
+        if self._on_success is not None:
+            self._on_success()
+        return True
+
+    def _record_latency(self, latency: float) -> None:
+        self._last_latency = latency
+        self._total_latency += latency
+
+    def stats(self) -> Dict[str, Any]:
+        """Return refresh counters, payload age and refresh latency"""
+        now = time.monotonic()
+        attempts = self._refreshes + self._failures
+        return {
+            "refreshes": self._refreshes,
+            "failures": self._failures,
+            "consecutive_failures": self._consecutive_failures,
+            "payload_age_seconds": now - self._fresh_at,
+            "last_refresh_latency_seconds": self._last_latency,
+            "mean_refresh_latency_seconds": self._total_latency / attempts if attempts else None,
+            "next_refresh_in_seconds": max(0.0, self._next_at - now) if self._next_at is not None else None,
+        }
+
+
+class RefreshGroup:
+    """Runs the refreshes of many schedulers from one background task.
+
+    Each scheduler keeps its own interval, jitter, backoff and statistics;
+    the group sleeps until the earliest refresh is due and starts every due
+    refresh. Schedulers are added and removed on the group's event loop.
+    """
+
+    def __init__(self):
+        self._due: List[Tuple[float, int, RefreshScheduler]] = []
+        self._order = itertools.count()
+        self._members: Set[RefreshScheduler] = set()
+        self._refreshing: Set["asyncio.Task[None]"] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def add(self, scheduler: RefreshScheduler) -> None:
+        """Start refreshing `scheduler` on its own schedule"""
+        self._members.add(scheduler)
+        self._push(scheduler)
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+
+    def remove(self, scheduler: RefreshScheduler) -> None:
+        """Stop refreshing `scheduler`; a refresh already running completes"""
+        self._members.discard(scheduler)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def _push(self, scheduler: RefreshScheduler) -> None:
+        heapq.heappush(self._due, (scheduler.schedule_next(), next(self._order), scheduler))
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            while self._due and self._due[0][0] <= now:
+                _, _, scheduler = heapq.heappop(self._due)
+                if scheduler in self._members:
+                    task = asyncio.ensure_future(self._refresh(scheduler))
+                    self._refreshing.add(task)
+                    task.add_done_callback(self._refreshing.discard)
+            timeout = self._due[0][0] - now if self._due else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh(self, scheduler: RefreshScheduler) -> None:
+        await scheduler.refresh_now()
+        if scheduler in self._members:
+            self._push(scheduler)
+            self._wakeup.set()
+
+    async def close(self) -> None:
+        """Cancel the timer task and any refresh in progress"""
+        self._members.clear()
+        self._due.clear()
+        tasks = list(self._refreshing)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
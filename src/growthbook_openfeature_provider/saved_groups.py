@@ -0,0 +1,354 @@
+"""Compact storage for large saved-group ID lists.
+
+GrowthBook payloads carry saved groups as JSON lists, which Python holds as a
+list of separate str/int objects (roughly 70 bytes per short string ID) that
+`$inGroup` scans linearly. `CompactGroupValues` stores the same values in flat
+arrays instead:
+
+* strings: a sorted `array` of their hashes plus one UTF-8 blob with offsets,
+  used to verify hash hits exactly
+* integers: a sorted `array` of int64
+* anything else (floats, booleans, null, objects): a plain list
+
+Lookups are a binary search over the hashes or integers, optionally behind a
+Bloom filter so most misses are answered in O(1).
+
+`CompactGroupValues` subclasses `list` so GrowthBook's own condition code keeps
+working on it unchanged (membership, iteration, `index`). Its list storage is
+empty: the read-only list methods are overridden to see the values, and the
+mutating ones raise TypeError. C code that reads a list's storage directly
+still sees an empty list, most notably the standard library's C JSON encoder
+(`json.dumps` without `indent`), which is why compaction is opt-in. Some
+methods defer to private `growthbook.core` functions, checked by
+`missing_core_functions`.
+"""
+import math
+import operator
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from growthbook import core as gb_core
+
+# growthbook.core functions CompactGroupValues defers to
+_CORE_FUNCTIONS = ("isIn", "_contains_boolean_or_number")
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+_MASK_64 = (1 << 64) - 1
+
+
+def missing_core_functions() -> List[str]:
+    """Names of `_CORE_FUNCTIONS` the installed growthbook does not have"""
+    return [name for name in _CORE_FUNCTIONS if not callable(getattr(gb_core, name, None))]
+
+
+def _is_int64(value: Any) -> bool:
+    return type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+
+
+def _mix(h: int) -> int:
+    # Spread hash(int) == int over all bits before deriving Bloom positions
+    h = (h * 0x9E3779B97F4A7C15) & _MASK_64
+    return h ^ (h >> 29)
+
+
+class _BloomFilter:
+    def __init__(self, keys: List[int], bits_per_value: int):
+        self._size = max(64, len(keys) * bits_per_value)
+        self._hashes = max(1, min(8, round(bits_per_value * math.log(2))))
+        self._bits = bytearray((self._size + 7) // 8)
+        for key in keys:
+            for position in self._positions(key):
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def _positions(self, key: int) -> Iterator[int]:
+        h = _mix(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self._hashes):
+            yield (h1 + i * h2) % self._size
+
+    def might_contain(self, key: int) -> bool:
+        bits = self._bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+
+class CompactGroupValues(list):
+    """Read-only, memory-compact stand-in for a saved group's list of values"""
+
+    def __init__(self, values: Iterable[Any], bloom_bits_per_value: int = 0):
+        super().__init__()
+        strings = set()
+        ints = set()
+        others: List[Any] = []
+        for value in values:
+            if type(value) is str:
+                strings.add(value)
+            elif _is_int64(value):
+                ints.add(value)
+            else:
+                # Not deduplicated: == would merge True with 1 and 1.0
+                others.append(value)
+
+        by_hash = sorted((hash(s), s.encode("utf-8", "surrogatepass")) for s in strings)
+        self._str_hashes = array("q", (h for h, _ in by_hash))
+        self._str_blob = b"".join(encoded for _, encoded in by_hash)
+        self._str_offsets = array("I" if len(self._str_blob) < 1 << 32 else "Q", [0])
+        for _, encoded in by_hash:
+            self._str_offsets.append(self._str_offsets[-1] + len(encoded))
+        self._ints = array("q", sorted(ints))
+        self._others = others
+        self._others_hashable = True
+        try:
+            frozenset(others)
+        except TypeError:
+            self._others_hashable = False
+
+        self._bloom: Optional[_BloomFilter] = None
+        if bloom_bits_per_value > 0:
+            self._bloom = _BloomFilter(
+                list(self._str_hashes) + list(self._ints), bloom_bits_per_value
+            )
+
+    # -- exact lookups -------------------------------------------------
+
+    def _string_position(self, value: str) -> int:
+        """Index of `value` in the hash-ordered strings, or -1"""
+        h = hash(value)
+        if self._bloom is not None and not self._bloom.might_contain(h):
+            return -1
+        hashes = self._str_hashes
+        i = bisect_left(hashes, h)
+        if i == len(hashes) or hashes[i] != h:
+            return -1
+        encoded = value.encode("utf-8", "surrogatepass")
+        offsets = self._str_offsets
+        while i < len(hashes) and hashes[i] == h:
+            if self._str_blob[offsets[i]:offsets[i + 1]] == encoded:
+                return i
+            i += 1
+        return -1
+
+    def _int_position(self, value: int) -> int:
+        """Index of `value` in the sorted integers, or -1"""
+        if not _INT64_MIN <= value <= _INT64_MAX:
+            return -1
+        if self._bloom is not None and not self._bloom.might_contain(value):
+            return -1
+        i = bisect_left(self._ints, value)
+        if i < len(self._ints) and self._ints[i] == value:
+            return i
+        return -1
+
+    def _integral(self, value: Any) -> Optional[int]:
+        """The int a number equals under ==, or None"""
+        if isinstance(value, int):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return None
+
+    def __contains__(self, value: Any) -> bool:
+        # Same answers as `value in list_of_values`
+        if isinstance(value, str):
+            return self._string_position(value) >= 0 or value in self._others
+        integral = self._integral(value)
+        if integral is not None and self._int_position(integral) >= 0:
+            return True
+        return value in self._others
+
+    def _contains_boolean_or_number(self, value: Any) -> bool:
+        """growthbook.core._contains_boolean_or_number for 0/1 and False/True"""
+        if isinstance(value, bool):
+            return any(type(v) is bool and v == value for v in self._others)
+        if isinstance(value, (int, float)):
+            if self._int_position(int(value)) >= 0:
+                return True
+            return any(not isinstance(v, bool) and v == value for v in self._others)
+        return gb_core._contains_boolean_or_number(list(self), value)
+
+    def isin(self, value: Any) -> bool:
+        """Same result as `growthbook.core.isIn(list(self), value)`"""
+        if isinstance(value, list):
+            if not self._others_hashable:
+                return gb_core.isIn(list(self), value)
+            try:
+                matches = [v for v in set(value) if v in self]
+            except TypeError:
+                return gb_core.isIn(list(self), value)
+            # Python collapses booleans with 0/1; any other match is unambiguous
+            if not matches or any(not (m == 0 or m == 1) for m in matches):
+                return bool(matches)
+            return any(self._contains_boolean_or_number(v) for v in value if v == 0 or v == 1)
+        if value == 0 or value == 1:
+            return self._contains_boolean_or_number(value)
+        return value in self
+
+    # -- list protocol used by GrowthBook -----------------------------
+
+    def __len__(self) -> int:
+        return len(self._str_hashes) + len(self._ints) + len(self._others)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Any]:
+        blob, offsets = self._str_blob, self._str_offsets
+        for i in range(len(self._str_hashes)):
+            yield blob[offsets[i]:offsets[i + 1]].decode("utf-8", "surrogatepass")
+        yield from self._ints
+        yield from self._others
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return list(self)[index]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("list index out of range")
+        num_strings = len(self._str_hashes)
+        if index < num_strings:
+            start, end = self._str_offsets[index], self._str_offsets[index + 1]
+            return self._str_blob[start:end].decode("utf-8", "surrogatepass")
+        index -= num_strings
+        if index < len(self._ints):
+            return self._ints[index]
+        return self._others[index - len(self._ints)]
+
+    def index(self, value: Any, start: int = 0, stop: int = _INT64_MAX) -> int:
+        """Position of the first value == `value` at or after `start`"""
+        num_strings = len(self._str_hashes)
+        num_ints = len(self._ints)
+        if isinstance(value, str):
+            i = self._string_position(value)
+            if i >= 0 and start <= i < stop:
+                return i
+        else:
+            integral = self._integral(value)
+            if integral is not None:
+                i = self._int_position(integral)
+                if i >= 0 and start <= num_strings + i < stop:
+                    return num_strings + i
+        base = num_strings + num_ints
+        for i in range(max(start - base, 0), len(self._others)):
+            if base + i >= stop:
+                break
+            if self._others[i] == value:
+                return base + i
+        raise ValueError(f"{value!r} is not in list")
+
+    def __reversed__(self) -> Iterator[Any]:
+        return reversed(list(self))
+
+    def count(self, value: Any) -> int:
+        """Number of values equal to `value`"""
+        return sum(1 for v in self if v is value or v == value)
+
+    def copy(self) -> List[Any]:
+        """The values as a plain list"""
+        return list(self)
+
+    def __add__(self, other: Any) -> Any:
+        if isinstance(other, list):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other: Any) -> Any:
+        if isinstance(other, list):
+            return list(other) + list(self)
+        return NotImplemented
+
+    def __mul__(self, times: Any) -> Any:
+        return list(self) * times
+
+    __rmul__ = __mul__
+
+    def _compare(self, other: Any, op: Any) -> Any:
+        if isinstance(other, list):
+            return op(list(self), list(other))
+        return NotImplemented
+
+    def __eq__(self, other: Any) -> Any:
+        return self._compare(other, operator.eq)
+
+    def __ne__(self, other: Any) -> Any:
+        return self._compare(other, operator.ne)
+
+    def __lt__(self, other: Any) -> Any:
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other: Any) -> Any:
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other: Any) -> Any:
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other: Any) -> Any:
+        return self._compare(other, operator.ge)
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> Any:
+        # The list storage is empty, so mutating it would silently do nothing
+        raise TypeError("CompactGroupValues is read-only")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only  # type: ignore[assignment]
+    append = extend = insert = pop = remove = clear = reverse = sort = _read_only  # type: ignore[assignment]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"CompactGroupValues({len(self)} values)"
+
+    def __reduce__(self):
+        # Worker processes and pickled snapshots get a plain list
+        return (list, (list(self),))
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + self.memory_bytes()
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held by the compact representation"""
+        size = (
+            self._str_hashes.itemsize * len(self._str_hashes)
+            + len(self._str_blob)
+            + self._str_offsets.itemsize * len(self._str_offsets)
+            + self._ints.itemsize * len(self._ints)
+        )
+        if self._bloom is not None:
+            size += self._bloom.memory_bytes()
+        return size
+
+
+def compact_saved_groups(
+    saved_groups: Optional[Dict[str, Any]],
+    min_size: int,
+    bloom_bits_per_value: int = 0
+) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Return `saved_groups` with lists of at least `min_size` values compacted.
+
+    Handles both the legacy form (`{id: [values]}`) and typed list groups
+    (`{id: {"type": "list", "values": [...]}}`). The given dict and its
+    entries are left as they are: compacted groups go into a copy, so the raw
+    payload can still be diffed, cached and serialized. Returns the groups
+    (the original dict when nothing was compacted) and the number of groups
+    compacted; groups that are already compact are left alone.
+    """
+    if not saved_groups or min_size <= 0:
+        return saved_groups, 0
+    compacted: Dict[str, Any] = {}
+    for group_id, entry in saved_groups.items():
+        if type(entry) is list and len(entry) >= min_size:
+            compacted[group_id] = CompactGroupValues(entry, bloom_bits_per_value)
+        elif isinstance(entry, dict) and entry.get("type") == "list":
+            values = entry.get("values")
+            if type(values) is list and len(values) >= min_size:
+                compacted[group_id] = {**entry, "values": CompactGroupValues(values, bloom_bits_per_value)}
+    if not compacted:
+        return saved_groups, 0
+    return {**saved_groups, **compacted}, len(compacted)
@@ -0,0 +1,134 @@
+"""On-disk feature snapshot shared by worker processes on one host.
+
+One worker (the holder of the refresh lock) fetches features from GrowthBook
+and writes them here; the others read the snapshot instead of fetching the
+same payload themselves. This saves network requests, not memory: every
+reader parses the body into its own objects. To share parsed features between
+workers, load them before forking (`GrowthBookProvider.initialize_prefork`).
+
+File layout: a single header line ``GBSNAP1 <version>\\n`` followed by the JSON
+payload. The version is the SHA-256 of the payload bytes, so readers can tell
+whether anything changed by reading the header only. Writes go to a temporary
+file in the same directory that is then atomically renamed over the snapshot,
+so readers never see a partial file.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GBSNAP1"
+_VERSION_LENGTH = 64  # hex SHA-256
+_HEADER_LENGTH = len(MAGIC) + 1 + _VERSION_LENGTH + 1
+
+
+class FeatureSnapshotStore:
+    """Atomic, version-stamped feature payload file with a refresh lock"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._lock_fd: Optional[int] = None
+
+    def write(self, payload: Dict[str, Any]) -> str:
+        """Atomically replace the snapshot with `payload` and return its version.
+
+        Writing an unchanged payload leaves the file untouched.
+        """
+        body = json_codec.dumps(payload, sort_keys=True)
+        version = hashlib.sha256(body).hexdigest()
+        if self.read_version() == version:
+            return version
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".gbsnap-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + b" " + version.encode("ascii") + b"\n")
+                f.write(body)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return version
+
+    def read_version(self) -> Optional[str]:
+        """Return the version of the current snapshot, or None if there is none"""
+        result = self._read(with_payload=False)
+        return result[0] if result else None
+
+    def read(self, known_version: Optional[str] = None) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Read the snapshot.
+
+        Returns:
+            None when there is no valid snapshot, otherwise (version, payload).
+            The payload is None when the version equals `known_version`, in
+            which case the body is not parsed.
+        """
+        return self._read(with_payload=True, known_version=known_version)
+
+    def _read(self, with_payload: bool, known_version: Optional[str] = None):
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER_LENGTH)
+                if len(header) < _HEADER_LENGTH:
+                    return None
+                if not header.startswith(MAGIC + b" ") or header[-1:] != b"\n":
+                    logger.warning(f"Ignoring invalid feature snapshot at {self.path}")
+                    return None
+                version = header[len(MAGIC) + 1:-1].decode("ascii")
+                if not with_payload or version == known_version:
+                    return version, None
+                return version, json_codec.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read feature snapshot at {self.path}: {e}")
+            return None
+
+    def try_acquire_refresh_lock(self) -> bool:
+        """Try to become the process that refreshes the snapshot (non-blocking).
+
+        The lock is released by `release_refresh_lock` or when the process
+        exits. Without `fcntl` (Windows) every process refreshes on its own.
+        """
+        if self._lock_fd is not None:
+            return True
+        if fcntl is None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def has_refresh_lock(self) -> bool:
+        return self._lock_fd is not None or fcntl is None
+
+    def release_refresh_lock(self) -> None:
+        if self._lock_fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._lock_fd)
+            self._lock_fd = None
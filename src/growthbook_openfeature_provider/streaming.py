@@ -0,0 +1,217 @@
+"""Server-sent event subscription to GrowthBook feature updates.
+
+GrowthBook (and GrowthBook Proxy) push feature changes to
+``{api_host}/sub/{client_key}`` as server-sent events:
+
+* ``features``: the new payload, inline in the event data
+* ``features-updated``: a signal to fetch the payload again
+
+`FeatureStream` keeps that connection open on an asyncio loop and hands every
+event to a callback as soon as it is complete. Events are parsed from raw
+chunks rather than with line-based reads, since a full payload on one
+``data:`` line easily exceeds aiohttp's line length limit.
+
+Events larger than `max_event_bytes` are dropped while they arrive, so one
+oversized event cannot grow the read buffer without bound.
+
+When the connection drops, `FeatureStream` reconnects with exponential backoff
+and jitter. A server closing a stream that delivered events is not a failure:
+it reconnects after the first delay again. It does not serve features itself: the callbacks decide what to do
+while disconnected (the provider keeps serving the last payload it applied).
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_CONNECT_TIMEOUT = 30.0
+
+
+class FeatureStream:
+    """Reconnecting server-sent event subscription.
+
+    Args:
+        url: Event stream URL
+        on_event: Awaited with (event type, data) for every complete event
+        on_connect: Awaited once a connection is established, with True when
+            it replaces an earlier one (events may have been missed meanwhile)
+        on_disconnect: Awaited with a reason when an established connection is lost
+        reconnect_delay: Delay before the first reconnect attempt, in seconds
+        max_reconnect_delay: Upper bound of the backoff delay, in seconds
+        idle_timeout: Reconnect when nothing (not even a comment) arrives for
+            this many seconds; None waits forever
+        headers: Extra request headers
+        max_event_bytes: Drop events whose data is larger than this many
+            bytes, None disables
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_event: Callable[[str, str], Awaitable[None]],
+        on_connect: Optional[Callable[[bool], Awaitable[None]]] = None,
+        on_disconnect: Optional[Callable[[str], Awaitable[None]]] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 60.0,
+        idle_timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_event_bytes: Optional[int] = None,
+    ):
+        if reconnect_delay <= 0 or max_reconnect_delay < reconnect_delay:
+            raise ValueError("reconnect delays must be positive and max_reconnect_delay >= reconnect_delay")
+        self.url = url
+        self._on_event = on_event
+        self._on_connect = on_connect
+        self._on_disconnect = on_disconnect
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._idle_timeout = idle_timeout
+        self._max_event_bytes = max_event_bytes
+        self._headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+        self._headers.update(headers or {})
+
+        self._connected = False
+        self._connects = 0
+        self._failures = 0
+        self._events = 0
+        self._dropped_events = 0
+        self._last_event_at: Optional[float] = None
+        self._disconnected_at: Optional[float] = time.monotonic()
+
+    async def run(self) -> None:
+        """Stay subscribed until cancelled"""
+        delay = self._reconnect_delay
+        while True:
+            events = self._events
+            closed_cleanly = False
+            try:
+                await self._stream()
+                reason = "stream closed by server"
+                closed_cleanly = True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+
+            was_connected = self._connected
+            self._connected = False
+            # A server ending a stream that worked (e.g. a proxy recycling
+            # connections) is not a failure
+            productive = closed_cleanly and self._events > events
+            if productive:
+                self._failures = 0
+            else:
+                self._failures += 1
+            if was_connected:
+                # A working connection resets the backoff
+                delay = self._reconnect_delay
+                self._disconnected_at = time.monotonic()
+                if self._on_disconnect is not None:
+                    try:
+                        await self._on_disconnect(reason)
+                    except Exception:
+                        logger.exception("Error in feature stream disconnect handler")
+
+            # Equal jitter: at least half the delay, so retries stay spread out
+            wait = delay / 2 + random.random() * delay / 2
+            logger.warning(f"Feature stream unavailable ({reason}); reconnecting in {wait:.2f}s")
+            await asyncio.sleep(wait)
+            if not productive:
+                delay = min(delay * 2, self._max_reconnect_delay)
+
+    async def _stream(self) -> None:
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=_CONNECT_TIMEOUT, sock_read=self._idle_timeout)
+        async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
+            async with session.get(self.url) as response:
+                response.raise_for_status()
+                reconnected = self._connects > 0
+                self._connected = True
+                self._connects += 1
+                self._disconnected_at = None
+                if self._on_connect is not None:
+                    await self._on_connect(reconnected)
+                await self._read_events(response.content)
+
+    async def _read_events(self, content: Any) -> None:
+        limit = self._max_event_bytes
+        # Longest line an event within the limit can have: "data: " + data + "\r"
+        max_line = limit + len(b"data: \r") if limit is not None else None
+        pending = bytearray()
+        scanned = 0
+        event_type = ""
+        data: List[str] = []
+        size = 0
+        oversized = False
+        # Set when the start of the current line was dropped
+        partial_line = False
+        async for chunk in content.iter_any():
+            pending += chunk
+            start = 0
+            while True:
+                end = pending.find(b"\n", max(start, scanned))
+                if end < 0:
+                    break
+                line = pending[start:end].decode("utf-8").rstrip("\r")
+                start = end + 1
+                if partial_line:
+                    partial_line = False
+                    continue
+
+                if not line:
+                    if oversized:
+                        self._drop(event_type or "message")
+                    elif event_type or data:
+                        await self._dispatch(event_type or "message", "\n".join(data))
+                    event_type, data, size, oversized = "", [], 0, False
+                elif line.startswith(":"):
+                    continue  # comment / keep-alive
+                else:
+                    name, _, value = line.partition(":")
+                    if value.startswith(" "):
+                        value = value[1:]
+                    if name == "event":
+                        event_type = value
+                    elif name == "data" and not oversized:
+                        # Data lines are joined with newlines
+                        size += len(value.encode("utf-8")) + (1 if data else 0)
+                        if limit is not None and size > limit:
+                            oversized, data = True, []
+                        else:
+                            data.append(value)
+            del pending[:start]
+            scanned = len(pending)
+            if max_line is not None and scanned > max_line:
+                # An unfinished line already too long for any event we accept
+                oversized, data, partial_line = True, [], True
+                del pending[:]
+                scanned = 0
+
+    def _drop(self, event_type: str) -> None:
+        self._dropped_events += 1
+        logger.warning(f"Dropped feature stream event {event_type!r} larger than {self._max_event_bytes} bytes")
+
+    async def _dispatch(self, event_type: str, data: str) -> None:
+        self._events += 1
+        self._last_event_at = time.monotonic()
+        try:
+            await self._on_event(event_type, data)
+        except Exception:
+            logger.exception(f"Error handling feature stream event {event_type!r}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection state and counters"""
+        now = time.monotonic()
+        return {
+            "connected": self._connected,
+            "connects": self._connects,
+            "failures": self._failures,
+            "events": self._events,
+            "dropped_events": self._dropped_events,
+            "last_event_age_seconds": now - self._last_event_at if self._last_event_at is not None else None,
+            "disconnected_seconds": now - self._disconnected_at if self._disconnected_at is not None else None,
+        }
@@ -1,4 +1,121 @@
 import pytest
 import asyncio
+import hashlib
+import json
+import threading
 
-# Remove the event_loop fixture entirely 
\ No newline at end of file
+from aiohttp import web
+
+# Remove the event_loop fixture entirely
+
+
+class GrowthBookStandIn:
+    """Local stand-in for GrowthBook's features endpoint and event stream.
+
+    Serves `/api/features/<key>` (with ETags) and `/sub/<key>` from a loop on
+    its own thread, so tests can push events, drop connections and simulate
+    outages while the provider runs its own loop. Payloads of other client
+    keys can be served from `payloads`.
+    """
+
+    def __init__(self, client_key: str = "sdk-stream-test"):
+        self.client_key = client_key
+        self.payload = {"features": {}, "savedGroups": {}}
+        self.payloads = {}
+        self.available = True
+        self.subscriptions = 0
+        self.feature_requests = 0
+        self.not_modified = 0
+        # Client (host, port) pairs seen by the features endpoint
+        self.connections = set()
+        self._streams = set()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._runner = None
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_site(), self._loop).result(timeout=5)
+
+    def stop(self) -> None:
+        self.drop_connections()
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    async def _start_site(self) -> None:
+        app = web.Application()
+        app.router.add_get("/api/features/{client_key}", self._features)
+        app.router.add_get(f"/sub/{self.client_key}", self._subscribe)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def _features(self, request):
+        self.feature_requests += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if not self.available:
+            return web.Response(status=503)
+        client_key = request.match_info["client_key"]
+        payload = self.payload if client_key == self.client_key else self.payloads.get(client_key)
+        if payload is None:
+            return web.Response(status=404)
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    async def _subscribe(self, request):
+        if not self.available:
+            return web.Response(status=503)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        queue = asyncio.Queue()
+        self._streams.add(queue)
+        self.subscriptions += 1
+        try:
+            await response.write(b": connected\n\n")
+            while True:
+                message = await queue.get()
+                if message is None:
+                    break
+                await response.write(message)
+        finally:
+            self._streams.discard(queue)
+        return response
+
+    def _broadcast(self, message) -> None:
+        def put():
+            for queue in list(self._streams):
+                queue.put_nowait(message)
+        self._loop.call_soon_threadsafe(put)
+
+    def send(self, event: str, data: str = "") -> None:
+        lines = [f"event: {event}"] + [f"data: {line}" for line in data.splitlines()]
+        self._broadcast(("\r\n".join(lines) + "\r\n\r\n").encode("utf-8"))
+
+    def publish(self, payload) -> None:
+        """Send a payload inline (spread over several data lines)"""
+        self.payload = payload
+        self.send("features", json.dumps(payload, indent=1))
+
+    def drop_connections(self) -> None:
+        self._broadcast(None)
+
+
+@pytest.fixture
+def growthbook_server():
+    server = GrowthBookStandIn()
+    server.start()
+    yield server
+    server.stop()
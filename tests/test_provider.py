@@ -8,6 +8,8 @@ This test suite covers:
 4. Legacy compatibility (run_async_legacy)
 5. Error handling and edge cases
 """
+import os
+import json
 import pytest
 import asyncio
 import logging
@@ -66,12 +68,14 @@ async def mock_features():
     }
 
 @pytest.fixture
-def mocked_provider():
+def mocked_provider(request):
     """Create provider with mocked features for core functionality testing"""
     provider = GrowthBookProvider(GrowthBookProviderOptions(
         api_host="https://cdn.growthbook.io",
         client_key="test-key",
-        enabled=True
+        enabled=True,
+        # Extra options from indirect parametrization
+        **getattr(request, "param", {})
     ))
     
     # Mock the feature repository loading
@@ -179,7 +183,7 @@ async def async_mocked_provider():
         }
         
         # Initialize the provider asynchronously
-        await provider.initialize()
+        await provider.initialize_async()
         provider.initialized = True
     
     yield provider
@@ -602,7 +606,7 @@ async def test_async_performance_no_blocking():
         mock_client.initialize = AsyncMock(return_value=True)
         mock_client.eval_feature = AsyncMock(return_value=None)
         
-        await provider.initialize()
+        await provider.initialize_async()
         provider.initialized = True
         
         context = EvaluationContext(targeting_key="test-user")
@@ -734,7 +738,7 @@ async def test_provider_close_async():
     mock_client.close = AsyncMock()
     
     provider.client = mock_client
-    await provider.initialize()
+    await provider.initialize_async()
     provider.initialized = True
     
     # Close should work without issues
@@ -755,4 +759,1696 @@ def test_sync_and_async_coexistence(mocked_provider, evaluation_context):
     
     # Provider should be ready for async methods too
     assert provider.initialized is True
-    assert provider.client is not None 
\ No newline at end of file
+    assert provider.client is not None 
+
+def test_sync_evaluations_share_loop_thread(mocked_provider, evaluation_context):
+    """Test that sync evaluations run on the provider's persistent loop thread"""
+    provider = mocked_provider
+    
+    assert provider._loop_thread.is_running()
+    loop = provider._loop_thread.loop
+    
+    for _ in range(5):
+        result = provider.resolve_boolean_details("simple-flag", False, evaluation_context)
+        assert result.value is True
+    
+    # No new loop is created per evaluation
+    assert provider._loop_thread.loop is loop
+    
+    run_async_legacy(provider.close())
+    assert not provider._loop_thread.is_running()
+    assert provider.client is None
+
+def test_sync_evaluation_fast_path(mocked_provider, evaluation_context):
+    """Test that sync evaluation reads the feature snapshot without asyncio"""
+    provider = mocked_provider
+    
+    with patch.object(provider, '_run_sync', side_effect=AssertionError("asyncio used")), \
+            patch.object(provider.client, 'eval_feature', side_effect=AssertionError("asyncio used")):
+        bool_result = provider.resolve_boolean_details("simple-flag", False, evaluation_context)
+        targeted = provider.resolve_boolean_details("targeted-flag", False, evaluation_context)
+        experiment = provider.resolve_string_details("experiment", "control", evaluation_context)
+    
+    assert bool_result.value is True
+    assert targeted.value is True
+    assert targeted.reason == Reason.TARGETING_MATCH
+    assert experiment.reason == Reason.SPLIT
+    assert experiment.value in ["A", "B"]
+
+def test_bridge_executor_overflow_returns_default(evaluation_context):
+    """Test that a saturated bridge executor returns the default with a reason"""
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        bridge_max_workers=1,
+        bridge_max_queue=0,
+        bridge_overflow_policy="default"
+    ))
+    provider.client = MagicMock()
+    provider.client._global_context = None  # force the async path
+    provider.initialized = True
+    
+    import threading
+    release = threading.Event()
+    blocker = threading.Thread(target=provider._bridge_executor.run, args=(release.wait,))
+    blocker.start()
+    try:
+        # Wait until the only slot is taken
+        while provider.get_bridge_stats()["submitted"] == 0:
+            time.sleep(0.001)
+        
+        async def call_from_async():
+            return provider.resolve_boolean_details("any-flag", True, evaluation_context)
+        
+        result = asyncio.run(call_from_async())
+    finally:
+        release.set()
+        blocker.join()
+    
+    assert result.value is True
+    assert result.reason == Reason.ERROR
+    assert result.error_message == "Evaluation bridge queue is full"
+    stats = provider.get_bridge_stats()
+    assert stats["rejected"] == 1
+    assert stats["submitted"] == 1
+    assert stats["max_queue_wait_seconds"] >= 0
+
+def test_bridge_bound_applies_to_loop_thread_calls(evaluation_context):
+    """Test that evaluations handed to the loop thread respect the bridge's bound"""
+    async def on_experiment_viewed(experiment, result, user):
+        pass
+    
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        bridge_max_workers=1,
+        bridge_max_queue=0,
+        bridge_overflow_policy="default",
+        # Async tracking callbacks keep evaluations on the loop thread
+        on_experiment_viewed=on_experiment_viewed,
+        bootstrap_payload=BOOTSTRAP_PAYLOAD
+    ))
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        provider._background_init.result(timeout=5)
+    assert provider._loop_thread.is_running() and not provider._can_eval_sync()
+    
+    # Another call holds the only slot
+    with provider._bridge_executor.admit():
+        result = provider.resolve_string_details("bootstrap-flag", "default", evaluation_context)
+    assert result.value == "default"
+    assert result.error_message == "Evaluation bridge queue is full"
+    
+    assert provider.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-snapshot"
+    stats = provider.get_bridge_stats()
+    assert stats["rejected"] == 1
+    assert stats["submitted"] == 2
+    
+    run_async_legacy(provider.close())
+
+def test_bridge_executor_rejects_unknown_policy():
+    """Test that an invalid overflow policy is rejected"""
+    with pytest.raises(ValueError):
+        GrowthBookProvider(GrowthBookProviderOptions(
+            api_host="https://cdn.growthbook.io",
+            client_key="test-key",
+            bridge_overflow_policy="drop"
+        ))
+
+@pytest.fixture
+def cached_provider():
+    """Create provider with the result cache enabled and mocked features"""
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        result_cache_size=100,
+        on_experiment_viewed=MagicMock()
+    ))
+    
+    with patch('growthbook.FeatureRepository.load_features_async') as mock_load:
+        mock_load.return_value = {
+            "features": {
+                "targeted-flag": {
+                    "defaultValue": False,
+                    "rules": [{
+                        "id": "rule-1",
+                        "condition": {"country": "US"},
+                        "force": True
+                    }]
+                },
+                "experiment": {
+                    "defaultValue": "control",
+                    "rules": [{
+                        "variations": ["A", "B"],
+                        "key": "my-test",
+                        "coverage": 1.0,
+                        "weights": [0.5, 0.5]
+                    }]
+                }
+            },
+            "savedGroups": {}
+        }
+        provider.initialize_sync()
+    
+    yield provider
+    
+    run_async_legacy(provider.close())
+
+def test_result_cache_hits_and_invalidation(cached_provider, evaluation_context):
+    """Test that results are memoized and dropped when the payload changes"""
+    provider = cached_provider
+    
+    first = provider.resolve_boolean_details("targeted-flag", False, evaluation_context)
+    second = provider.resolve_boolean_details("targeted-flag", False, evaluation_context)
+    assert second == first and second is not first
+    assert first.value is True
+    assert provider.get_result_cache_stats()["hits"] == 1
+    
+    # Different expected type is a separate entry
+    assert provider.resolve_string_details("targeted-flag", "", evaluation_context).value == "True"
+    
+    # A new payload version invalidates cached results
+    provider._run_sync(provider.client.set_features({
+        "targeted-flag": {"defaultValue": False, "rules": []}
+    }))
+    third = provider.resolve_boolean_details("targeted-flag", False, evaluation_context)
+    assert third.value is False
+    assert provider.get_result_cache_stats()["size"] == 1
+
+def test_result_cache_hands_out_independent_results(cached_provider, evaluation_context):
+    """Test that modifying a resolved result does not change later resolutions"""
+    provider = cached_provider
+    provider._run_sync(provider.client.set_features({
+        "targeted-flag": {"defaultValue": False, "rules": [{"condition": {"country": "US"}, "force": True}]},
+        "config": {"defaultValue": {"theme": "dark", "limits": [1, 2]}}
+    }))
+    
+    first = provider.resolve_boolean_details("targeted-flag", False, evaluation_context)
+    first.value = False
+    first.flag_metadata["seen"] = True
+    again = provider.resolve_boolean_details("targeted-flag", False, evaluation_context)
+    assert again.value is True and again.flag_metadata == {}
+    
+    config = provider.resolve_object_details("config", {}, evaluation_context)
+    config.value["theme"] = "light"
+    assert provider.resolve_object_details("config", {}, evaluation_context).value["theme"] == "dark"
+    # Object values are not cached
+    assert provider.get_result_cache_stats()["size"] == 1
+
+def test_result_cache_ignores_results_of_replaced_payloads(cached_provider, evaluation_context):
+    """Test that a result computed while the payload is replaced is not served afterwards"""
+    provider = cached_provider
+    evaluate = provider._eval_feature_sync
+    replaced = []
+    
+    def evaluate_while_replacing(*args, **kwargs):
+        result = evaluate(*args, **kwargs)
+        if not replaced:
+            # Another thread applies a new payload and evaluates against it
+            replaced.append(True)
+            provider._run_sync(provider.client.set_features({
+                "targeted-flag": {"defaultValue": False, "rules": []}
+            }))
+            assert provider.resolve_boolean_details("targeted-flag", False, evaluation_context).value is False
+        return result
+    
+    with patch.object(provider, "_eval_feature_sync", side_effect=evaluate_while_replacing):
+        assert provider.resolve_boolean_details("targeted-flag", False, evaluation_context).value is True
+    assert provider.resolve_boolean_details("targeted-flag", False, evaluation_context).value is False
+
+def test_context_fingerprint_keeps_values_apart():
+    """Test that result cache keys tell apart values GrowthBook can tell apart"""
+    from growthbook_openfeature_provider.provider import _context_fingerprint
+    
+    def fingerprint(**attributes):
+        return _context_fingerprint(EvaluationContext(targeting_key="user-1", attributes=attributes))
+    
+    assert len({fingerprint(n=1), fingerprint(n=1.0), fingerprint(n=True)}) == 3
+    assert fingerprint(tags=["a", "b"], meta={"x": 1}) == fingerprint(tags=["a", "b"], meta={"x": 1})
+    assert fingerprint(tags=["a", "b"]) != fingerprint(tags=["b", "a"])
+    assert fingerprint(tags=("a", "b")) != fingerprint(tags=["a", "b"])
+    assert fingerprint(meta={"x": 1}) != fingerprint(meta={"x": True})
+    assert fingerprint(meta={"x": float("nan")}) != fingerprint(meta={"x": None})
+    assert fingerprint(country="US") != _context_fingerprint(EvaluationContext(targeting_key="user-2", attributes={"country": "US"}))
+
+def test_result_cache_bypassed_for_tracked_experiments(cached_provider, evaluation_context):
+    """Test that experiment exposures fire tracking and are never cached"""
+    provider = cached_provider
+    
+    first = provider.resolve_string_details("experiment", "control", evaluation_context)
+    second = provider.resolve_string_details("experiment", "control", evaluation_context)
+    
+    assert first.reason == Reason.SPLIT
+    assert second is not first
+    assert second.value == first.value
+    assert provider.get_result_cache_stats()["size"] == 0
+    assert provider.gb_options.on_experiment_viewed.called
+
+def test_compiled_conditions_match_interpreter():
+    """Test that compiled conditions agree with GrowthBook's condition interpreter"""
+    from growthbook import core as gb_core
+    from growthbook_openfeature_provider.conditions import compile_condition
+    interpret = getattr(gb_core.evalCondition, '__wrapped__', gb_core.evalCondition)
+    
+    saved_groups = {"beta": ["u1", "u2"], "staff": {"type": "condition", "condition": {"email": {"$regex": "@corp$"}}}}
+    conditions_to_check = [
+        {"country": "US"},
+        {"country": {"$in": ["US", "CA"]}, "age": {"$gte": 18}},
+        {"$or": [{"plan": "pro"}, {"id": {"$inGroup": "beta"}}]},
+        {"$nor": [{"country": "US"}], "$not": {"age": {"$lt": 21}}},
+        {"tags": {"$elemMatch": {"$eq": "vip"}}, "tags.0": {"$exists": True}},
+        {"tags": {"$size": {"$gt": 1}}, "address.city": {"$ne": "Paris"}},
+        {"$savedGroup": {"id": "staff"}},
+        {"appVersion": {"$vgte": "2.1.0"}, "email": {"$notRegex": "test"}},
+        {"age": {"$type": "number", "$nin": [13, 14]}},
+        {"$or": "not-a-list"},
+        {"$and": []},
+    ]
+    users = [
+        {"id": "u1", "country": "US", "age": 30, "tags": ["vip", "new"], "email": "a@corp", "appVersion": "2.10.0"},
+        {"id": "u3", "country": "FR", "age": 20, "plan": "pro", "address": {"city": "Paris"}, "tags": []},
+        {"id": "u2", "country": "CA", "age": "19", "email": "test@example.com", "appVersion": "v2.0.1"},
+        {},
+    ]
+    for condition in conditions_to_check:
+        matches = compile_condition(condition)
+        for attributes in users:
+            assert matches(attributes, saved_groups) == interpret(attributes, condition, saved_groups), (condition, attributes)
+
+def test_compiled_in_and_regex_indexes():
+    """Test set-indexed $in/$nin/$ini and precompiled $regex keep GrowthBook semantics"""
+    from growthbook_openfeature_provider.conditions import compile_condition
+    account_ids = [f"acct-{i}" for i in range(20000)] + [1, True]
+    
+    in_accounts = compile_condition({"accountId": {"$in": account_ids}})
+    assert in_accounts({"accountId": "acct-19999"}) is True
+    assert in_accounts({"accountId": "acct-20000"}) is False
+    assert in_accounts({"accountId": ["x", "acct-5"]}) is True
+    # Booleans and 0/1 stay distinct
+    assert in_accounts({"accountId": 1.0}) is True
+    assert compile_condition({"n": {"$in": [True]}})({"n": 1}) is False
+    assert compile_condition({"n": {"$nin": [0]}})({"n": False}) is True
+    assert compile_condition({"n": {"$in": [{"a": 1}]}})({"n": {"a": 1}}) is True
+    
+    assert compile_condition({"country": {"$ini": ["us", "CA"]}})({"country": "US"}) is True
+    assert compile_condition({"country": {"$nini": ["us"]}})({"country": ["FR", "Us"]}) is False
+    
+    corporate = compile_condition({"email": {"$regex": "@(example|corp)\\.com$"}})
+    assert corporate({"email": "a@corp.com"}) is True
+    assert corporate({"email": "a@corp.org"}) is False
+    assert corporate({}) is False
+    assert compile_condition({"email": {"$notRegex": "test"}})({}) is True
+    assert compile_condition({"email": {"$regex": "("}})({"email": "("}) is False
+
+@pytest.mark.parametrize("mocked_provider", [{"compile_conditions": True}], indirect=True)
+def test_provider_compiles_rule_conditions(mocked_provider):
+    """Test that rule conditions are compiled once per payload and still match"""
+    from growthbook_openfeature_provider.conditions import CompiledCondition
+    us = EvaluationContext(targeting_key="user-1", attributes={"country": "US"})
+    fr = EvaluationContext(targeting_key="user-2", attributes={"country": "FR"})
+    
+    assert mocked_provider.resolve_boolean_details("targeted-flag", False, us).value is True
+    assert mocked_provider.resolve_boolean_details("targeted-flag", False, fr).value is False
+    
+    rule = mocked_provider.client._global_context.features["targeted-flag"].rules[0]
+    assert isinstance(rule.condition, CompiledCondition)
+    assert rule.condition == {"country": "US"}
+    
+    mocked_provider._compile_conditions = False
+    mocked_provider._prepared_payload = None
+    rule.condition = {"country": "US"}
+    assert mocked_provider.resolve_boolean_details("targeted-flag", False, us).value is True
+    assert type(rule.condition) is dict
+
+def test_condition_dispatch_installed_only_while_open():
+    """Test that compiling providers wrap evalCondition while open and restore it on close"""
+    from growthbook import core as gb_core
+    before = gb_core.evalCondition
+    
+    def make_provider(**options):
+        provider = GrowthBookProvider(GrowthBookProviderOptions(
+            api_host="https://cdn.growthbook.io",
+            client_key="test-key",
+            bootstrap_payload=BOOTSTRAP_PAYLOAD,
+            **options
+        ))
+        with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+            provider.initialize_sync()
+            provider._background_init.result(timeout=5)
+        return provider
+    
+    plain = make_provider()
+    assert gb_core.evalCondition is before
+    first = make_provider(compile_conditions=True)
+    second = make_provider(compile_conditions=True)
+    assert getattr(gb_core.evalCondition, "_dispatches_compiled", False)
+    run_async_legacy(first.close())
+    assert getattr(gb_core.evalCondition, "_dispatches_compiled", False)
+    run_async_legacy(second.close())
+    assert gb_core.evalCondition is before
+    run_async_legacy(plain.close())
+
+def test_compiled_version_and_numeric_operands():
+    """Test that pre-parsed version and numeric operands compare like GrowthBook"""
+    from growthbook import core as gb_core
+    from growthbook_openfeature_provider import conditions
+    interpret = getattr(gb_core.evalCondition, '__wrapped__', gb_core.evalCondition)
+    
+    checks = [
+        {"appVersion": {"$vgte": "5.2.0", "$vlt": "6.0.0-beta"}},
+        {"appVersion": {"$veq": "v1.2.3+build5"}},
+        {"appVersion": {"$vne": 2}},
+        {"age": {"$gte": "18"}},
+        {"age": {"$lt": "not-a-number"}},
+        {"signup": {"$gt": "2024-01-01T00:00:00Z"}},
+    ]
+    users = [
+        {"appVersion": "5.10.3", "age": 30, "signup": "2024-03-01T12:00:00Z"},
+        {"appVersion": "6.0.0-alpha", "age": 17.5, "signup": "2023-12-31"},
+        {"appVersion": "1.2.3", "age": "21"},
+        {"appVersion": 2, "age": float("nan")},
+        {},
+    ]
+    for condition in checks:
+        matches = conditions.compile_condition(condition)
+        for attributes in users:
+            assert matches(attributes) == interpret(attributes, condition), (condition, attributes)
+    
+    conditions._padded_version.cache_clear()
+    app_version = conditions.compile_condition({"appVersion": {"$vgte": "5.2.0"}})
+    for _ in range(3):
+        assert app_version({"appVersion": "5.10.3"}) is True
+    assert conditions._padded_version.cache_info().hits == 2
+
+def test_unsupported_growthbook_disables_compilation(monkeypatch, caplog, evaluation_context):
+    """Test that compilation and compaction are skipped when growthbook lacks an internal they use"""
+    from growthbook import core as gb_core
+    from growthbook_openfeature_provider import conditions, saved_groups
+    monkeypatch.setattr(conditions, "_CORE_FUNCTIONS", conditions._CORE_FUNCTIONS + ("_gone",))
+    monkeypatch.setattr(saved_groups, "_CORE_FUNCTIONS", saved_groups._CORE_FUNCTIONS + ("_gone",))
+    evaluate = gb_core.evalCondition
+    with caplog.at_level(logging.WARNING):
+        provider = GrowthBookProvider(GrowthBookProviderOptions(
+            api_host="https://cdn.growthbook.io",
+            client_key="test-key",
+            compile_conditions=True,
+            compact_saved_groups=1,
+            bootstrap_payload={
+                "features": {"beta-flag": {"defaultValue": False, "rules": [{"condition": {"id": {"$inGroup": "beta"}}, "force": True}]}},
+                "savedGroups": {"beta": ["user-1"]}
+            }
+        ))
+    assert "compile_conditions disabled: the installed growthbook lacks _gone" in caplog.text
+    assert "compact_saved_groups disabled: the installed growthbook lacks _gone" in caplog.text
+    
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        assert gb_core.evalCondition is evaluate
+        assert type(provider.client._global_context.saved_groups["beta"]) is list
+        assert provider.resolve_boolean_details("beta-flag", False, EvaluationContext("user-1")).value is True
+        run_async_legacy(provider.close())
+
+def test_compact_saved_groups(evaluation_context):
+    """Test that large saved groups are compacted and still match like lists"""
+    from growthbook import core as gb_core
+    from growthbook_openfeature_provider.saved_groups import CompactGroupValues
+    
+    ids = [f"user-{i}" for i in range(5000)]
+    compact = CompactGroupValues(ids + [7, True, 2.5], bloom_bits_per_value=10)
+    assert len(compact) == 5003
+    assert "user-4999" in compact and "user-5000" not in compact
+    assert 7.0 in compact and 8 not in compact
+    # Booleans and numbers stay distinct like in GrowthBook
+    assert compact.isin(1) is False and compact.isin(True) is True
+    assert gb_core.isIn(compact, ["x", "user-3"]) is True
+    assert sorted(map(str, compact)) == sorted(map(str, ids + [7, True, 2.5]))
+    import pickle
+    assert type(pickle.loads(pickle.dumps(compact))) is list
+    
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        compact_saved_groups=100,
+        saved_group_bloom_bits=10,
+        bootstrap_payload={
+            "features": {
+                "beta-flag": {"defaultValue": False, "rules": [{"condition": {"id": {"$inGroup": "beta"}}, "force": True}]},
+                "typed-flag": {"defaultValue": False, "rules": [{"condition": {"$savedGroup": {"id": "typed"}}, "force": True}]}
+            },
+            "savedGroups": {
+                "beta": ids,
+                "typed": {"type": "list", "attributeKey": "id", "values": ids}
+            }
+        }
+    ))
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        provider._background_init.result(timeout=5)
+    
+    member = EvaluationContext(targeting_key="user-42")
+    outsider = EvaluationContext(targeting_key="user-99999")
+    for flag in ("beta-flag", "typed-flag"):
+        assert provider.resolve_boolean_details(flag, False, member).value is True
+        assert provider.resolve_boolean_details(flag, False, outsider).value is False
+    saved_groups = provider.client._global_context.saved_groups
+    assert type(saved_groups["beta"]) is CompactGroupValues
+    assert type(saved_groups["typed"]["values"]) is CompactGroupValues
+    
+    # The payload itself is not modified, so applying the same groups again
+    # reports only the flag that actually changed
+    payload = {
+        "features": {"beta-flag": {"defaultValue": True}},
+        "savedGroups": {"beta": ids, "typed": {"type": "list", "attributeKey": "id", "values": ids}}
+    }
+    events = []
+    provider.attach(lambda p, event, details: events.append(details))
+    provider._run_sync(provider.client.set_payload(payload))
+    provider._run_sync(provider.client.set_payload(payload))
+    assert type(payload["savedGroups"]["beta"]) is list
+    assert type(payload["savedGroups"]["typed"]["values"]) is list
+    assert [details.flags_changed for details in events] == [["beta-flag", "typed-flag"]]
+    assert type(provider.client._global_context.saved_groups["beta"]) is CompactGroupValues
+    
+    run_async_legacy(provider.close())
+
+def test_compact_saved_groups_list_api():
+    """Test that compacted groups behave as read-only lists and are opt-in"""
+    import copy
+    import json
+    from growthbook_openfeature_provider.saved_groups import CompactGroupValues
+    
+    values = ["b", "a", 3, 3.5]
+    compact = CompactGroupValues(values)
+    plain = list(compact)
+    assert sorted(map(str, plain)) == sorted(map(str, values))
+    assert compact + [] == plain and type(compact + []) is list
+    assert ["x"] + compact == ["x"] + plain
+    assert compact * 2 == plain * 2 and 2 * compact == plain * 2
+    assert compact.copy() == plain and type(compact.copy()) is list
+    assert copy.copy(compact) == plain
+    assert compact.count(3) == 1 and compact.count("z") == 0
+    assert list(reversed(compact)) == plain[::-1]
+    assert sorted(compact, key=str) == sorted(plain, key=str)
+    assert compact <= plain and not compact < plain
+    assert json.loads(json.dumps(compact, indent=1)) == plain
+    for mutate in (
+        lambda: compact.append("c"), lambda: compact.extend(["c"]), lambda: compact.insert(0, "c"),
+        lambda: compact.remove("a"), lambda: compact.pop(), lambda: compact.clear(),
+        lambda: compact.sort(), lambda: compact.reverse(), lambda: compact.__setitem__(0, "c"),
+        lambda: compact.__delitem__(0), lambda: compact.__iadd__(["c"]), lambda: compact.__imul__(2),
+    ):
+        with pytest.raises(TypeError):
+            mutate()
+    assert list(compact) == plain
+    
+    assert GrowthBookProviderOptions(api_host="https://cdn.growthbook.io", client_key="test-key").compact_saved_groups == 0
+
+def test_resolve_all(mocked_provider, evaluation_context):
+    """Test evaluating every loaded flag for one context in a single call"""
+    provider = mocked_provider
+    
+    results = provider.resolve_all(evaluation_context)
+    
+    assert set(results) == {
+        "simple-flag", "targeted-flag", "experiment", "string-flag", "number-flag", "object-flag"
+    }
+    assert results["simple-flag"] == {"value": True, "variant": None, "reason": Reason.DEFAULT}
+    assert results["targeted-flag"]["value"] is True
+    assert results["targeted-flag"]["reason"] == Reason.TARGETING_MATCH
+    assert results["experiment"]["reason"] == Reason.SPLIT
+    assert results["experiment"]["value"] == provider.resolve_string_details(
+        "experiment", "control", evaluation_context).value
+    assert results["object-flag"]["value"] == {"key": "value"}
+
+@pytest.mark.asyncio
+async def test_resolve_all_async(async_mocked_provider, evaluation_context):
+    """Test the async bulk evaluation API"""
+    provider = async_mocked_provider
+    
+    results = await provider.resolve_all_async(evaluation_context)
+    
+    assert results["number-flag"]["value"] == 42
+    assert results["targeted-flag"]["reason"] == Reason.TARGETING_MATCH
+    assert len(results) == 6
+
+def test_resolve_all_not_ready():
+    """Test that resolve_all returns nothing before initialization"""
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key"
+    ))
+    assert provider.resolve_all(EvaluationContext(targeting_key="user-1")) == {}
+
+def test_resolve_many(mocked_provider):
+    """Test streaming evaluation of one flag across many contexts"""
+    provider = mocked_provider
+    
+    def contexts():
+        for i in range(50):
+            country = "US" if i % 2 == 0 else "UK"
+            yield EvaluationContext(targeting_key=f"user-{i}", attributes={"country": country})
+    
+    results = provider.resolve_many("targeted-flag", contexts(), False)
+    assert not isinstance(results, list)
+    
+    results = list(results)
+    assert len(results) == 50
+    assert [r.value for r in results[:4]] == [True, False, True, False]
+    assert results[0].reason == Reason.TARGETING_MATCH
+    assert results[1].reason == Reason.DEFAULT
+    
+    # Results match single evaluations
+    experiment_contexts = [EvaluationContext(targeting_key=f"user-{i}") for i in range(20)]
+    batch = list(provider.resolve_many("experiment", experiment_contexts, "control"))
+    single = [provider.resolve_string_details("experiment", "control", c) for c in experiment_contexts]
+    assert [r.value for r in batch] == [r.value for r in single]
+    
+    # Unknown flags return the default for every context
+    unknown = list(provider.resolve_many("unknown-flag", experiment_contexts[:3], "fallback"))
+    assert [r.value for r in unknown] == ["fallback"] * 3
+
+def test_bucket_experiment_matches_scalar_evaluation(mocked_provider):
+    """Test vectorized bucketing against single flag evaluations"""
+    np = pytest.importorskip("numpy")
+    provider = mocked_provider
+    
+    user_ids = [f"user-{i}" for i in range(200)] + ["ünïcødé-用户"]
+    assigned = provider.bucket_experiment("experiment", np.array(user_ids))
+    
+    assert assigned.shape == (len(user_ids),)
+    for user_id, index in zip(user_ids, assigned):
+        result = provider.resolve_string_details(
+            "experiment", "control", EvaluationContext(targeting_key=user_id)
+        )
+        assert result.value == ["A", "B"][index]
+
+def test_bucketing_hash_is_bit_identical():
+    """Test that vectorized hashes equal GrowthBook's scalar gbhash"""
+    np = pytest.importorskip("numpy")
+    from growthbook.core import gbhash, chooseVariation, getBucketRanges
+    from growthbook_openfeature_provider.bucketing import gbhash_array, assign_variations
+    
+    values = [f"id-{i}" for i in range(500)] + ["", "é", "漢字", 12345, True]
+    for version in (1, 2):
+        expected = [gbhash("seed", str(v), version) for v in values]
+        assert gbhash_array("seed", values, version).tolist() == expected
+    
+    ranges = getBucketRanges(3, 0.7, [0.2, 0.3, 0.5])
+    expected = [
+        chooseVariation(gbhash("exp", str(v), 2), ranges) if str(v) else -1 for v in values
+    ]
+    assigned = assign_variations(values, "exp", 3, 0.7, [0.2, 0.3, 0.5], hash_version=2, chunk_size=64)
+    assert assigned.tolist() == expected
+
+def test_resolve_many_parallel(mocked_provider):
+    """Test process-pool bulk evaluation matches in-process evaluation"""
+    provider = mocked_provider
+    
+    contexts = [
+        EvaluationContext(targeting_key=f"user-{i}", attributes={"country": "US" if i % 3 else "UK"})
+        for i in range(250)
+    ]
+    
+    expected = list(provider.resolve_many("experiment", contexts, "control"))
+    results = list(provider.resolve_many_parallel(
+        "experiment", iter(contexts), "control", processes=2, chunk_size=40, mp_context="spawn"
+    ))
+    assert [r.value for r in results] == [r.value for r in expected]
+    assert [r.variant for r in results] == [r.variant for r in expected]
+    assert all(r.reason == Reason.SPLIT for r in results)
+    
+    targeted = list(provider.resolve_many_parallel(
+        "targeted-flag", contexts[:6], False, processes=2, chunk_size=4, mp_context="spawn"
+    ))
+    assert [r.value for r in targeted] == [False, True, True, False, True, True]
+
+BOOTSTRAP_PAYLOAD = {
+    "features": {
+        "bootstrap-flag": {"defaultValue": "from-snapshot", "rules": []}
+    },
+    "savedGroups": {}
+}
+
+def test_bootstrap_payload_ready_without_network(evaluation_context):
+    """Test that a bootstrap payload makes the provider ready immediately"""
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        bootstrap_payload=BOOTSTRAP_PAYLOAD
+    ))
+    
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        assert provider.initialized is True
+        result = provider.resolve_string_details("bootstrap-flag", "default", evaluation_context)
+        assert result.value == "from-snapshot"
+        
+        # A failed background fetch keeps serving the snapshot
+        provider._background_init.result(timeout=5)
+        assert provider.initialized is True
+        assert provider.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-snapshot"
+    
+    run_async_legacy(provider.close())
+
+def test_bootstrap_payload_from_file_refreshed_from_network(tmp_path, evaluation_context):
+    """Test bootstrapping from a JSON file followed by a background network refresh"""
+    import json
+    snapshot = tmp_path / "features.json"
+    snapshot.write_text(json.dumps(BOOTSTRAP_PAYLOAD))
+    
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        bootstrap_payload=str(snapshot)
+    ))
+    
+    network_payload = {
+        "features": {"bootstrap-flag": {"defaultValue": "from-network", "rules": []}},
+        "savedGroups": {}
+    }
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=network_payload)):
+        provider.initialize_sync()
+        assert provider.initialized is True
+        provider._background_init.result(timeout=5)
+    
+    result = provider.resolve_string_details("bootstrap-flag", "default", evaluation_context)
+    assert result.value == "from-network"
+    
+    run_async_legacy(provider.close())
+
+def _slow_fetch(payload, delay):
+    async def load_features_async(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return payload
+    return load_features_async
+
+def test_nonblocking_initialize_emits_ready(evaluation_context):
+    """Test that non-blocking initialize returns at once and emits PROVIDER_READY later"""
+    from openfeature.event import ProviderEvent
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        blocking_init=False
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    
+    with patch('growthbook.FeatureRepository.load_features_async', new=_slow_fetch(BOOTSTRAP_PAYLOAD, 0.2)):
+        provider.initialize_sync()
+        assert provider.initialized is False
+        assert events == []
+        
+        provider._background_init.result(timeout=5)
+        assert provider.initialized is True
+        assert [event for event, _ in events] == [ProviderEvent.PROVIDER_READY]
+        assert events[0][1].metadata == {"source": "network"}
+        assert provider.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-snapshot"
+    
+    run_async_legacy(provider.close())
+
+def test_init_deadline_serves_fallback_payload(evaluation_context):
+    """Test that a late first fetch falls back to the fallback payload, then replaces it"""
+    from openfeature.event import ProviderEvent
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        init_timeout=0.05,
+        fallback_payload=BOOTSTRAP_PAYLOAD
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    
+    network_payload = {
+        "features": {"bootstrap-flag": {"defaultValue": "from-network", "rules": []}},
+        "savedGroups": {}
+    }
+    with patch('growthbook.FeatureRepository.load_features_async', new=_slow_fetch(network_payload, 0.5)):
+        start = time.time()
+        provider.initialize_sync()
+        assert time.time() - start < 0.4
+        assert provider.initialized is True
+        assert provider.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-snapshot"
+        assert events[0][0] == ProviderEvent.PROVIDER_READY
+        assert events[0][1].metadata == {"source": "fallback"}
+        
+        provider._background_init.result(timeout=5)
+        assert provider.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-network"
+        assert events[-1][0] == ProviderEvent.PROVIDER_CONFIGURATION_CHANGED
+    
+    run_async_legacy(provider.close())
+
+def test_failed_initialize_without_fallback_emits_error():
+    """Test that a failed first fetch without a fallback emits PROVIDER_ERROR"""
+    from openfeature.event import ProviderEvent
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        blocking_init=False,
+        init_timeout=5
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        provider._background_init.result(timeout=5)
+        provider._init_deadline.result(timeout=5)
+    
+    assert provider.initialized is False
+    assert [event for event, _ in events] == [ProviderEvent.PROVIDER_ERROR]
+    assert events[0][1].error_code == ErrorCode.PROVIDER_NOT_READY
+    
+    run_async_legacy(provider.close())
+
+def test_incremental_payload_update(evaluation_context):
+    """Test that payload updates only rebuild changed features and report their keys"""
+    from openfeature.event import ProviderEvent
+    from growthbook_openfeature_provider.conditions import CompiledCondition
+    targeted = {"defaultValue": False, "rules": [{"condition": {"country": "US"}, "force": True}]}
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        compile_conditions=True,
+        bootstrap_payload={
+            "features": {
+                "targeted": targeted,
+                "banner": {"defaultValue": "old", "rules": []},
+                "legacy": {"defaultValue": 1, "rules": []}
+            },
+            "savedGroups": {}
+        }
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        provider._background_init.result(timeout=5)
+    
+    features = provider.client._global_context.features
+    unchanged = features["targeted"]
+    assert isinstance(unchanged.rules[0].condition, CompiledCondition)
+    
+    provider._run_sync(provider.client.set_payload({
+        "features": {
+            "targeted": {"defaultValue": False, "rules": [{"condition": {"country": "US"}, "force": True}]},
+            "banner": {"defaultValue": "new", "rules": []},
+            "added": {"defaultValue": True, "rules": []}
+        },
+        "savedGroups": {}
+    }))
+    
+    features = provider.client._global_context.features
+    assert features["targeted"] is unchanged
+    assert "legacy" not in features
+    assert provider.resolve_string_details("banner", "default", evaluation_context).value == "new"
+    assert [event for event, _ in events] == [
+        ProviderEvent.PROVIDER_READY, ProviderEvent.PROVIDER_CONFIGURATION_CHANGED
+    ]
+    assert events[-1][1].flags_changed == ["added", "banner", "legacy"]
+    
+    run_async_legacy(provider.close())
+
+def test_configuration_changed_follows_dependencies():
+    """Test that saved group and prerequisite changes mark the dependent flags"""
+    from openfeature.event import ProviderEvent
+    def payload(beta_users, admin_only=True):
+        return {
+            "features": {
+                "beta": {"defaultValue": False, "rules": [{"condition": {"id": {"$inGroup": "beta-users"}}, "force": True}]},
+                "staff": {"defaultValue": False, "rules": [{"condition": {"$savedGroup": {"id": "staff"}}, "force": True}]},
+                "beta-banner": {"defaultValue": False, "rules": [{
+                    "parentConditions": [{"id": "beta", "condition": {"value": True}}],
+                    "force": True
+                }]},
+                "admin": {"defaultValue": False, "rules": [{"condition": {"role": "admin"} if admin_only else {}, "force": True}]},
+                "unrelated": {"defaultValue": "x", "rules": []}
+            },
+            "savedGroups": {
+                "beta-users": beta_users,
+                "staff": {"type": "condition", "condition": {"id": {"$inGroup": "beta-users"}}}
+            }
+        }
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        bootstrap_payload=payload(["u1", "u2"])
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        provider.initialize_sync()
+        provider._background_init.result(timeout=5)
+    
+    provider._run_sync(provider.client.set_payload(payload(["u1", "u2"])))
+    assert [event for event, _ in events] == [ProviderEvent.PROVIDER_READY]
+    
+    provider._run_sync(provider.client.set_payload(payload(["u1", "u3"])))
+    assert events[-1][0] == ProviderEvent.PROVIDER_CONFIGURATION_CHANGED
+    assert events[-1][1].flags_changed == ["beta", "beta-banner", "staff"]
+    
+    provider._run_sync(provider.client.set_payload(payload(["u1", "u3"], admin_only=False)))
+    assert events[-1][1].flags_changed == ["admin"]
+    assert len(events) == 3
+    
+    run_async_legacy(provider.close())
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+def _streaming_provider(server):
+    return GrowthBookProvider(GrowthBookProviderOptions(
+        api_host=server.url,
+        client_key=server.client_key,
+        streaming=True,
+        stream_reconnect_delay=0.05,
+        stream_max_reconnect_delay=0.2
+    ))
+
+def _banner_payload(value):
+    return {"features": {"banner": {"defaultValue": value, "rules": []}}, "savedGroups": {}}
+
+def test_streaming_applies_pushed_updates(growthbook_server, evaluation_context):
+    """Test that inline and invalidation events update flags without polling"""
+    from openfeature.event import ProviderEvent
+    growthbook_server.payload = _banner_payload("v1")
+    provider = _streaming_provider(growthbook_server)
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    provider.initialize_sync()
+    
+    def banner():
+        return provider.resolve_string_details("banner", "default", evaluation_context).value
+    
+    assert banner() == "v1"
+    assert _wait_for(lambda: provider.get_stream_stats().get("connected"))
+    # Polling was replaced by the stream
+    assert provider.client._features_repository._refresh_task is None
+    
+    started = time.perf_counter()
+    growthbook_server.publish(_banner_payload("v2"))
+    assert _wait_for(lambda: banner() == "v2")
+    assert time.perf_counter() - started < 1.0
+    assert events[-1][0] == ProviderEvent.PROVIDER_CONFIGURATION_CHANGED
+    assert events[-1][1].flags_changed == ["banner"]
+    
+    # A bare invalidation makes the provider fetch the payload again
+    growthbook_server.payload = _banner_payload("v3")
+    growthbook_server.send("features-updated")
+    assert _wait_for(lambda: banner() == "v3")
+    
+    run_async_legacy(provider.close())
+
+def test_streaming_reconnects_and_serves_stale(growthbook_server, evaluation_context):
+    """Test that a dropped stream keeps serving features, then reconnects and catches up"""
+    from openfeature.event import ProviderEvent
+    growthbook_server.payload = _banner_payload("v1")
+    provider = _streaming_provider(growthbook_server)
+    events = []
+    provider.attach(lambda p, event, details: events.append(event))
+    provider.initialize_sync()
+    assert _wait_for(lambda: provider.get_stream_stats().get("connected"))
+    
+    growthbook_server.available = False
+    growthbook_server.drop_connections()
+    assert _wait_for(lambda: ProviderEvent.PROVIDER_STALE in events)
+    assert _wait_for(lambda: provider.get_stream_stats()["failures"] >= 3)
+    # Last known features are still served while disconnected
+    assert provider.resolve_string_details("banner", "default", evaluation_context).value == "v1"
+    assert provider.get_stream_stats()["disconnected_seconds"] is not None
+    
+    # Changed while disconnected: picked up by the fetch after reconnecting
+    growthbook_server.payload = _banner_payload("v2")
+    growthbook_server.available = True
+    assert _wait_for(lambda: provider.resolve_string_details("banner", "default", evaluation_context).value == "v2")
+    assert _wait_for(lambda: events[-1] == ProviderEvent.PROVIDER_READY)
+    assert provider.get_stream_stats()["connects"] == 2
+    
+    run_async_legacy(provider.close())
+
+def test_streaming_server_close_is_not_a_failure(growthbook_server, evaluation_context):
+    """Test that a server closing a stream that delivered events reconnects without backoff"""
+    growthbook_server.payload = _banner_payload("v1")
+    provider = _streaming_provider(growthbook_server)
+    provider.initialize_sync()
+    assert _wait_for(lambda: provider.get_stream_stats().get("connected"))
+    
+    growthbook_server.publish(_banner_payload("v2"))
+    assert _wait_for(lambda: provider.get_stream_stats()["events"] == 1)
+    growthbook_server.drop_connections()
+    assert _wait_for(lambda: provider.get_stream_stats()["connects"] == 2)
+    assert provider.get_stream_stats()["failures"] == 0
+    
+    # A stream closed before delivering anything still counts
+    growthbook_server.drop_connections()
+    assert _wait_for(lambda: provider.get_stream_stats()["connects"] == 3)
+    assert provider.get_stream_stats()["failures"] == 1
+    
+    run_async_legacy(provider.close())
+
+def test_streaming_drops_oversized_events():
+    """Test that events over max_event_bytes are dropped while they arrive, in any chunking"""
+    from growthbook_openfeature_provider.streaming import FeatureStream
+    received = []
+    
+    async def on_event(event_type, data):
+        received.append((event_type, data))
+    
+    class Content:
+        def __init__(self, chunks):
+            self._chunks = chunks
+        
+        async def iter_any(self):
+            for chunk in self._chunks:
+                yield chunk
+    
+    stream = b"".join([
+        b"event: features\r\ndata: " + b"x" * 500 + b"\r\ndata: tail\r\n\r\n",
+        b"event: features\ndata: " + b"y" * 60 + b"\ndata: " + b"y" * 60 + b"\n\n",
+        b"event: features\ndata: small\ndata: event\n\n",
+    ])
+    for size in (7, 64, len(stream)):
+        received.clear()
+        feature_stream = FeatureStream("http://127.0.0.1:9/sub/key", on_event=on_event, max_event_bytes=100)
+        chunks = [stream[i:i + size] for i in range(0, len(stream), size)]
+        run_async_legacy(feature_stream._read_events(Content(chunks)))
+        assert received == [("features", "small\nevent")]
+        assert feature_stream.stats()["dropped_events"] == 2
+
+def test_registry_initializes_provider(growthbook_server, evaluation_context):
+    """Test that OpenFeature's registry initializes the provider and delivers its events"""
+    import queue
+    import threading
+    from openfeature.event import ProviderEvent
+    from openfeature.provider import ProviderStatus
+    growthbook_server.payload = _banner_payload("v1")
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host=growthbook_server.url,
+        client_key=growthbook_server.client_key
+    ))
+    ready = []
+    ready_received = threading.Event()
+    
+    def on_ready(details):
+        if details.provider_name == provider.get_metadata().name:
+            ready.append(details)
+            ready_received.set()
+    
+    api.add_handler(ProviderEvent.PROVIDER_READY, on_ready)
+    try:
+        api.set_provider(provider, "registry-test")
+        assert ready_received.wait(5)
+        client = api.get_client("registry-test")
+        assert client.get_provider_status() == ProviderStatus.READY
+        assert client.get_string_value("banner", "default", evaluation_context) == "v1"
+        
+        # OpenFeature runs event handlers on its own executor
+        changed = queue.Queue()
+        client.add_handler(ProviderEvent.PROVIDER_CONFIGURATION_CHANGED, changed.put)
+        growthbook_server.payload = _banner_payload("v2")
+        provider._run_sync(provider._refresh_features())
+        assert changed.get(timeout=5).flags_changed == ["banner"]
+        assert client.get_string_value("banner", "default", evaluation_context) == "v2"
+        assert len(ready) == 1
+    finally:
+        api.remove_handler(ProviderEvent.PROVIDER_READY, on_ready)
+        api.clear_providers()
+    # The registry shut the provider down
+    assert provider.client is None
+    assert not provider._loop_thread.is_running()
+
+async def test_registry_initializes_provider_from_running_loop(growthbook_server, evaluation_context):
+    """Test that registering from async code reports READY only once features are loaded"""
+    from openfeature.provider import ProviderStatus
+    growthbook_server.payload = _banner_payload("v1")
+    
+    def make_provider():
+        return GrowthBookProvider(GrowthBookProviderOptions(
+            api_host=growthbook_server.url,
+            client_key=growthbook_server.client_key
+        ))
+    
+    try:
+        waited = make_provider()
+        # Runs initialize() on this thread, inside the running loop
+        api.set_provider_and_wait(waited, "async-registry-wait")
+        assert waited.initialized is True
+        client = api.get_client("async-registry-wait")
+        assert client.get_string_value("banner", "default", evaluation_context) == "v1"
+        
+        # Initializes on a registry thread; the status is NOT_READY until then
+        api.set_provider(make_provider(), "async-registry")
+        client = api.get_client("async-registry")
+        assert _wait_for(lambda: client.get_provider_status() == ProviderStatus.READY)
+        assert client.get_string_value("banner", "default", evaluation_context) == "v1"
+    finally:
+        api.clear_providers()
+    
+    # The coroutine form runs on the caller's loop
+    provider = make_provider()
+    await provider.initialize_async()
+    assert provider.initialized is True
+    assert provider.resolve_string_details("banner", "default", evaluation_context).value == "v1"
+    await provider.close()
+
+def test_registry_reports_failed_initialization(growthbook_server):
+    """Test that a provider without features is reported as PROVIDER_ERROR by the registry"""
+    from openfeature.exception import ProviderNotReadyError
+    from openfeature.provider import ProviderStatus
+    growthbook_server.available = False
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host=growthbook_server.url,
+        client_key=growthbook_server.client_key
+    ))
+    try:
+        with pytest.raises(ProviderNotReadyError):
+            api.set_provider_and_wait(provider, "registry-error-test")
+        assert api.get_client("registry-error-test").get_provider_status() == ProviderStatus.ERROR
+    finally:
+        api.clear_providers()
+
+def test_scheduled_refresh_serves_stale_and_backs_off(growthbook_server, evaluation_context):
+    """Test that refreshes run in the background, back off on failure and recover"""
+    from openfeature.event import ProviderEvent
+    growthbook_server.payload = _banner_payload("v1")
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host=growthbook_server.url,
+        client_key=growthbook_server.client_key,
+        cache_ttl=1,
+        refresh_backoff=0.05,
+        refresh_max_backoff=0.2
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append(event))
+    provider.initialize_sync()
+    # GrowthBook's fixed-interval polling was replaced by the scheduler
+    assert provider.client._features_repository._refresh_task is None
+    
+    def banner():
+        return provider.resolve_string_details("banner", "default", evaluation_context).value
+    
+    growthbook_server.payload = _banner_payload("v2")
+    assert _wait_for(lambda: banner() == "v2")
+    stats = provider.get_refresh_stats()
+    assert stats["refreshes"] == 1
+    assert stats["payload_age_seconds"] < 1.0
+    assert stats["last_refresh_latency_seconds"] is not None
+    
+    # Failed refreshes are retried well before the next interval, while the
+    # last payload keeps being served without waiting on them
+    growthbook_server.available = False
+    assert _wait_for(lambda: provider.get_refresh_stats()["consecutive_failures"] >= 3)
+    assert ProviderEvent.PROVIDER_STALE in events
+    started = time.perf_counter()
+    assert banner() == "v2"
+    assert time.perf_counter() - started < 0.1
+    assert provider.get_refresh_stats()["payload_age_seconds"] > 1.0
+    
+    growthbook_server.payload = _banner_payload("v3")
+    growthbook_server.available = True
+    assert _wait_for(lambda: banner() == "v3")
+    assert _wait_for(lambda: events[-1] == ProviderEvent.PROVIDER_READY)
+    assert provider.get_refresh_stats()["consecutive_failures"] == 0
+    
+    run_async_legacy(provider.close())
+    assert provider.get_refresh_stats() == {}
+
+def test_refresh_delays_are_jittered():
+    """Test jittered intervals and capped exponential backoff"""
+    from growthbook_openfeature_provider.refresh import RefreshScheduler
+    
+    async def fail():
+        raise RuntimeError("unavailable")
+    
+    scheduler = RefreshScheduler(fail, interval=60, jitter=0.1, backoff=1.0, max_backoff=8.0)
+    delays = [scheduler.next_delay() for _ in range(200)]
+    assert all(54 <= d <= 66 for d in delays)
+    assert len(set(delays)) > 1
+    
+    backoffs = []
+    for _ in range(6):
+        assert run_async_legacy(scheduler.refresh_now()) is False
+        backoffs.append(scheduler.next_delay())
+    for delay, expected in zip(backoffs, [1, 2, 4, 8, 8, 8]):
+        assert 0.9 * expected <= delay <= 1.1 * expected
+    
+    assert RefreshScheduler(fail, interval=60, jitter=0).next_delay() == 60
+    with pytest.raises(ValueError):
+        RefreshScheduler(fail, interval=60, jitter=1.5)
+
+def test_conditional_fetch_over_pooled_connection(growthbook_server, evaluation_context):
+    """Test that unchanged payloads are answered with 304 and skip the update path"""
+    from openfeature.event import ProviderEvent
+    growthbook_server.payload = _banner_payload("v1")
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host=growthbook_server.url,
+        client_key=growthbook_server.client_key
+    ))
+    events = []
+    provider.attach(lambda p, event, details: events.append(event))
+    provider.initialize_sync()
+    
+    def refresh():
+        provider._run_sync(provider._refresh_features())
+    
+    refresh()
+    global_context = provider.client._global_context
+    refresh()
+    refresh()
+    assert growthbook_server.not_modified == 3
+    assert provider.get_fetch_stats()["not_modified"] == 3
+    # Nothing was re-applied
+    assert provider.client._global_context is global_context
+    assert events == [ProviderEvent.PROVIDER_READY]
+    
+    growthbook_server.payload = _banner_payload("v2")
+    refresh()
+    assert provider.resolve_string_details("banner", "default", evaluation_context).value == "v2"
+    # Every request went over one keep-alive connection
+    assert growthbook_server.feature_requests == 5
+    assert len(growthbook_server.connections) == 1
+    
+    run_async_legacy(provider.close())
+
+def test_conditional_fetch_shared_repository(growthbook_server, evaluation_context):
+    """Test that clients sharing GrowthBook's repository still get features after 304s and closes"""
+    growthbook_server.payload = _banner_payload("v1")
+    
+    def make_provider():
+        provider = GrowthBookProvider(GrowthBookProviderOptions(
+            api_host=growthbook_server.url,
+            client_key=growthbook_server.client_key
+        ))
+        provider.initialize_sync()
+        return provider
+    
+    first, second = make_provider(), make_provider()
+    repository = second.client._features_repository
+    assert repository is first.client._features_repository
+    
+    def load():
+        # What any other GrowthBook client does when its TTL cache expires
+        return second._run_sync(repository.load_features_async(
+            growthbook_server.url, growthbook_server.client_key, force_refresh=True
+        ))
+    
+    assert load() == _banner_payload("v1")
+    assert growthbook_server.not_modified >= 1
+    
+    run_async_legacy(first.close())
+    # Still installed for the second provider, whose refreshes keep working
+    assert load() == _banner_payload("v1")
+    growthbook_server.payload = _banner_payload("v2")
+    second._run_sync(second._refresh_features())
+    assert second.resolve_string_details("banner", "default", evaluation_context).value == "v2"
+    
+    run_async_legacy(second.close())
+    # The last close restored GrowthBook's own fetch
+    assert "_fetch_and_decode_async" not in repository.__dict__
+    assert "_conditional_fetcher" not in repository.__dict__
+    assert run_async_legacy(repository.load_features_async(
+        growthbook_server.url, growthbook_server.client_key, force_refresh=True
+    )) == _banner_payload("v2")
+
+def _encrypt(plaintext, key):
+    from base64 import b64decode, b64encode
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    iv = os.urandom(16)
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(plaintext.encode("utf-8")) + padder.finalize()
+    encryptor = Cipher(algorithms.AES128(b64decode(key)), modes.CBC(iv)).encryptor()
+    ciphertext = encryptor.update(padded) + encryptor.finalize()
+    return b64encode(iv).decode("ascii") + "." + b64encode(ciphertext).decode("ascii")
+
+def test_encrypted_payload_decrypted_once(growthbook_server, evaluation_context):
+    """Test that unchanged ciphertext is served from the decryption cache"""
+    import json
+    from base64 import b64encode
+    from growthbook_openfeature_provider import decryption
+    key = b64encode(os.urandom(16)).decode("ascii")
+    features = _banner_payload("secret")["features"]
+    encrypted = {
+        "encryptedFeatures": _encrypt(json.dumps(features), key),
+        "encryptedSavedGroups": _encrypt(json.dumps({"beta": ["u1"]}), key)
+    }
+    growthbook_server.payload = encrypted
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host=growthbook_server.url,
+        client_key=growthbook_server.client_key,
+        decryption_key=key
+    ))
+    provider.initialize_sync()
+    assert provider.resolve_string_details("banner", "default", evaluation_context).value == "secret"
+    stats = provider.get_decryption_stats()
+    assert stats["misses"] == 2 and stats["hits"] == 0
+    assert stats["decrypt_seconds"] > 0
+    
+    repository = provider.client._features_repository
+    with patch.object(decryption, "decrypt", wraps=decryption.decrypt) as decrypt:
+        first = repository.decrypt_response(dict(encrypted), key)
+        again = repository.decrypt_response(dict(encrypted), key)
+        assert decrypt.call_count == 0
+        assert again["features"] is first["features"]
+        assert again["savedGroups"] == {"beta": ["u1"]}
+        
+        # Only the changed section is decrypted again
+        changed = dict(encrypted, encryptedSavedGroups=_encrypt(json.dumps({"beta": ["u2"]}), key))
+        assert repository.decrypt_response(changed, key)["savedGroups"] == {"beta": ["u2"]}
+        assert decrypt.call_count == 1
+    assert provider.get_decryption_stats()["hits"] == 5
+    
+    # An undecryptable features section still discards the payload
+    assert repository.decrypt_response({"encryptedFeatures": "bad.data"}, key) is None
+    
+    run_async_legacy(provider.close())
+    # GrowthBook's own decryption is back for the repository's other clients
+    assert "decrypt_response" not in repository.__dict__
+    assert "_decryption_cache" not in repository.__dict__
+    assert repository.decrypt_response(dict(encrypted), key)["savedGroups"] == {"beta": ["u1"]}
+
+@pytest.mark.parametrize("codec_name", ["json", "orjson"])
+def test_json_codecs_agree(codec_name):
+    """Test that both JSON codecs parse payloads identically and accept the same inputs"""
+    if codec_name == "orjson":
+        pytest.importorskip("orjson")
+    from growthbook_openfeature_provider import json_codec
+    from growthbook_openfeature_provider.saved_groups import CompactGroupValues
+    codec = json_codec.OrjsonCodec() if codec_name == "orjson" else json_codec.JSONCodec()
+    
+    body = json_codec.JSONCodec().dumps(BOOTSTRAP_PAYLOAD)
+    assert codec.loads(body) == BOOTSTRAP_PAYLOAD
+    assert codec.loads(body.decode("utf-8")) == BOOTSTRAP_PAYLOAD
+    # Inputs only the standard library accepts still load
+    assert codec.loads(b'[NaN]')[0] != codec.loads(b'[NaN]')[0]
+    with pytest.raises(ValueError):
+        codec.loads(b'{"broken":')
+    
+    # Compacted saved groups serialize with their values
+    groups = {"beta": CompactGroupValues(["u2", "u1", 3])}
+    assert json.loads(codec.dumps(groups, sort_keys=True)) == {"beta": list(groups["beta"])}
+    assert json.loads(codec.dumps({1: "int key"})) == {"1": "int key"}
+    assert codec.dumps({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+
+def test_json_codec_selection():
+    """Test selecting the process-wide JSON codec"""
+    from growthbook_openfeature_provider import json_codec
+    original = json_codec.get_codec()
+    try:
+        assert json_codec.set_codec("json").name == "json"
+        assert json_codec.loads(b'{"a": 1}') == {"a": 1}
+        with pytest.raises(ValueError):
+            json_codec.set_codec("yaml")
+        expected = "orjson" if json_codec.orjson is not None else "json"
+        assert json_codec.set_codec("auto").name == expected
+    finally:
+        json_codec.set_codec(original)
+
+def test_snapshot_store_atomic_versioned_writes(tmp_path):
+    """Test that the snapshot store stamps versions and skips unchanged payloads"""
+    from growthbook_openfeature_provider.snapshot_store import FeatureSnapshotStore
+    
+    store = FeatureSnapshotStore(str(tmp_path / "features.snapshot"))
+    assert store.read() is None
+    
+    version = store.write(BOOTSTRAP_PAYLOAD)
+    assert store.read_version() == version
+    assert store.read() == (version, BOOTSTRAP_PAYLOAD)
+    # Known version: the body is not parsed
+    assert store.read(known_version=version) == (version, None)
+    
+    mtime = (tmp_path / "features.snapshot").stat().st_mtime_ns
+    assert store.write(BOOTSTRAP_PAYLOAD) == version
+    assert (tmp_path / "features.snapshot").stat().st_mtime_ns == mtime
+    assert store.write({"features": {}, "savedGroups": {}}) != version
+    # No temporary files are left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["features.snapshot"]
+    
+    # Only one holder of the refresh lock at a time
+    other = FeatureSnapshotStore(store.path)
+    assert store.try_acquire_refresh_lock()
+    assert not other.try_acquire_refresh_lock()
+    store.release_refresh_lock()
+    assert other.try_acquire_refresh_lock()
+    other.release_refresh_lock()
+
+def test_snapshot_shared_between_providers(tmp_path, evaluation_context):
+    """Test that only one provider fetches and the other reads the shared snapshot"""
+    from growthbook_openfeature_provider.snapshot_store import FeatureSnapshotStore
+    snapshot_path = str(tmp_path / "features.snapshot")
+    
+    def make_provider():
+        return GrowthBookProvider(GrowthBookProviderOptions(
+            api_host="https://cdn.growthbook.io",
+            client_key="test-key",
+            snapshot_path=snapshot_path,
+            snapshot_poll_interval=0.01
+        ))
+    
+    writer, reader = make_provider(), make_provider()
+    load = AsyncMock(return_value=BOOTSTRAP_PAYLOAD)
+    with patch('growthbook.FeatureRepository.load_features_async', new=load):
+        writer.initialize_sync()
+        time.sleep(0.05)  # let the writer's refresh loop start
+        fetches = load.call_count
+        assert fetches >= 1
+        
+        reader.initialize_sync()
+        # The reader was served from disk without fetching
+        assert load.call_count == fetches
+        assert reader.initialized is True
+        assert reader.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-snapshot"
+        
+        # A refresh in the writer reaches the reader through the snapshot
+        updated = {
+            "features": {"bootstrap-flag": {"defaultValue": "updated", "rules": [
+                {"condition": {"id": {"$inGroup": "testers"}}, "force": None, "variations": ["a", "b"]},
+            ]}},
+            "savedGroups": {"testers": ["tester-1"]},
+            "contextualBandits": {"bandit": {"arms": ["a", "b"]}},
+        }
+        writer._run_sync(writer.client._features_repository._handle_feature_update(updated))
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if reader.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "updated":
+                break
+            time.sleep(0.01)
+        assert reader.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "updated"
+        # The snapshot holds the payload as received: every section and field
+        assert FeatureSnapshotStore(snapshot_path).read()[1] == updated
+        
+        # A partial update keeps the other sections
+        writer._run_sync(writer.client._features_repository._handle_feature_update({"savedGroups": {}}))
+        assert FeatureSnapshotStore(snapshot_path).read()[1] == {**updated, "savedGroups": {}}
+    
+    run_async_legacy(reader.close())
+    run_async_legacy(writer.close())
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_prefork_initialization(evaluation_context):
+    """Test loading features before fork and restarting refresh in the child"""
+    import gc
+    import multiprocessing
+    
+    provider = GrowthBookProvider(GrowthBookProviderOptions(
+        api_host="https://cdn.growthbook.io",
+        client_key="test-key",
+        bootstrap_payload=BOOTSTRAP_PAYLOAD
+    ))
+    
+    try:
+        assert provider.initialize_prefork() is True
+        assert gc.get_freeze_count() > 0
+        # Nothing runs in the parent until it forks
+        assert not provider._loop_thread.is_running()
+        assert provider.resolve_string_details("bootstrap-flag", "default", evaluation_context).value == "from-snapshot"
+    finally:
+        gc.unfreeze()
+    
+    ctx = multiprocessing.get_context("fork")
+    
+    def grandchild(queue):
+        queue.put(provider._loop_thread.is_running())
+    
+    def child(queue):
+        result = provider.resolve_string_details("bootstrap-flag", "default", evaluation_context)
+        queue.put((provider._loop_thread.is_running(), provider._background_init is not None, result.value))
+        # A process the worker forks itself starts nothing
+        process = ctx.Process(target=grandchild, args=(queue,))
+        process.start()
+        process.join(timeout=10)
+    
+    queue = ctx.Queue()
+    with patch('growthbook.FeatureRepository.load_features_async', new=AsyncMock(return_value=None)):
+        process = ctx.Process(target=child, args=(queue,))
+        process.start()
+        loop_running, refresh_started, value = queue.get(timeout=10)
+        grandchild_loop_running = queue.get(timeout=10)
+        process.join(timeout=10)
+    
+    assert loop_running is True
+    assert refresh_started is True
+    assert value == "from-snapshot"
+    assert grandchild_loop_running is False
+    
+    # Process pools of the master do not fork serving workers
+    with patch('growthbook_openfeature_provider.parallel.evaluate_in_processes', return_value=iter(())) as evaluate:
+        list(provider.resolve_many_parallel("bootstrap-flag", [evaluation_context]))
+    assert evaluate.call_args.kwargs["mp_context"] in ("forkserver", "spawn")
+    
+    run_async_legacy(provider.close())
+    assert provider._prefork is False
+
+def _targeted_payload(value):
+    rule = {"condition": {"country": {"$in": ["US", "CA"]}}, "force": value}
+    return {"features": {"banner": {"defaultValue": "default", "rules": [rule]}}, "savedGroups": {}}
+
+def _tenant_options(server, client_key, **options):
+    return GrowthBookProviderOptions(api_host=server.url, client_key=client_key, **options)
+
+def test_multi_tenant_routes_on_shared_runtime(growthbook_server):
+    """Test tenant routing, the shared loop and connection pool, and shared compiled conditions"""
+    from openfeature.event import ProviderEvent
+    from growthbook_openfeature_provider import MultiTenantProvider, MultiTenantProviderOptions
+    growthbook_server.payload = _targeted_payload("us")
+    growthbook_server.payloads["sdk-twin"] = _targeted_payload("us")
+    growthbook_server.payloads["sdk-other"] = _banner_payload("other")
+    provider = MultiTenantProvider(
+        MultiTenantProviderOptions(default_tenant="main", max_concurrent_refreshes=1),
+        tenants={
+            "main": _tenant_options(growthbook_server, growthbook_server.client_key, compile_conditions=True),
+            "twin": _tenant_options(growthbook_server, "sdk-twin", compile_conditions=True),
+            "other": _tenant_options(growthbook_server, "sdk-other"),
+        }
+    )
+    events = []
+    provider.attach(lambda p, event, details: events.append((event, details)))
+    provider.initialize_sync()
+    assert [event for event, _ in events] == [ProviderEvent.PROVIDER_READY]
+    
+    def banner(**attributes):
+        context = EvaluationContext(targeting_key="user-1", attributes={"country": "US", **attributes})
+        return provider.resolve_string_details("banner", "default", context)
+    
+    assert banner(tenant="main").value == "us"
+    assert banner(tenant="twin").value == "us"
+    assert banner(tenant="other").value == "other"
+    # No tenant attribute: the default tenant
+    assert banner().value == "us"
+    unknown = banner(tenant="nobody")
+    assert unknown.value == "default"
+    assert unknown.error_code == ErrorCode.INVALID_CONTEXT
+    context = EvaluationContext(targeting_key="user-1", attributes={"tenant": "other"})
+    assert run_async_legacy(provider.resolve_string_details_async("banner", "default", context)).value == "other"
+    
+    # One loop thread and one keep-alive connection for all tenants
+    tenants = [provider.tenant(name) for name in provider.tenants()]
+    assert all(tenant._loop_thread is provider._loop_thread for tenant in tenants)
+    assert growthbook_server.feature_requests == 3
+    assert len(growthbook_server.connections) == 1
+    
+    # Identical payloads share compiled condition code
+    def matcher(name):
+        return provider.tenant(name).client._global_context.features["banner"].rules[0].condition.matches
+    assert matcher("main") is matcher("twin")
+    
+    # Tenant configuration changes are forwarded with the tenant name
+    growthbook_server.payloads["sdk-other"] = _banner_payload("other-v2")
+    provider._loop_thread.run(provider.tenant("other")._refresh_features())
+    assert banner(tenant="other").value == "other-v2"
+    event, details = events[-1]
+    assert event == ProviderEvent.PROVIDER_CONFIGURATION_CHANGED
+    assert details.flags_changed == ["banner"]
+    assert details.metadata["tenant"] == "other"
+    
+    run_async_legacy(provider.close())
+    assert not provider._loop_thread.is_running()
+    assert provider.tenants() == []
+
+def test_multi_tenant_payload_limit_and_runtime_tenants(growthbook_server, evaluation_context):
+    """Test that oversized payloads are rejected per tenant and tenants can come and go"""
+    from growthbook_openfeature_provider import MultiTenantProvider, MultiTenantProviderOptions
+    large = {"features": {f"flag-{i}": {"defaultValue": "x" * 100} for i in range(50)}}
+    growthbook_server.payload = _banner_payload("small")
+    growthbook_server.payloads["sdk-large"] = large
+    provider = MultiTenantProvider(
+        MultiTenantProviderOptions(max_payload_bytes=2000),
+        tenants={
+            "small": _tenant_options(growthbook_server, growthbook_server.client_key),
+            "large": _tenant_options(growthbook_server, "sdk-large"),
+        }
+    )
+    provider.initialize_sync()
+    
+    def banner(tenant):
+        context = EvaluationContext(targeting_key="user-1", attributes={"tenant": tenant})
+        return provider.resolve_string_details("banner", "default", context).value
+    
+    stats = provider.get_tenant_stats()
+    assert stats["small"]["initialized"] is True
+    assert stats["small"]["fetch"]["payload_bytes"] < 2000
+    assert stats["large"]["initialized"] is False
+    assert stats["large"]["fetch"]["failures"] == 1
+    assert stats["large"]["fetch"]["payload_bytes"] is None
+    
+    # A tenant whose payload outgrows its limit keeps serving the last one
+    growthbook_server.payload = dict(large, features={**large["features"], **_banner_payload("grown")["features"]})
+    small = provider.tenant("small")
+    assert provider._loop_thread.run(small._scheduler.refresh_now()) is False
+    assert banner("small") == "small"
+    
+    growthbook_server.payloads["sdk-late"] = _banner_payload("late")
+    provider.add_tenant("late", _tenant_options(growthbook_server, "sdk-late"))
+    assert _wait_for(lambda: provider.tenant("late").initialized)
+    assert banner("late") == "late"
+    run_async_legacy(provider.remove_tenant("late"))
+    assert banner("late") == "default"
+    
+    run_async_legacy(provider.close())
+
+def test_multi_tenant_memory_budget(growthbook_server):
+    """Test that payloads over a tenant's memory budget are rejected, measured compacted"""
+    from growthbook_openfeature_provider import MultiTenantProvider, MultiTenantProviderOptions
+    large = {"features": {f"flag-{i}": {"defaultValue": "x" * 100} for i in range(200)}, "savedGroups": {}}
+    ids = [f"user-{i}" for i in range(5000)]
+    grouped = dict(_banner_payload("grouped"), savedGroups={"beta": ids})
+    growthbook_server.payload = _banner_payload("small")
+    growthbook_server.payloads["sdk-large"] = large
+    growthbook_server.payloads["sdk-grouped"] = grouped
+    provider = MultiTenantProvider(
+        MultiTenantProviderOptions(max_payload_memory_bytes=20_000),
+        tenants={
+            "small": _tenant_options(growthbook_server, growthbook_server.client_key),
+            "large": _tenant_options(growthbook_server, "sdk-large"),
+            # The raw group list takes over 300 KB; compacted, it fits
+            "grouped": _tenant_options(
+                growthbook_server, "sdk-grouped", compact_saved_groups=1000, max_payload_memory_bytes=200_000
+            ),
+        }
+    )
+    provider.initialize_sync()
+    
+    def banner(tenant):
+        context = EvaluationContext(targeting_key="user-1", attributes={"tenant": tenant})
+        return provider.resolve_string_details("banner", "default", context).value
+    
+    stats = provider.get_tenant_stats()
+    assert stats["small"]["initialized"] is True
+    assert 0 < stats["small"]["memory"]["payload_memory_bytes"] <= 20_000
+    assert stats["large"]["initialized"] is False
+    assert stats["large"]["memory"]["rejected_payloads"] == 1
+    assert stats["grouped"]["initialized"] is True
+    assert stats["grouped"]["memory"]["payload_memory_bytes"] <= 200_000
+    assert banner("grouped") == "grouped"
+    
+    # A payload that outgrows the budget is not applied; the tenant keeps serving the last one
+    growthbook_server.payload = dict(large, features={**large["features"], **_banner_payload("grown")["features"]})
+    small = provider.tenant("small")
+    provider._loop_thread.run(small._scheduler.refresh_now())
+    assert banner("small") == "small"
+    assert provider.get_tenant_stats()["small"]["memory"]["rejected_payloads"] == 1
+    
+    growthbook_server.payload = _banner_payload("fits")
+    provider._loop_thread.run(small._scheduler.refresh_now())
+    assert banner("small") == "fits"
+    
+    run_async_legacy(provider.close())
+
+def test_multi_tenant_through_registry(growthbook_server):
+    """Test registering the multi-tenant provider and one of its tenants with OpenFeature"""
+    import queue
+    from openfeature.event import ProviderEvent
+    from openfeature.provider import ProviderStatus
+    from growthbook_openfeature_provider import MultiTenantProvider, MultiTenantProviderOptions
+    growthbook_server.payload = _banner_payload("main")
+    growthbook_server.payloads["sdk-acme"] = _banner_payload("acme")
+    provider = MultiTenantProvider(
+        MultiTenantProviderOptions(default_tenant="main"),
+        tenants={
+            "main": _tenant_options(growthbook_server, growthbook_server.client_key),
+            "acme": _tenant_options(growthbook_server, "sdk-acme"),
+        }
+    )
+    try:
+        api.set_provider_and_wait(provider, "mt-all")
+        api.set_provider_and_wait(provider.tenant("acme"), "mt-acme")
+        all_tenants = api.get_client("mt-all")
+        acme = api.get_client("mt-acme")
+        assert all_tenants.get_provider_status() == ProviderStatus.READY
+        assert acme.get_provider_status() == ProviderStatus.READY
+        context = EvaluationContext(targeting_key="user-1", attributes={"tenant": "acme"})
+        assert all_tenants.get_string_value("banner", "default", context) == "acme"
+        assert all_tenants.get_string_value("banner", "default") == "main"
+        assert acme.get_string_value("banner", "default") == "acme"
+        # Registering the tenant did not initialize it a second time
+        assert growthbook_server.feature_requests == 2
+        # One refresh timer for both tenants
+        assert len(provider._refresh_group) == 2
+        assert all(provider.tenant(name)._refresh_watch is None for name in provider.tenants())
+        
+        # Changes reach the tenant's domain and, tagged, the multi-tenant provider,
+        # although the registry attached itself to the tenant
+        tenant_changes, forwarded = queue.Queue(), queue.Queue()
+        acme.add_handler(ProviderEvent.PROVIDER_CONFIGURATION_CHANGED, tenant_changes.put)
+        all_tenants.add_handler(ProviderEvent.PROVIDER_CONFIGURATION_CHANGED, forwarded.put)
+        growthbook_server.payloads["sdk-acme"] = _banner_payload("acme-v2")
+        provider._loop_thread.run(provider.tenant("acme")._refresh_features())
+        assert tenant_changes.get(timeout=5).flags_changed == ["banner"]
+        assert forwarded.get(timeout=5).metadata["tenant"] == "acme"
+    finally:
+        api.clear_providers()
+    assert not provider._loop_thread.is_running()
+    assert provider.tenants() == []
+
+async def test_multi_tenant_registry_from_running_loop(growthbook_server):
+    """Test that registering the multi-tenant provider from async code waits for its tenants"""
+    from growthbook_openfeature_provider import MultiTenantProvider, MultiTenantProviderOptions
+    growthbook_server.payload = _banner_payload("main")
+    provider = MultiTenantProvider(
+        MultiTenantProviderOptions(default_tenant="main"),
+        tenants={"main": _tenant_options(growthbook_server, growthbook_server.client_key)}
+    )
+    try:
+        api.set_provider_and_wait(provider, "mt-async")
+        assert api.get_client("mt-async").get_string_value("banner", "default") == "main"
+    finally:
+        api.clear_providers()
+    assert provider.tenants() == []
+
+def test_refresh_group_runs_many_schedulers():
+    """Test that one refresh group drives each scheduler on its own schedule"""
+    from growthbook_openfeature_provider.refresh import RefreshGroup, RefreshScheduler
+    
+    async def scenario():
+        group = RefreshGroup()
+        calls = {"fast": 0, "failing": 0}
+        
+        def refresh(name, fail=False):
+            async def run():
+                calls[name] += 1
+                if fail:
+                    raise RuntimeError("unavailable")
+            return run
+        
+        fast = RefreshScheduler(refresh("fast"), interval=0.02, jitter=0)
+        failing = RefreshScheduler(refresh("failing", fail=True), interval=0.02, jitter=0, backoff=0.05, max_backoff=0.05)
+        group.add(fast)
+        group.add(failing)
+        await asyncio.sleep(0.25)
+        group.remove(fast)
+        removed_at = calls["fast"]
+        await asyncio.sleep(0.1)
+        await group.close()
+        return calls, removed_at, fast.stats(), failing.stats()
+    
+    calls, removed_at, fast_stats, failing_stats = asyncio.run(scenario())
+    assert calls["fast"] >= 5
+    assert calls["fast"] <= removed_at + 1
+    # The failing scheduler backs off without slowing the other one down
+    assert 1 <= calls["failing"] < calls["fast"]
+    assert fast_stats["refreshes"] == calls["fast"]
+    assert failing_stats["consecutive_failures"] == calls["failing"]